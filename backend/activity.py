@@ -0,0 +1,151 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from decouple import config
+from sqlalchemy import insert
+from starlette.concurrency import run_in_threadpool
+
+import models
+from metrics import ACTIVITY_DROPPED, ACTIVITY_QUEUE_DEPTH, ACTIVITY_WRITTEN
+
+# Activity log ingestion. Requests put entries on a bounded in-process queue
+# and a writer thread inserts them in batches of up to BATCH_SIZE rows, or
+# whatever arrived within FLUSH_INTERVAL seconds, one statement and commit per
+# batch. When the queue is full, producers wait up to ENQUEUE_TIMEOUT for room
+# (back-pressure) and the entry is dropped and counted after that, so a stuck
+# database slows requests down but never blocks them indefinitely. Shutdown
+# drains what is queued.
+#
+# Entries show up in GET /members/{id}/activity once their batch is written.
+
+QUEUE_SIZE = config("ACTIVITY_QUEUE_SIZE", default=10000, cast=int)
+BATCH_SIZE = config("ACTIVITY_BATCH_SIZE", default=200, cast=int)
+FLUSH_INTERVAL = config("ACTIVITY_FLUSH_INTERVAL", default=1.0, cast=float) # seconds
+ENQUEUE_TIMEOUT = config("ACTIVITY_ENQUEUE_TIMEOUT", default=0.5, cast=float) # seconds
+
+logger = logging.getLogger("zoho.activity")
+
+
+def entry(member_id: Optional[int], type: str, description: str, metadata: Optional[dict] = None) -> dict:
+    return {"member_id": member_id, "type": type, "description": description,
+            "metadata_json": metadata or {}, "created_at": datetime.utcnow()}
+
+
+class ActivityWriter:
+    def __init__(self, maxsize: int = QUEUE_SIZE):
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=maxsize)
+        self._session_factory = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._write_lock = threading.Lock()
+
+    # --- Producers ---
+
+    def record(self, member_id, type, description, metadata=None, timeout: float = ENQUEUE_TIMEOUT) -> bool:
+        """Queue an entry, waiting up to `timeout` for room. Don't call from the event loop."""
+        try:
+            self._queue.put(entry(member_id, type, description, metadata), timeout=timeout)
+        except queue.Full:
+            return self._dropped()
+        ACTIVITY_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    async def record_async(self, member_id, type, description, metadata=None) -> bool:
+        """Queue an entry from async code; only a full queue costs a trip to the threadpool."""
+        try:
+            self._queue.put_nowait(entry(member_id, type, description, metadata))
+        except queue.Full:
+            return await run_in_threadpool(self.record, member_id, type, description, metadata)
+        ACTIVITY_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    def _dropped(self) -> bool:
+        ACTIVITY_DROPPED.inc()
+        logger.warning("Activity queue full (%d entries), dropping an entry", self._queue.maxsize)
+        return False
+
+    # --- Writer ---
+
+    def start(self, session_factory):
+        if self._thread is not None:
+            return
+        self._session_factory = session_factory
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="activity-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the writer after it has written everything queued so far."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self.flush() # Anything put after the writer's last look
+
+    def flush(self, session_factory=None):
+        """Write everything queued now, in batches, from the calling thread."""
+        factory = session_factory or self._session_factory
+        while True:
+            batch = self._take(block=False)
+            if not batch:
+                return
+            self._write(batch, factory)
+
+    def discard(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        ACTIVITY_QUEUE_DEPTH.set(0)
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._take(block=True)
+            if batch:
+                self._write(batch, self._session_factory)
+
+    def _take(self, block: bool) -> List[dict]:
+        batch: List[dict] = []
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while len(batch) < BATCH_SIZE:
+            try:
+                if block:
+                    # Wait for the batch to fill, but not past the interval (or once stopping)
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0 or (self._stopping.is_set() and batch):
+                        break
+                    batch.append(self._queue.get(timeout=min(timeout, 0.1)))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                if not block or self._stopping.is_set():
+                    break
+        ACTIVITY_QUEUE_DEPTH.set(self._queue.qsize())
+        return batch
+
+    def _write(self, batch: List[dict], session_factory):
+        if session_factory is None:
+            logger.error("Activity writer has no session factory; dropping %d entries", len(batch))
+            ACTIVITY_DROPPED.inc(len(batch))
+            return
+        with self._write_lock:
+            db = session_factory()
+            try:
+                db.execute(insert(models.ActivityLog), batch)
+                db.commit()
+                ACTIVITY_WRITTEN.inc(len(batch))
+            except Exception:
+                db.rollback()
+                ACTIVITY_DROPPED.inc(len(batch))
+                logger.exception("Failed to write %d activity entries", len(batch))
+            finally:
+                db.close()
+
+
+activity_log = ActivityWriter()
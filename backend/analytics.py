@@ -0,0 +1,473 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+import asyncio
+import logging
+import threading
+from decouple import config
+from sqlalchemy import case, delete, event, func, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+import models
+from metrics import ANALYTICS_COUNTER_DRIFT
+
+# Aggregations behind /analytics. Each section is one GROUP BY (or conditional
+# SUM) over base tables; no ORM objects are loaded. The result is stored as a
+# single AnalyticsSnapshot row.
+#
+# The headline numbers don't wait for a snapshot: they come from AnalyticsCounter
+# rows that every flush touching members or tasks adjusts in the same
+# transaction, and a periodic reconciliation recounts them from scratch.
+
+logger = logging.getLogger("zoho.analytics")
+
+SNAPSHOT_MAX_AGE = timedelta(minutes=15) # Older snapshots are refreshed in the background on read
+RECONCILE_INTERVAL = config("ANALYTICS_RECONCILE_INTERVAL", default=3600, cast=int) # seconds, 0 disables
+GROWTH_WEEKS = 4
+TOP_SKILLS = 6
+STALLED_DAYS = 14
+
+
+def _pct(part, whole):
+    return round(100 * part / whole) if whole else 0
+
+
+def skill_counts(db: Session):
+    """(skill name, members with it)."""
+    return db.execute(
+        select(models.Skill.name, func.count())
+        .join(models.MemberSkill, models.MemberSkill.skill_id == models.Skill.id)
+        .group_by(models.Skill.name)
+    ).all()
+
+
+def skills_distribution(db: Session):
+    counts = sorted(skill_counts(db), key=lambda r: (-r[1], r[0]))
+    total = sum(c for _, c in counts)
+    top = counts[:TOP_SKILLS]
+    dist = [{"name": n, "value": _pct(c, total)} for n, c in top]
+    rest = total - sum(c for _, c in top)
+    if rest:
+        dist.append({"name": "Other", "value": _pct(rest, total)})
+    return dist
+
+
+def path_completion_stats(db: Session):
+    completed = func.sum(case((models.Task.status == "Completed", 1), else_=0))
+    rows = db.execute(
+        select(models.LearningPath.name, completed, func.count(models.Task.id))
+        .join(models.Task, models.Task.path_id == models.LearningPath.id)
+        .group_by(models.LearningPath.id, models.LearningPath.name)
+        .order_by(models.LearningPath.id)
+    )
+    stats = []
+    for name, done, total in rows:
+        pct = _pct(done or 0, total)
+        stats.append({"name": name, "completed": pct, "in_progress": 100 - pct if total else 0})
+    return stats
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def growth_weeks(now: datetime, weeks: int = GROWTH_WEEKS):
+    """Monday of each of the last `weeks` calendar weeks, oldest first."""
+    current = week_start(now.date())
+    return [current - timedelta(weeks=weeks - 1 - i) for i in range(weeks)]
+
+
+def member_growth(db: Session, now: datetime, weeks: int = GROWTH_WEEKS):
+    # Cumulative members at the end of each of the last `weeks` weeks, in one pass
+    ends = [datetime.combine(monday + timedelta(weeks=1), datetime.min.time()) for monday in growth_weeks(now, weeks)]
+    columns = [func.sum(case((models.Member.joined_at < end, 1), else_=0)) for end in ends]
+    totals = db.execute(select(*columns)).one()
+    return [{"name": f"Week {i + 1}", "value": int(v or 0)} for i, v in enumerate(totals)]
+
+
+def engagement_by_channel(db: Session):
+    rows = db.execute(
+        select(models.ActivityLog.type, func.count(func.distinct(models.ActivityLog.member_id)), func.count())
+        .group_by(models.ActivityLog.type)
+        .order_by(func.count().desc())
+    )
+    return [{"channel": t or "other", "active_members": m, "messages": n} for t, m, n in rows]
+
+
+def compute_analytics(db: Session, now: datetime = None):
+    now = now or datetime.utcnow()
+    total_members, engaged = db.execute(select(
+        func.count(models.Member.id),
+        func.sum(case((models.Member.participation_score > 0, 1), else_=0)),
+    )).one()
+    total_tasks, completed_tasks = db.execute(select(
+        func.count(models.Task.id),
+        func.sum(case((models.Task.status == "Completed", 1), else_=0)),
+    )).one()
+    completed_tasks = completed_tasks or 0
+
+    growth = member_growth(db, now)
+    skills = skills_distribution(db)
+    paths = path_completion_stats(db)
+
+    return {
+        "total_members": total_members,
+        "active_tasks": total_tasks - completed_tasks,
+        "avg_completion": f"{_pct(completed_tasks, total_tasks)}%",
+        "engagement": f"{_pct(engaged or 0, total_members)}%",
+        "member_growth": growth,
+        "skills_distribution": skills,
+        "path_completion_stats": paths,
+        "engagement_by_channel": engagement_by_channel(db),
+        "insights_feed": insights_feed(db, now, growth, skills, paths),
+    }
+
+
+def insights_feed(db: Session, now: datetime, growth, skills, paths):
+    feed = []
+    if len(growth) >= 2 and growth[-2]["value"]:
+        change = _pct(growth[-1]["value"] - growth[-2]["value"], growth[-2]["value"])
+        feed.append({"tag": "Growth", "title": "Member growth this week",
+                     "description": f"{change}% change in members over the last week."})
+    if skills:
+        feed.append({"tag": "Skills", "title": f"{skills[0]['name']} leads skills",
+                     "description": f"{skills[0]['value']}% of recorded skills are {skills[0]['name']}."})
+    if paths:
+        best = max(paths, key=lambda p: p["completed"])
+        feed.append({"tag": "Learning", "title": f"{best['name']} completing fastest",
+                     "description": f"{best['completed']}% of its tasks are completed."})
+    stalled = db.scalar(
+        select(func.count(func.distinct(models.Task.assigned_to)))
+        .where(models.Task.status != "Completed")
+        .where(models.Task.updated_at < now - timedelta(days=STALLED_DAYS))
+    )
+    if stalled:
+        feed.append({"tag": "Risk", "title": "Stalled progress",
+                     "description": f"{stalled} members have open tasks untouched for {STALLED_DAYS} days."})
+    return [dict(item, id=i + 1) for i, item in enumerate(feed)]
+
+
+def refresh_snapshot(db: Session):
+    """Recompute analytics and replace the stored snapshot."""
+    payload = compute_analytics(db)
+    table = models.AnalyticsSnapshot.__table__
+    row = {"id": 1, "payload": payload, "generated_at": datetime.utcnow()}
+    # Through the session rather than its connection, so the response cache sees the write
+    dialect = {"sqlite": sqlite, "postgresql": postgresql}.get(db.get_bind().dialect.name)
+    if dialect is not None:
+        # An upsert, so workers regenerating at the same time don't race on the insert
+        stmt = dialect.insert(table).values(row)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={"payload": stmt.excluded.payload, "generated_at": stmt.excluded.generated_at},
+        ))
+    elif not db.execute(update(table).where(table.c.id == 1).values(row)).rowcount:
+        db.execute(table.insert().values(row))
+    db.commit()
+    return payload
+
+
+_regenerating = threading.Lock()
+
+
+def regenerate(session_factory):
+    """Background entry point; a request arriving mid-rebuild doesn't start another."""
+    if not _regenerating.acquire(blocking=False):
+        return False
+    try:
+        db = session_factory()
+        try:
+            refresh_snapshot(db)
+        finally:
+            db.close()
+        return True
+    finally:
+        _regenerating.release()
+
+
+# --- Incremental counters ---
+
+def week_key(joined_at) -> str:
+    return week_start(joined_at.date()).isoformat() if joined_at else ""
+
+
+def task_keys(status, path_id):
+    keys = [("tasks_by_status", status or "")]
+    if path_id is not None:
+        keys.append(("tasks_by_path", f"{path_id}:{status or ''}"))
+    return keys
+
+
+def member_keys(role, path_status, score, joined_at):
+    keys = [
+        ("members", ""),
+        ("members_by_role", role or ""),
+        ("members_by_path_status", path_status or ""),
+        ("members_by_week", week_key(joined_at)),
+    ]
+    if (score or 0) > 0:
+        keys.append(("members_engaged", ""))
+    return keys
+
+
+TRACKED = {
+    models.Task: (task_keys, ("status", "path_id")),
+    models.Member: (member_keys, ("role", "learning_path_status", "participation_score", "joined_at")),
+}
+
+
+def _old_value(state, attr):
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.added:
+        return None
+    return state.attrs[attr].value
+
+
+def flush_deltas(session):
+    """Counter deltas for the objects a flush inserted, changed or deleted."""
+    deltas = Counter()
+
+    def count(obj, sign, values):
+        keys_for, _ = TRACKED[type(obj)]
+        for key in keys_for(*values):
+            deltas[key] += sign
+
+    for obj in session.new:
+        if type(obj) in TRACKED:
+            count(obj, 1, [getattr(obj, a) for a in TRACKED[type(obj)][1]])
+    for obj in session.deleted:
+        if type(obj) in TRACKED:
+            count(obj, -1, [getattr(obj, a) for a in TRACKED[type(obj)][1]])
+    for obj in session.dirty:
+        if type(obj) in TRACKED and session.is_modified(obj):
+            state = obj._sa_instance_state
+            attrs = TRACKED[type(obj)][1]
+            if any(state.attrs[a].history.has_changes() for a in attrs):
+                count(obj, -1, [_old_value(state, a) for a in attrs])
+                count(obj, 1, [getattr(obj, a) for a in attrs])
+
+    # Skills live in member_skills rows, reached through each member's collection
+    for obj, sign in [(o, 1) for o in session.new] + [(o, -1) for o in session.deleted]:
+        if isinstance(obj, models.Member):
+            for link in obj.member_skills:
+                deltas[("skills", link.skill_name)] += sign
+    for obj in session.dirty:
+        if isinstance(obj, models.Member):
+            history = obj._sa_instance_state.attrs.member_skills.history
+            for link in history.added or ():
+                deltas[("skills", link.skill_name)] += 1
+            for link in history.deleted or ():
+                deltas[("skills", link.skill_name)] -= 1
+    return {key: d for key, d in deltas.items() if d}
+
+
+def row_deltas(model, rows):
+    """Counter deltas for rows inserted with a Core/bulk statement, which skips the flush hook."""
+    keys_for, attrs = TRACKED[model]
+    deltas = Counter()
+    for row in rows:
+        for key in keys_for(*(row.get(a) for a in attrs)):
+            deltas[key] += 1
+    return dict(deltas)
+
+
+def change_deltas(model, old_rows, new_rows):
+    """Counter deltas for rows updated with a bulk statement: what `new_rows` count minus what `old_rows` did."""
+    deltas = Counter(row_deltas(model, new_rows))
+    deltas.subtract(row_deltas(model, old_rows))
+    return {key: d for key, d in deltas.items() if d}
+
+
+def apply_deltas(connection, deltas):
+    if not deltas:
+        return
+    table = models.AnalyticsCounter.__table__
+    rows = [{"metric": m, "key": k, "value": d} for (m, k), d in sorted(deltas.items())]
+    dialect = {"sqlite": sqlite, "postgresql": postgresql}.get(connection.dialect.name)
+    if dialect is not None:
+        stmt = dialect.insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.metric, table.c.key],
+            set_={"value": table.c.value + stmt.excluded.value},
+        )
+        connection.execute(stmt, rows)
+        return
+    for row in rows:
+        updated = connection.execute(
+            update(table).where(table.c.metric == row["metric"], table.c.key == row["key"])
+            .values(value=table.c.value + row["value"])
+        )
+        if not updated.rowcount:
+            connection.execute(table.insert(), row)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_counters(session, flush_context):
+    # Still inside the flush's transaction, so counters commit or roll back with the rows
+    apply_deltas(session.connection(), flush_deltas(session))
+
+
+def load_counters(db: Session, *metrics):
+    rows = db.execute(
+        select(models.AnalyticsCounter.metric, models.AnalyticsCounter.key, models.AnalyticsCounter.value)
+        .where(models.AnalyticsCounter.metric.in_(metrics))
+    )
+    counters = {m: {} for m in metrics}
+    for metric, key, value in rows:
+        if value:
+            counters[metric][key] = value
+    return counters
+
+
+def compute_counters(db: Session):
+    """Every counter recounted from the base tables."""
+    counts = Counter()
+    Task, Member = models.Task, models.Member
+    for status, path_id, n in db.execute(
+        select(Task.status, Task.path_id, func.count()).group_by(Task.status, Task.path_id)
+    ):
+        for key in task_keys(status, path_id):
+            counts[key] += n
+    for role, path_status, engaged, day, n in db.execute(
+        select(Member.role, Member.learning_path_status, Member.participation_score > 0,
+               func.date(Member.joined_at), func.count())
+        .group_by(Member.role, Member.learning_path_status, Member.participation_score > 0, func.date(Member.joined_at))
+    ):
+        joined_at = datetime.fromisoformat(str(day)[:10]) if day else None
+        for key in member_keys(role, path_status, 1 if engaged else 0, joined_at):
+            counts[key] += n
+    for name, n in skill_counts(db):
+        counts[("skills", name)] += n
+    return counts
+
+
+def _lock_counters(db: Session):
+    """Block counter writes until `db`'s transaction ends.
+
+    Every tracked write adjusts analytics_counters in its own transaction, so
+    while this is held the base tables and the counters can't move apart.
+    """
+    table = models.AnalyticsCounter.__table__
+    connection = db.connection()
+    if connection.dialect.name == "postgresql":
+        # Conflicts with the row locks writers take; plain reads still go through
+        connection.execute(text(f"LOCK TABLE {table.name} IN SHARE ROW EXCLUSIVE MODE"))
+    else:
+        # SQLite takes its database-wide write lock on the first write statement
+        connection.execute(delete(table).where(table.c.value == 0))
+
+
+def reconcile(db: Session, repair: bool = True):
+    """Compare the stored counters with a full recount and report the drift.
+
+    The recount and the read of the stored counters run under one lock on
+    analytics_counters, so a write committing in between can't be counted
+    on one side only; writers wait for the repair to commit.
+    """
+    try:
+        _lock_counters(db)
+        expected = compute_counters(db)
+        actual = {
+            (m, k): v for m, k, v in
+            db.execute(select(models.AnalyticsCounter.metric, models.AnalyticsCounter.key, models.AnalyticsCounter.value))
+        }
+        drift = [
+            {"metric": m, "key": k, "expected": expected.get((m, k), 0), "actual": actual.get((m, k), 0)}
+            for m, k in sorted(set(expected) | set(actual))
+            if expected.get((m, k), 0) != actual.get((m, k), 0)
+        ]
+        if repair and drift:
+            apply_deltas(db.connection(), {(d["metric"], d["key"]): d["expected"] - d["actual"] for d in drift})
+            db.execute(delete(models.AnalyticsCounter).where(models.AnalyticsCounter.value == 0))
+        db.commit() # Releases the lock
+    except Exception:
+        db.rollback()
+        raise
+    ANALYTICS_COUNTER_DRIFT.set(len(drift))
+    return drift
+
+
+def live_analytics(db: Session, now: datetime = None):
+    """Dashboard payload from the counters plus the snapshot's time-windowed sections.
+
+    Returns (payload, stale); stale means the snapshot is missing or old and
+    should be regenerated in the background.
+    """
+    now = now or datetime.utcnow()
+    c = load_counters(db, "members", "members_engaged", "members_by_week", "tasks_by_status", "tasks_by_path", "skills")
+    total_members = c["members"].get("", 0)
+    total_tasks = sum(c["tasks_by_status"].values())
+    completed_tasks = c["tasks_by_status"].get("Completed", 0)
+
+    growth = []
+    for i, monday in enumerate(growth_weeks(now)):
+        last = monday.isoformat()
+        growth.append({"name": f"Week {i + 1}",
+                       "value": sum(n for week, n in c["members_by_week"].items() if week and week <= last)})
+
+    counts = sorted(c["skills"].items(), key=lambda r: (-r[1], r[0]))
+    total = sum(n for _, n in counts)
+    skills = [{"name": n, "value": _pct(v, total)} for n, v in counts[:TOP_SKILLS]]
+    rest = total - sum(v for _, v in counts[:TOP_SKILLS])
+    if rest:
+        skills.append({"name": "Other", "value": _pct(rest, total)})
+
+    per_path = {}
+    for key, n in c["tasks_by_path"].items():
+        path_id, status = key.split(":", 1)
+        done, all_ = per_path.get(int(path_id), (0, 0))
+        per_path[int(path_id)] = (done + (n if status == "Completed" else 0), all_ + n)
+    names = dict(db.execute(
+        select(models.LearningPath.id, models.LearningPath.name).where(models.LearningPath.id.in_(per_path))
+    ).all()) if per_path else {}
+    paths = []
+    for path_id in sorted(per_path):
+        if path_id in names:
+            done, all_ = per_path[path_id]
+            pct = _pct(done, all_)
+            paths.append({"name": names[path_id], "completed": pct, "in_progress": 100 - pct})
+
+    snapshot = db.get(models.AnalyticsSnapshot, 1)
+    stale = snapshot is None or now - snapshot.generated_at > SNAPSHOT_MAX_AGE
+    saved = snapshot.payload if snapshot is not None else {}
+    return {
+        "total_members": total_members,
+        "active_tasks": total_tasks - completed_tasks,
+        "avg_completion": f"{_pct(completed_tasks, total_tasks)}%",
+        "engagement": f"{_pct(c['members_engaged'].get('', 0), total_members)}%",
+        "member_growth": growth,
+        "skills_distribution": skills,
+        "path_completion_stats": paths,
+        "engagement_by_channel": saved.get("engagement_by_channel", []),
+        "insights_feed": saved.get("insights_feed", []),
+    }, stale
+
+
+def run_maintenance(session_factory):
+    db = session_factory()
+    try:
+        drift = reconcile(db)
+    finally:
+        db.close()
+    if drift:
+        logger.warning("Repaired %d drifted analytics counters: %s", len(drift), drift[:20])
+    regenerate(session_factory)
+    return drift
+
+
+async def maintenance_loop(session_factory, interval: int = RECONCILE_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(run_maintenance, session_factory)
+        except Exception:
+            logger.exception("Analytics maintenance failed")
+
+
+if __name__ == "__main__":
+    # Recount the counters, e.g. after a bulk load outside the app: python -m analytics
+    from database import SessionLocal
+    for row in run_maintenance(SessionLocal):
+        print(row)
@@ -1,22 +1,55 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from jose import JWTError, jwt
 from decouple import config
+import asyncio
+import os
+import threading
+import time
+from cache import TTLCache
 
 # Configuration
 SECRET_KEY = config("SECRET_KEY", default="supersecretkey")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost factor; stored hashes with a different cost are upgraded on login
+BCRYPT_ROUNDS = config("BCRYPT_ROUNDS", default=12, cast=int)
+# Dedicated hashing processes and how many hash jobs may be queued or running at once
+HASH_WORKERS = config("HASH_WORKERS", default=min(4, os.cpu_count() or 1), cast=int)
+HASH_QUEUE_LIMIT = config("HASH_QUEUE_LIMIT", default=32, cast=int)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password):
+@lru_cache(maxsize=4)
+def _context_for(rounds):
+    return pwd_context.copy(bcrypt__rounds=rounds)
+
+def get_password_hash(password, rounds=None):
+    if rounds is not None and rounds != BCRYPT_ROUNDS:
+        return _context_for(rounds).hash(password)
     return pwd_context.hash(password)
 
+def hash_many(passwords, rounds=None):
+    return [get_password_hash(p, rounds) for p in passwords]
+
+def hash_rounds(hashed_password):
+    # bcrypt hashes look like $2b$12$<salt+checksum>
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+def needs_rehash(hashed_password):
+    return hash_rounds(hashed_password) != BCRYPT_ROUNDS
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -26,3 +59,120 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+# --- Token cache ---
+
+TOKEN_CACHE_SIZE = config("TOKEN_CACHE_SIZE", default=10000, cast=int)
+TOKEN_CACHE_TTL = config("TOKEN_CACHE_TTL", default=300, cast=int)
+
+class PrincipalCache:
+    """Decoded token -> member principal, so authenticated requests skip JWT
+    verification and the member lookup.
+
+    Entries live for min(TOKEN_CACHE_TTL, token expiry). Writes to a member bump
+    its version, which invalidates every cached token for that member; callers
+    take the version before reading the member and put() drops the entry if it
+    has moved since. Versions come from one increasing clock and only the most
+    recently written members keep their own; the rest share the clock value of
+    the last trim, so trimming can only invalidate entries, never revive them.
+    """
+
+    def __init__(self, maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL, max_versions=None):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions = OrderedDict() # member id -> clock value of its last write, oldest first
+        self._max_versions = max_versions or 4 * maxsize
+        self._clock = 0
+        self._floor = 0 # Version of members without their own
+        self._lock = threading.Lock()
+
+    def version(self, member_id):
+        with self._lock:
+            return self._versions.get(member_id, self._floor)
+
+    def get(self, token):
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        principal, version = entry
+        if self.version(principal.id) != version:
+            self._entries.pop(token)
+            return None
+        return principal
+
+    def put(self, token, principal, version, expires_at=None):
+        """Cache `principal`, read at member `version`, unless the member was written since."""
+        ttl = self._entries.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl > 0 and self.version(principal.id) == version:
+            self._entries.set(token, (principal, version), ttl=ttl)
+
+    def evict_member(self, member_id):
+        with self._lock:
+            self._clock += 1
+            self._versions[member_id] = self._clock
+            self._versions.move_to_end(member_id)
+            if len(self._versions) > self._max_versions:
+                # Forget the older half; they all move to the current clock
+                for _ in range(len(self._versions) // 2):
+                    self._versions.popitem(last=False)
+                self._floor = self._clock
+
+    def clear(self):
+        self._entries.clear()
+
+principal_cache = PrincipalCache()
+
+# --- Hashing pool ---
+
+class HashingOverloaded(Exception):
+    """Raised when the hashing queue is full; surfaced to clients as 503."""
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_in_flight = 0
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+    return _pool
+
+def shutdown_hash_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+def hash_queue_depth():
+    return _in_flight
+
+async def _submit(fn, *args):
+    global _in_flight
+    # Only touched from the event loop thread, so no lock is needed
+    if _in_flight >= HASH_QUEUE_LIMIT:
+        raise HashingOverloaded()
+    _in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), fn, *args)
+    finally:
+        _in_flight -= 1
+
+async def hash_password_async(password):
+    # Pass the cost explicitly: workers keep the config they were forked with
+    return await _submit(get_password_hash, password, BCRYPT_ROUNDS)
+
+async def verify_password_async(plain_password, hashed_password):
+    return await _submit(verify_password, plain_password, hashed_password)
+
+async def hash_passwords_async(passwords):
+    """Hash a batch as one job per worker instead of one queue slot per password."""
+    if not passwords:
+        return []
+    size = -(-len(passwords) // HASH_WORKERS)
+    parts = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+    hashed = await asyncio.gather(*(_submit(hash_many, part, BCRYPT_ROUNDS) for part in parts))
+    return [h for part in hashed for h in part]
@@ -1,65 +1,334 @@
-def handle_bot_command(payload: dict):
-    command = payload.get("command")
-    
-    if command == "/addSkill":
-        return handle_add_skill(payload)
-    elif command == "/logTask":
-        return handle_log_task(payload)
-    elif command == "/recommendNext":
-        return handle_recommend_next(payload)
-    elif command == "/assignTask":
-        return handle_assign_task(payload)
-    elif command == "/viewProfile":
-        return handle_view_profile(payload)
-    elif command == "/adminStats":
-        return handle_admin_stats(payload)
-    else:
-        return {"text": "Unknown command. Try /addSkill, /logTask, or /recommendNext."}
-
-def handle_add_skill(payload):
-    skill = payload.get("skill")
-    return {
-        "text": f"Skill '{skill}' added successfully! 🎉",
-        "card": {
-            "title": "Skill Added",
-            "theme": "modern-inline"
-        }
-    }
+import asyncio
+import logging
+import shlex
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
 
-def handle_log_task(payload):
-    task = payload.get("task")
-    return {
-        "text": f"Task '{task}' logged. Keep up the good work! ✅"
-    }
+import httpx
+from decouple import Csv, config
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import models
+import analytics
+import catalog
+from activity import activity_log
+from metrics import (BOT_CALLBACKS, BOT_COMMAND_DURATION, BOT_COMMANDS_DEDUPLICATED, BOT_COMMANDS_OVER_BUDGET,
+                     BOT_DEFERRED_QUEUE_DEPTH)
+from skill_index import PROFICIENCY_LEVELS
+
+# Cliq slash commands. Handlers register under their command name with
+# @command, so routing is a single dict lookup, and the command text is parsed
+# once (shell-style, so "quoted words" stay together) into a BotRequest before
+# the handler runs. Handlers run on a small worker pool with a session of their
+# own and get their command's budget (seconds) to answer; past that the webhook
+# is told the command is still running, well within Cliq's reply window, and
+# the handler finishes in the background.
+#
+# Commands registered with slow=True don't wait at all when there is somewhere
+# to send the result (BOT_CALLBACK_URL, or the request's callbackUrl if its
+# host is listed in BOT_CALLBACK_HOSTS): the webhook is acknowledged at once,
+# the command is queued for a separate pool and its reply is POSTed to the
+# callback when done. An identical command (same member, command and
+# arguments) already queued or running is not queued again. Over-budget
+# commands deliver their late reply the same way; with no callback the reply
+# says the result won't be posted, rather than promising it.
+
+DEFAULT_BUDGET = config("BOT_COMMAND_BUDGET", default=2.0, cast=float) # seconds
+WORKERS = config("BOT_WORKERS", default=4, cast=int)
+CALLBACK_URL = config("BOT_CALLBACK_URL", default="")
+CALLBACK_HOSTS = set(config("BOT_CALLBACK_HOSTS", default="", cast=Csv())) # Hosts a request may name as its callback
+DEFERRED_WORKERS = config("BOT_DEFERRED_WORKERS", default=2, cast=int)
+DEFERRED_QUEUE_SIZE = config("BOT_DEFERRED_QUEUE_SIZE", default=100, cast=int) # queued + running
+CALLBACK_TIMEOUT = config("BOT_CALLBACK_TIMEOUT", default=5.0, cast=float) # seconds
+CALLBACK_RETRIES = config("BOT_CALLBACK_RETRIES", default=2, cast=int)
+
+logger = logging.getLogger("zoho.bot")
+
+
+class CommandError(Exception):
+    """Bad arguments or unknown ids; the message (or the command's usage) is sent back as the reply."""
+
+
+@dataclass(frozen=True)
+class BotRequest:
+    command: str
+    args: Tuple[str, ...]
+    member_id: Optional[int] = None
+
+    def rest(self, start: int = 0) -> str:
+        return " ".join(self.args[start:])
+
+    def int_arg(self, i: int) -> int:
+        try:
+            return int(self.args[i])
+        except (IndexError, ValueError):
+            raise CommandError()
+
+    def sender_id(self) -> int:
+        """The calling member, for handlers that act on them; Cliq doesn't always send one."""
+        if self.member_id is None:
+            raise CommandError(f"{self.command} needs a memberId.")
+        return self.member_id
+
+
+@dataclass(frozen=True)
+class Command:
+    name: str
+    handler: Callable[[Session, BotRequest], dict]
+    usage: str
+    budget: float
+    slow: bool = False
+
+
+COMMANDS: Dict[str, Command] = {} # lower-cased name -> Command
+
+
+def command(name: str, usage: str = "", budget: Optional[float] = None, slow: bool = False):
+    """Register `handler(db, request)` for `name`; `slow` ones are deferred when a callback is known."""
+    def register(handler):
+        COMMANDS[name.lower()] = Command(name, handler, usage or name,
+                                         DEFAULT_BUDGET if budget is None else budget, slow)
+        return handler
+    return register
+
+
+def parse(text: str, arguments: Optional[str] = None, member_id: Optional[int] = None) -> BotRequest:
+    """The command name and its arguments, from the command text plus Cliq's separate `arguments`."""
+    text = f"{text} {arguments or ''}"
+    try:
+        tokens = shlex.split(text)
+    except ValueError: # Unbalanced quotes: fall back to plain words
+        tokens = text.split()
+    return BotRequest(tokens[0] if tokens else "", tuple(tokens[1:]), member_id)
+
+
+def _run(cmd: Command, request: BotRequest, session_factory):
+    start = time.perf_counter()
+    db = session_factory()
+    try:
+        return cmd.handler(db, request)
+    except CommandError as e:
+        db.rollback()
+        return {"text": str(e) or f"Usage: {cmd.usage}"}
+    finally:
+        db.close()
+        BOT_COMMAND_DURATION.labels(cmd.name).observe(time.perf_counter() - start)
+
+
+_http = httpx.Client(timeout=CALLBACK_TIMEOUT)
+
+
+def deliver(url: str, cmd: Command, request: BotRequest, reply) -> bool:
+    """POST a command's reply to `url`, retrying with backoff."""
+    payload = {"command": cmd.name, "memberId": request.member_id, "arguments": list(request.args), "reply": reply}
+    for attempt in range(CALLBACK_RETRIES + 1):
+        try:
+            _http.post(url, json=payload).raise_for_status()
+            BOT_CALLBACKS.labels("delivered").inc()
+            return True
+        except httpx.HTTPError as e:
+            if attempt == CALLBACK_RETRIES:
+                logger.warning("Could not deliver the %s reply to %s: %s", cmd.name, url, e)
+            else:
+                time.sleep(0.5 * 2 ** attempt)
+    BOT_CALLBACKS.labels("failed").inc()
+    return False
 
-def handle_recommend_next(payload):
-    return {
-        "text": "Based on your profile, here are your next steps:",
-        "buttons": [
-            {"label": "Start: Advanced React", "action": {"type": "open_url", "url": "http://localhost:5173/paths/p1"}},
-            {"label": "View All Paths", "action": {"type": "open_url", "url": "http://localhost:5173/tasks"}}
-        ]
-    }
 
-def handle_assign_task(payload):
-    return {"text": "Task assigned successfully."}
+class DeferredCommands:
+    """Slow commands queued for a worker pool, at most one per (member, command, arguments)."""
 
-def handle_view_profile(payload):
+    def __init__(self, workers: int = DEFERRED_WORKERS, maxsize: int = DEFERRED_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bot-deferred")
+        self._in_flight: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, cmd: Command, request: BotRequest, session_factory, callback_url: str) -> str:
+        """"queued", "duplicate" (already queued or running) or "full"."""
+        key = (request.member_id, cmd.name, request.args)
+        with self._lock:
+            if key in self._in_flight:
+                BOT_COMMANDS_DEDUPLICATED.labels(cmd.name).inc()
+                return "duplicate"
+            if len(self._in_flight) >= self.maxsize:
+                return "full"
+            # Registered under the lock, so the job can't finish (and unregister) first
+            self._in_flight[key] = self._pool.submit(self._execute, key, cmd, request, session_factory, callback_url)
+            BOT_DEFERRED_QUEUE_DEPTH.set(len(self._in_flight))
+        return "queued"
+
+    def deliver_later(self, url: str, cmd: Command, request: BotRequest, reply):
+        self._pool.submit(deliver, url, cmd, request, reply)
+
+    def _execute(self, key, cmd: Command, request: BotRequest, session_factory, callback_url: str):
+        try:
+            try:
+                reply = _run(cmd, request, session_factory)
+            except Exception:
+                logger.exception("Deferred bot command %s failed", cmd.name)
+                reply = {"text": f"Sorry, {cmd.name} failed. Please try again."}
+            deliver(callback_url, cmd, request, reply)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                BOT_DEFERRED_QUEUE_DEPTH.set(len(self._in_flight))
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until everything queued so far has run and been delivered."""
+        with self._lock:
+            futures = list(self._in_flight.values())
+        for future in futures:
+            future.result(timeout)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="bot")
+deferred = DeferredCommands()
+
+
+def callback_for(url: Optional[str]) -> str:
+    """The request's callback URL when its host is allowed, else the configured one."""
+    if url:
+        parts = urlsplit(url)
+        if parts.scheme in ("http", "https") and parts.hostname in CALLBACK_HOSTS:
+            return url
+    return CALLBACK_URL
+
+
+async def dispatch(request: BotRequest, session_factory, callback_url: Optional[str] = None) -> dict:
+    cmd = COMMANDS.get(request.command.lower())
+    if cmd is None:
+        return {"text": f"Unknown command. Try {', '.join(c.name for c in COMMANDS.values())}."}
+    callback_url = callback_for(callback_url)
+    if cmd.slow and callback_url:
+        queued = deferred.submit(cmd, request, session_factory, callback_url)
+        if queued == "full":
+            return {"text": "The bot is busy right now, please try again in a minute."}
+        if queued == "duplicate":
+            return {"text": f"Already working on {cmd.name}; the result will be posted here."}
+        return {"text": f"Working on {cmd.name}; the result will be posted here."}
+
+    future = asyncio.get_running_loop().run_in_executor(_pool, _run, cmd, request, session_factory)
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), cmd.budget)
+    except asyncio.TimeoutError:
+        BOT_COMMANDS_OVER_BUDGET.labels(cmd.name).inc()
+
+        def finished(future):
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                logger.error("Bot command failed after its reply was sent", exc_info=future.exception())
+            elif callback_url:
+                deferred.deliver_later(callback_url, cmd, request, future.result())
+
+        future.add_done_callback(finished)
+        if callback_url:
+            return {"text": f"Still working on {cmd.name}; the result will show up shortly."}
+        # Nowhere to post the late reply: don't promise one
+        return {"text": f"{cmd.name} is taking longer than usual and will finish in the background, "
+                        f"but its result can't be posted here. Check again in a minute."}
+
+
+# --- Handlers ---
+
+def _member(db: Session, member_id: int) -> models.Member:
+    member = db.get(models.Member, member_id)
+    if member is None:
+        raise CommandError(f"Member {member_id} not found.")
+    return member
+
+
+def _task(db: Session, task_id: int) -> models.Task:
+    task = db.get(models.Task, task_id)
+    if task is None:
+        raise CommandError(f"Task {task_id} not found.")
+    return task
+
+
+@command("/addSkill", "/addSkill <skill> [Beginner|Intermediate|Advanced|Expert]")
+def add_skill(db: Session, request: BotRequest):
+    args = request.args
+    proficiency = "Beginner"
+    if len(args) > 1 and args[-1].title() in PROFICIENCY_LEVELS:
+        proficiency, args = args[-1].title(), args[:-1]
+    name = " ".join(args)
+    if not name:
+        raise CommandError()
+    member = _member(db, request.sender_id())
+    if not member.add_skill(name, proficiency):
+        return {"text": f"You already have '{name}'."}
+    db.commit()
+    activity_log.record(member.id, "skill_add", f"Added skill {name} ({proficiency})",
+                        {"skill": name, "proficiency": proficiency})
     return {
-        "text": "Here is your profile summary:",
-        "slides": [
-            {
-                "type": "images",
-                "data": ["https://via.placeholder.com/150"]
-            },
-            {
-                "type": "text",
-                "data": "Sarah Chen - Senior Developer\nScore: 85"
-            }
-        ]
+        "text": f"Skill '{name}' ({proficiency}) added successfully! 🎉",
+        "card": {"title": "Skill Added", "theme": "modern-inline"},
     }
 
-def handle_admin_stats(payload):
+
+@command("/logTask", "/logTask <task id> <message>")
+def log_task(db: Session, request: BotRequest):
+    task = _task(db, request.int_arg(0))
+    message = request.rest(1)
+    if not message:
+        raise CommandError()
+    # One append-only insert, as POST /tasks/{id}/logs
+    entry = models.TaskLogEntry(task_id=task.id, member_id=request.sender_id(), message=message)
+    db.add(entry)
+    db.commit()
+    activity_log.record(request.member_id, "task_log", message, {"task_id": task.id, "log_id": entry.id})
+    return {"text": f"Logged on '{task.title}'. Keep up the good work! ✅"}
+
+
+@command("/assignTask", "/assignTask <task id> [member id]")
+def assign_task(db: Session, request: BotRequest):
+    task = _task(db, request.int_arg(0))
+    assignee = _member(db, request.int_arg(1) if len(request.args) > 1 else request.sender_id())
+    if task.assigned_to != assignee.id:
+        changes = {"assigned_to": [task.assigned_to, assignee.id]}
+        task.assigned_to = assignee.id
+        db.commit()
+        activity_log.record(assignee.id, "task_update", f"Updated task '{task.title}'",
+                            {"task_id": task.id, "changes": changes})
+    return {"text": f"Task '{task.title}' assigned to {assignee.name}."}
+
+
+@command("/viewProfile", "/viewProfile [member id]")
+def view_profile(db: Session, request: BotRequest):
+    member = _member(db, request.int_arg(0) if request.args else request.sender_id())
+    tasks = dict(db.execute(
+        select(models.Task.status, func.count()).where(models.Task.assigned_to == member.id)
+        .group_by(models.Task.status)
+    ).all())
+    skills = ", ".join(f"{s['name']} ({s['proficiency']})" for s in member.skills) or "none yet"
+    summary = (f"{member.name} - {member.role}\nScore: {member.participation_score}\n"
+               f"Learning path: {member.learning_path_status}\nSkills: {skills}\n"
+               f"Tasks: {tasks.get('Completed', 0)} completed, {sum(tasks.values()) - tasks.get('Completed', 0)} open")
+    slides = [{"type": "images", "data": [member.avatar]}] if member.avatar else []
+    slides.append({"type": "text", "data": summary})
+    return {"text": "Here is the profile summary:", "slides": slides}
+
+
+@command("/recommendNext", "/recommendNext [member id]", slow=True)
+def recommend_next(db: Session, request: BotRequest):
+    member = _member(db, request.int_arg(0) if request.args else request.sender_id())
+    return catalog.recommend(db, member)
+
+
+@command("/adminStats", slow=True)
+def admin_stats(db: Session, request: BotRequest):
+    # Counter-backed, like GET /analytics: no scan of the base tables
+    stats, _ = analytics.live_analytics(db)
     return {
-        "text": "Admin Stats:\n- Active Members: 12\n- Tasks Pending: 5"
+        "text": (f"Admin Stats:\n- Members: {stats['total_members']}\n- Active Tasks: {stats['active_tasks']}\n"
+                 f"- Avg Completion: {stats['avg_completion']}\n- Engagement: {stats['engagement']}")
     }
@@ -0,0 +1,458 @@
+import asyncio
+import csv
+import io
+import json
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+from typing import Literal
+
+from decouple import config
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from sqlalchemy import insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+import analytics
+import models, schemas
+from activity import activity_log
+from auth import HashingOverloaded, hash_passwords_async
+
+# Admin bulk import/export. Uploads are parsed row by row from the spooled
+# upload file and inserted IMPORT_BATCH_SIZE rows per statement and transaction;
+# exports stream straight from a server-side cursor. Neither holds a whole table
+# in memory.
+
+IMPORT_BATCH_SIZE = config("IMPORT_BATCH_SIZE", default=500, cast=int)
+EXPORT_BATCH_SIZE = config("EXPORT_BATCH_SIZE", default=1000, cast=int)
+MAX_BATCH_TASKS = config("MAX_BATCH_TASKS", default=5000, cast=int) # Items per /tasks/bulk request
+MAX_REPORTED_ERRORS = 1000
+# Seconds an import may spend in all waiting for the password hashing pool (shared with logins)
+IMPORT_HASH_WAIT = config("IMPORT_HASH_WAIT", default=30.0, cast=float)
+
+Kind = Literal["members", "tasks", "paths"]
+Format = Literal["csv", "ndjson"]
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+IMPORTS = {
+    "members": (schemas.MemberImport, models.Member),
+    "tasks": (schemas.TaskCreate, models.Task),
+    "paths": (schemas.LearningPathCreate, models.LearningPath),
+}
+
+# Exported columns: the response schema's fields (never password_hash; task logs have their own endpoint)
+EXPORTS = {
+    "members": (models.Member, list(schemas.Member.model_fields)),
+    "tasks": (models.Task, [f for f in schemas.Task.model_fields if f != "logs"]),
+    "paths": (models.LearningPath, list(schemas.LearningPath.model_fields)),
+}
+
+
+def detect_format(filename, content_type):
+    name = (filename or "").lower()
+    if name.endswith(".csv") or (content_type or "").startswith("text/csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in (content_type or ""):
+        return "ndjson"
+    return None
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": errors if isinstance(errors, list) else [errors]})
+
+    def as_dict(self):
+        return {
+            "status": "success" if not self.failed else "partial",
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _cell(value):
+    # CSV carries list/dict fields (skills, skill_tags, modules) as JSON
+    if value[:1] in ("[", "{"):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            pass
+    return value
+
+
+def read_rows(fileobj, fmt):
+    """Yield (line number, dict or error message) without reading the whole file."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            if None in row:
+                yield reader.line_num, "More values than header columns"
+                continue
+            yield reader.line_num, {k: _cell(v) for k, v in row.items() if k and v not in (None, "")}
+        return
+    for line_num, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_num, f"Invalid JSON: {e.msg}"
+            continue
+        yield line_num, row if isinstance(row, dict) else "Expected a JSON object"
+
+
+def validation_messages(error: ValidationError):
+    return [f"{'.'.join(map(str, e['loc'])) or 'row'}: {e['msg']}" for e in error.errors()]
+
+
+def validate_batch(schema, batch, report):
+    valid = []
+    for line, raw in batch:
+        if isinstance(raw, str):
+            report.fail(line, raw)
+            continue
+        try:
+            valid.append((line, schema.model_validate(raw)))
+        except ValidationError as e:
+            report.fail(line, validation_messages(e))
+    return valid
+
+
+def _initials(name):
+    parts = name.split()
+    return "".join([p[0] for p in parts]).upper()[:2] if parts else "U"
+
+
+def member_rows(db: Session, valid, hashes, report):
+    emails = [item.email for _, item in valid]
+    taken = set(db.scalars(select(models.Member.email).where(models.Member.email.in_(emails))))
+    now = datetime.utcnow()
+    rows = []
+    for (line, item), password_hash in zip(valid, hashes):
+        if item.email in taken:
+            report.fail(line, "email: Email already registered")
+            continue
+        taken.add(item.email)
+        rows.append((line, {
+            "name": item.name, "email": item.email, "role": item.role, "password_hash": password_hash,
+            "avatar": item.avatar, "initials": item.initials or _initials(item.name),
+            "participation_score": item.participation_score, "learning_path_status": item.learning_path_status,
+            "skills": item.skills, "interests": item.interests,
+            "joined_at": item.joined_at or now, "updated_at": now,
+        }))
+    return rows
+
+
+def task_ref_errors(db: Session, items):
+    """Per item, errors for an assigned_to or path_id that doesn't exist; one query each for all items."""
+    member_ids = {item.assigned_to for item in items if item.assigned_to is not None}
+    path_ids = {item.path_id for item in items if item.path_id is not None}
+    members = set(db.scalars(select(models.Member.id).where(models.Member.id.in_(member_ids)))) if member_ids else set()
+    paths = set(db.scalars(select(models.LearningPath.id).where(models.LearningPath.id.in_(path_ids)))) if path_ids else set()
+    out = []
+    for item in items:
+        errors = []
+        if item.assigned_to is not None and item.assigned_to not in members:
+            errors.append("assigned_to: Member not found")
+        if item.path_id is not None and item.path_id not in paths:
+            errors.append("path_id: Path not found")
+        out.append(errors)
+    return out
+
+
+def task_rows(db: Session, valid, report):
+    now = datetime.utcnow()
+    rows = []
+    for (line, item), errors in zip(valid, task_ref_errors(db, [item for _, item in valid])):
+        if errors:
+            report.fail(line, errors)
+            continue
+        rows.append((line, dict(item.model_dump(), created_at=now, updated_at=now)))
+    return rows
+
+
+def path_rows(valid):
+    now = datetime.utcnow()
+    return [(line, dict(item.model_dump(), created_at=now, updated_at=now)) for line, item in valid]
+
+
+def insert_paths(db: Session, values):
+    # Paths go in first with RETURNING ids, then their tag and module rows
+    values = [dict(row) for row in values]
+    children = [(row.pop("skill_tags"), row.pop("modules")) for row in values]
+    ids = db.scalars(
+        insert(models.LearningPath).returning(models.LearningPath.id, sort_by_parameter_order=True), values
+    ).all()
+    skill_ids = models.resolve_skill_ids(db.connection(), [tag for tags, _ in children for tag in tags if tag])
+    tag_rows, module_rows = [], []
+    for path_id, (tags, modules) in zip(ids, children):
+        for position, tag in enumerate(dict.fromkeys(t for t in tags if t)):
+            tag_rows.append({"path_id": path_id, "skill_id": skill_ids[tag], "position": position})
+        for position, module in enumerate(modules):
+            m = models.PathModule.from_dict(module, position=position)
+            module_rows.append({"path_id": path_id, "position": position, "title": m.title,
+                                "status": m.status, "details": m.details})
+    if tag_rows:
+        db.execute(insert(models.PathTag), tag_rows)
+    if module_rows:
+        db.execute(insert(models.PathModule), module_rows)
+
+
+def insert_members(db: Session, values):
+    # Members go in first with RETURNING ids, then their skill and interest rows
+    values = [dict(row) for row in values]
+    children = [(row.pop("skills"), row.pop("interests")) for row in values]
+    ids = db.scalars(insert(models.Member).returning(models.Member.id, sort_by_parameter_order=True), values).all()
+    # As the Member.skills setter reads them: the first entry for a name wins
+    wanted_skills = []
+    for skills, _ in children:
+        wanted = {}
+        for skill in skills:
+            if skill.get("name"):
+                wanted.setdefault(skill["name"], skill.get("proficiency") or "Beginner")
+        wanted_skills.append(wanted)
+    names = [n for wanted in wanted_skills for n in wanted] + [n for _, interests in children for n in interests if n]
+    skill_ids = models.resolve_skill_ids(db.connection(), names)
+    skill_rows, interest_rows = [], []
+    for member_id, wanted, (_, interests) in zip(ids, wanted_skills, children):
+        for position, (name, proficiency) in enumerate(wanted.items()):
+            skill_rows.append({"member_id": member_id, "skill_id": skill_ids[name], "proficiency": proficiency,
+                               "position": position})
+        for position, name in enumerate(dict.fromkeys(n for n in interests if n)):
+            interest_rows.append({"member_id": member_id, "skill_id": skill_ids[name], "position": position})
+    if skill_rows:
+        db.execute(insert(models.MemberSkill), skill_rows)
+    if interest_rows:
+        db.execute(insert(models.MemberInterest), interest_rows)
+    # The skills counters aren't per-row columns, so row_deltas doesn't cover them
+    analytics.apply_deltas(db.connection(), dict(Counter(("skills", name) for wanted in wanted_skills for name in wanted)))
+
+
+def _insert(db: Session, model, values):
+    if model is models.LearningPath:
+        insert_paths(db, values)
+    elif model is models.Member:
+        insert_members(db, values)
+    else:
+        db.execute(insert(model), values)
+
+
+def insert_batch(db: Session, model, rows, report):
+    """Insert one batch in one transaction; counters are adjusted alongside."""
+    if not rows:
+        return
+    values = [row for _, row in rows]
+    try:
+        _insert(db, model, values)
+        if model in analytics.TRACKED:
+            analytics.apply_deltas(db.connection(), analytics.row_deltas(model, values))
+        db.commit()
+        report.imported += len(rows)
+        return
+    except IntegrityError:
+        db.rollback()
+    # A constraint failed (e.g. a concurrent insert of the same email): find the offending rows
+    for line, row in rows:
+        try:
+            with db.begin_nested():
+                _insert(db, model, [row])
+                if model in analytics.TRACKED:
+                    analytics.apply_deltas(db.connection(), analytics.row_deltas(model, [row]))
+            report.imported += 1
+        except IntegrityError as e:
+            report.fail(line, f"Constraint violation: {e.orig}")
+    db.commit()
+
+
+async def _hash_passwords(passwords, budget):
+    """The hashes, or None once the import has waited `budget["wait"]` seconds in all for the pool."""
+    delay = 0.1
+    while True:
+        try:
+            return await hash_passwords_async(passwords)
+        except HashingOverloaded:
+            # Share the hashing pool with logins rather than failing at the first busy moment, up to a point
+            if budget["wait"] <= 0:
+                return None
+            pause = min(delay, budget["wait"])
+            await asyncio.sleep(pause)
+            budget["wait"] -= pause
+            delay = min(delay * 2, 2.0)
+
+
+async def import_file(db, kind, fileobj, fmt):
+    """Import an uploaded file through `db` (an AsyncSession or ThreadedSession)."""
+    schema, model = IMPORTS[kind]
+    report = ImportReport()
+    rows = read_rows(fileobj, fmt)
+    budget = {"wait": IMPORT_HASH_WAIT}
+    while True:
+        batch = await run_in_threadpool(lambda: list(islice(rows, IMPORT_BATCH_SIZE)))
+        if not batch:
+            break
+        valid = validate_batch(schema, batch, report)
+        if kind == "members":
+            to_hash = [(i, item.password) for i, (_, item) in enumerate(valid) if item.password]
+            hashes = [None] * len(valid)
+            hashed = await _hash_passwords([p for _, p in to_hash], budget) if to_hash else []
+            if hashed is None:
+                # Out of patience with the pool: these rows fail, the passwordless ones still go in
+                for i, _ in to_hash:
+                    report.fail(valid[i][0], "password: Server busy hashing passwords, import this row again later")
+                skipped = {i for i, _ in to_hash}
+                valid = [row for i, row in enumerate(valid) if i not in skipped]
+                hashes = [None] * len(valid)
+            else:
+                for (i, _), value in zip(to_hash, hashed):
+                    hashes[i] = value
+            prepared = await db.run_sync(member_rows, valid, hashes, report)
+        elif kind == "tasks":
+            prepared = await db.run_sync(task_rows, valid, report)
+        else:
+            prepared = path_rows(valid)
+        await db.run_sync(insert_batch, model, prepared, report)
+    report.errors.sort(key=lambda e: e["line"])
+    return report.as_dict()
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value):
+    return json.dumps(value) if isinstance(value, (list, dict)) else _export_value(value)
+
+
+def export_rows(session_factory, kind, fmt):
+    """Stream a table as CSV or NDJSON, one chunk per EXPORT_BATCH_SIZE rows."""
+    model, fields = EXPORTS[kind]
+    db = session_factory()
+    try:
+        # ORM rows so skills/tags/modules come from their link tables (selectin, per partition)
+        result = db.scalars(select(model).order_by(model.id).execution_options(yield_per=EXPORT_BATCH_SIZE))
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(fields)
+            for partition in result.partitions():
+                for obj in partition:
+                    writer.writerow([_csv_value(getattr(obj, f)) for f in fields])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for partition in result.partitions():
+                yield "".join(
+                    json.dumps({f: _export_value(getattr(obj, f)) for f in fields}) + "\n" for obj in partition
+                )
+    finally:
+        db.close()
+
+
+# --- Batch task writes ---
+#
+# POST/PATCH /tasks/bulk and cloning a path's tasks. Each is one transaction
+# of set-based statements (executemany INSERT ... RETURNING, UPDATE by primary
+# key, INSERT ... SELECT) with no ORM objects loaded or refreshed. Unlike
+# imports they are all-or-nothing: any invalid item rejects the request.
+# Counters are adjusted by hand, as bulk statements skip the flush hook.
+
+class BatchErrors(Exception):
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid items")
+        self.errors = errors # [{"index": i, "errors": [...]}]
+
+
+def _raise_errors(per_item):
+    errors = [{"index": i, "errors": e} for i, e in enumerate(per_item) if e]
+    if errors:
+        raise BatchErrors(errors[:MAX_REPORTED_ERRORS])
+
+
+def create_tasks(db: Session, items):
+    """Insert TaskCreate items; their new ids, in order."""
+    _raise_errors(task_ref_errors(db, items))
+    now = datetime.utcnow()
+    values = [dict(item.model_dump(), created_at=now, updated_at=now) for item in items]
+    # Multi-row VALUES with RETURNING. Ids are handed out in VALUES order, so sorting
+    # them restores it (sort_by_parameter_order would fall back to a row per statement on SQLite)
+    ids = db.scalars(insert(models.Task).returning(models.Task.id), values).all()
+    analytics.apply_deltas(db.connection(), analytics.row_deltas(models.Task, values))
+    db.commit()
+    return sorted(ids)
+
+
+def update_tasks(db: Session, items):
+    """Apply TaskBatchUpdate items (the fields each one sets) to their tasks; the ids updated.
+
+    Each task that changed gets a task_update activity entry, as a single update does.
+    """
+    ids = [item.id for item in items]
+    columns = [getattr(models.Task, name) for name in ("id", "title", *schemas.TaskUpdate.model_fields)]
+    # Locked, so the counter deltas and recorded changes are against what this update replaces
+    old = {row.id: row._asdict() for row in db.execute(
+        select(*dict.fromkeys(columns)).where(models.Task.id.in_(ids)).with_for_update()
+    )}
+    per_item, seen = task_ref_errors(db, items), set()
+    for item, errors in zip(items, per_item):
+        if item.id not in old:
+            errors.insert(0, "id: Task not found")
+        elif item.id in seen:
+            errors.insert(0, "id: Listed more than once")
+        seen.add(item.id)
+    _raise_errors(per_item)
+    now = datetime.utcnow()
+    values = [dict(item.model_dump(exclude_unset=True), updated_at=now) for item in items]
+    # ORM bulk UPDATE by primary key: one executemany per distinct set of columns
+    db.execute(update(models.Task), values)
+    new = [{**old[row["id"]], **row} for row in values]
+    analytics.apply_deltas(db.connection(), analytics.change_deltas(models.Task, old.values(), new))
+    db.commit()
+    for item, task in zip(items, new):
+        before = old[task["id"]]
+        changes = {key: [before[key], value] for key, value in item.model_dump(exclude_unset=True).items()
+                   if key != "id" and before[key] != value}
+        if changes:
+            activity_log.record(task["assigned_to"], "task_update", f"Updated task '{task['title']}'",
+                                {"task_id": task["id"], "changes": jsonable_encoder(changes)})
+    return ids
+
+
+def clone_path_tasks(db: Session, path_id: int, member_ids):
+    """Copy the path's unassigned (template) tasks to each member, as new Pending tasks; the new ids.
+
+    Raises BatchErrors, indexed into `member_ids`, for members that don't exist.
+    """
+    found = set(db.scalars(select(models.Member.id).where(models.Member.id.in_(member_ids))))
+    _raise_errors([[] if member_id in found else ["member_ids: Member not found"] for member_id in member_ids])
+    Task, now = models.Task, datetime.utcnow()
+    templates = (
+        select(Task.title, Task.description, literal("Pending"), Task.priority, Task.due_date, Task.skill_focus,
+               models.Member.id, Task.path_id, literal(now), literal(now))
+        .select_from(Task).join(models.Member, models.Member.id.in_(member_ids))
+        .where(Task.path_id == path_id, Task.assigned_to.is_(None))
+        .order_by(models.Member.id, Task.id)
+    )
+    columns = ["title", "description", "status", "priority", "due_date", "skill_focus", "assigned_to", "path_id",
+               "created_at", "updated_at"]
+    ids = db.scalars(insert(Task).from_select(columns, templates).returning(Task.id)).all()
+    analytics.apply_deltas(db.connection(),
+                           analytics.row_deltas(Task, [{"status": "Pending", "path_id": path_id}] * len(ids)))
+    db.commit()
+    return sorted(ids)
+
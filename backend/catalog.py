@@ -0,0 +1,37 @@
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import models
+from metrics import RECOMMENDER_DURATION
+from ml.recommender import ModuleIndex, module_index_cache
+
+# The module catalog the recommender ranks: every learning path's modules,
+# tagged with the path's skills. Shared by the /recommendations routes and the
+# bot's /recommendNext.
+
+FALLBACK_MODULES = [
+    {"title": "Advanced React", "tags": ["React"]},
+    {"title": "Intro to Python", "tags": ["Python"]},
+]
+
+
+def load_catalog_modules(db: Session) -> List[Dict]:
+    all_modules = []
+    for path in db.scalars(select(models.LearningPath)):
+        skill_tags = path.skill_tags
+        for m in path.modules:
+            m["tags"] = skill_tags
+            all_modules.append(m)
+    return all_modules or [dict(m) for m in FALLBACK_MODULES]
+
+
+def module_index(db: Session) -> ModuleIndex:
+    """The cached index over the catalog, built from `db` if path writes invalidated it."""
+    return module_index_cache.get(lambda: load_catalog_modules(db))
+
+
+def recommend(db: Session, member: models.Member):
+    with RECOMMENDER_DURATION.labels("single").time():
+        return module_index(db).recommend([link.skill_name for link in member.member_skills])
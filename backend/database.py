@@ -1,24 +1,216 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
+import anyio
+import contextlib
 import os
+import time
+import metrics
 
 # Use SQLite by default, allow override
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./backend/app.db")
 
-# check_same_thread=False is needed only for SQLite
-connect_args = {"check_same_thread": False} if "sqlite" in SQLALCHEMY_DATABASE_URL else {}
+# Optional async engine (aiosqlite / asyncpg). Off by default: async routes then run
+# their queries on a sync session in the threadpool.
+ASYNC_DB = os.getenv("ASYNC_DB", "off").lower() in ("1", "on", "true")
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args=connect_args
-)
+# Engine profile. DB_TUNING=off falls back to driver defaults (used as the load-test baseline).
+DB_TUNING = os.getenv("DB_TUNING", "on").lower() not in ("0", "off", "false")
+
+# Applied on every new SQLite connection. WAL lets readers run alongside the
+# single writer, and busy_timeout makes writers wait for the lock instead of
+# failing with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("DB_SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("DB_SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("DB_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("DB_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("DB_SQLITE_CACHE_SIZE", "-65536")), # negative = KiB, i.e. 64 MiB
+    "temp_store": os.getenv("DB_SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+# Pool settings for server databases (DATABASE_URL pointing at Postgres etc.)
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+}
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def apply_sqlite_pragmas(engine, pragmas=SQLITE_PRAGMAS):
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def instrument_pool(engine):
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_at"] = time.perf_counter()
+        metrics.DB_CONNECTIONS_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checkout_at = connection_record.info.pop("checkout_at", None)
+        if checkout_at is not None:
+            metrics.DB_SESSION_CHECKOUT.observe(time.perf_counter() - checkout_at)
+            metrics.DB_CONNECTIONS_CHECKED_OUT.dec()
+
+
+def make_engine(url: str = SQLALCHEMY_DATABASE_URL, tuned: bool = DB_TUNING, **kwargs):
+    options = {}
+    if is_sqlite(url):
+        # check_same_thread=False is needed only for SQLite
+        options["connect_args"] = {"check_same_thread": False}
+        if tuned and ":memory:" not in url:
+            # Size the file-backed pool for the threadpool; pre-ping/recycle don't apply
+            options.update({k: POOL_OPTIONS[k] for k in ("pool_size", "max_overflow", "pool_timeout")})
+    elif tuned:
+        options.update(POOL_OPTIONS)
+    options.update(kwargs)
+
+    engine = create_engine(url, **options)
+    if tuned and is_sqlite(url):
+        apply_sqlite_pragmas(engine)
+    instrument_pool(engine)
+    return engine
+
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def get_session_factory():
+    """Session factory for work that outlives the request, e.g. background tasks."""
+    return SessionLocal
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+
+def make_async_engine(url: str = SQLALCHEMY_DATABASE_URL, tuned: bool = DB_TUNING, **kwargs):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    options = {}
+    if tuned and not is_sqlite(url):
+        options.update(POOL_OPTIONS)
+    options.update(kwargs)
+
+    engine = create_async_engine(os.getenv("ASYNC_DATABASE_URL", async_url(url)), **options)
+    if tuned and is_sqlite(url):
+        apply_sqlite_pragmas(engine.sync_engine)
+    instrument_pool(engine.sync_engine)
+    return engine
+
+
+class ThreadedSession:
+    """The subset of AsyncSession used by the routes, backed by a sync Session.
+
+    Each awaitable call runs in the threadpool, so async routes work unchanged
+    when no async driver is configured (and under the test overrides).
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    async def execute(self, statement, *args, **kwargs):
+        # Buffer rows in the worker thread, like AsyncSession does
+        return await run_in_threadpool(lambda: self.sync_session.execute(statement, *args, **kwargs).freeze()())
+
+    async def scalars(self, statement, *args, **kwargs):
+        return (await self.execute(statement, *args, **kwargs)).scalars()
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance, *args, **kwargs):
+        await run_in_threadpool(self.sync_session.refresh, instance, *args, **kwargs)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self):
+        if self.sync_session.in_transaction():
+            await run_in_threadpool(self.sync_session.close)
+        else:
+            # Nothing checked out, e.g. a cache hit that never queried
+            self.sync_session.close()
+
+
+AsyncSessionLocal = None
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = make_async_engine()
+    # Objects are serialized after commit, outside the session's greenlet, so don't expire them
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def pool_capacity(engine):
+    if isinstance(engine.pool, QueuePool):
+        return engine.pool.size() + max(engine.pool._max_overflow, 0)
+    return None
+
+
+# A ThreadedSession keeps its connection between awaits. Admitting more of them than
+# the pool holds would park threadpool workers in checkout while the owners of the
+# connections wait for a worker, so they queue here (on the event loop) instead.
+_session_slots = None
+
+
+async def get_async_db():
+    global _session_slots
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    capacity = pool_capacity(engine)
+    if capacity is not None and _session_slots is None:
+        _session_slots = anyio.Semaphore(capacity)
+    async with (_session_slots if capacity is not None else contextlib.nullcontext()):
+        db = ThreadedSession(SessionLocal())
+        try:
+            yield db
+        finally:
+            await db.close()
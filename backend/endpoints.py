@@ -1,27 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, UploadFile, File, Form, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from pydantic import BaseModel
-from database import get_db
+from database import get_db, get_async_db, get_session_factory
 import models, schemas
-from ml.recommender import recommend_for_member
-from auth import get_password_hash, verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+import analytics
+import bot_handlers
+import bulk
+import catalog
+import search
+import serialization
+import task_logs
+from fieldsets import MEMBER_FIELDS, TASK_FIELDS, PATH_FIELDS
+from ml.recommender import module_index_cache
+from skill_index import skill_index, parse_requirements
+from auth import (create_access_token, hash_password_async, verify_password_async, needs_rehash,
+                  principal_cache, HashingOverloaded, ACCESS_TOKEN_EXPIRE_MINUTES, SECRET_KEY, ALGORITHM)
+from jose import JWTError, jwt
+from pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from metrics import RECOMMENDER_DURATION
+from activity import activity_log
+from response_cache import cached
+from idempotency import IdempotentRoute
 import json
 from datetime import datetime, timedelta
 
-router = APIRouter()
+router = APIRouter(route_class=IdempotentRoute)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 # --- Auth ---
 
 @router.post("/auth/register", response_model=schemas.Member)
-def register(user: schemas.MemberCreate, db: Session = Depends(get_db)):
-    db_user = db.query(models.Member).filter(models.Member.email == user.email).first()
+async def register(user: schemas.MemberCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.scalar(select(models.Member.id).where(models.Member.email == user.email))
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password_async(user.password)
     
     # Fix initials generation
     parts = user.name.split()
@@ -35,14 +56,14 @@ def register(user: schemas.MemberCreate, db: Session = Depends(get_db)):
         initials=initials
     )
     db.add(new_member)
-    db.commit()
-    db.refresh(new_member)
+    await db.commit()
+    await db.refresh(new_member)
     return new_member
 
 @router.post("/auth/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.Member).filter(models.Member.email == form_data.username).first()
-    if not user or not user.password_hash or not verify_password(form_data.password, user.password_hash):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(models.Member).where(models.Member.email == form_data.username))
+    if not user or not user.password_hash or not await verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -51,14 +72,24 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer", "user": {"name": user.name, "email": user.email, "id": user.id}}
+    response = {"access_token": access_token, "token_type": "bearer", "user": {"name": user.name, "email": user.email, "id": user.id}}
+
+    # Upgrade hashes made with a different BCRYPT_ROUNDS while we have the plaintext
+    if needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await hash_password_async(form_data.password)
+            await db.commit()
+        except HashingOverloaded:
+            pass # Retried on a later login
+    return response
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    from jose import JWTError, jwt
-    from .auth import SECRET_KEY, ALGORITHM
-    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -67,19 +98,35 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
+        member_id = payload.get("uid")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
         
-    user = db.query(models.Member).filter(models.Member.email == email).first()
-    if user is None:
+    if member_id is None:
+        # Tokens issued before "uid" was added
+        member_id = await db.scalar(select(models.Member.id).where(models.Member.email == email))
+        if member_id is None:
+            raise credentials_exception
+    # Taken before the read: a write committed meanwhile keeps the result out of the cache
+    version = principal_cache.version(member_id)
+    user = await db.get(models.Member, member_id)
+    if user is None or user.email != email:
         raise credentials_exception
-    return user
+
+    principal = schemas.Principal.model_validate(user)
+    principal_cache.put(token, principal, version, expires_at=payload.get("exp"))
+    return principal
+
+@router.get("/auth/me", response_model=schemas.Principal)
+async def read_current_user(current_user: schemas.Principal = Depends(get_current_user)):
+    return current_user
 
 # --- Settings ---
 
 @router.get("/settings", response_model=schemas.Settings)
+@cached("settings")
 def get_settings(db: Session = Depends(get_db)):
     settings = db.query(models.Settings).first()
     if not settings:
@@ -113,20 +160,68 @@ def test_db_connection(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Database connection failed: {str(e)}")
 
 # --- Admin Import/Export ---
-# (Skipped for brevity in this refactor, but can be adapted similarly)
+
+@router.post("/admin/import/{kind}")
+async def import_data(
+    kind: bulk.Kind,
+    file: UploadFile = File(...),
+    format: Optional[bulk.Format] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    fmt = format or bulk.detect_format(file.filename, file.content_type)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Unknown file format; pass format=csv or format=ndjson")
+    report = await bulk.import_file(db, kind, file.file, fmt)
+    if kind == "paths" and report["imported"]:
+        module_index_cache.invalidate()
+    if kind == "members" and report["imported"]:
+        skill_index.invalidate()
+    return report
+
+@router.get("/admin/export/{kind}")
+def export_data(kind: bulk.Kind, format: bulk.Format = "ndjson", session_factory = Depends(get_session_factory)):
+    return StreamingResponse(
+        bulk.export_rows(session_factory, kind, format),
+        media_type=bulk.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{format}"'},
+    )
 
 # --- Members ---
 
 @router.get("/members", response_model=List[schemas.Member])
-def get_members(db: Session = Depends(get_db)):
-    return db.query(models.Member).all()
+async def get_members(
+    response: Response,
+    role: Optional[str] = None,
+    learning_path_status: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = Query("id", pattern="^(id|updated_at)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+    include: Optional[str] = Query(None, description="Comma-separated related rows to nest, e.g. tasks,learning_path"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    names = MEMBER_FIELDS.select(fields, list_view=True)
+    includes = MEMBER_FIELDS.select_includes(include)
+    stmt = select(models.Member)
+    if role is not None:
+        stmt = stmt.where(models.Member.role == role)
+    if learning_path_status is not None:
+        stmt = stmt.where(models.Member.learning_path_status == learning_path_status)
+    if serialization.FAST_LISTS and not includes:
+        payload = await db.run_sync(serialization.member_page, stmt, response, limit, cursor, sort, names)
+        return serialization.fast_response(payload, response)
+    members = await paginate(db, stmt.options(*MEMBER_FIELDS.options(names, includes)), models.Member, response,
+                             limit=limit, cursor=cursor, sort=sort)
+    if MEMBER_FIELDS.is_full(names, includes):
+        return members
+    return serialization.fast_response([MEMBER_FIELDS.dump(m, names, includes) for m in members], response)
 
 @router.post("/members", response_model=schemas.Member)
-def create_member(member: schemas.MemberCreate, db: Session = Depends(get_db)):
-    if db.query(models.Member).filter(models.Member.email == member.email).first():
+async def create_member(member: schemas.MemberCreate, db: AsyncSession = Depends(get_async_db)):
+    if await db.scalar(select(models.Member.id).where(models.Member.email == member.email)):
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(member.password)
+    hashed_password = await hash_password_async(member.password)
     parts = member.name.split()
     initials = "".join([p[0] for p in parts]).upper()[:2] if parts else "U"
 
@@ -138,20 +233,74 @@ def create_member(member: schemas.MemberCreate, db: Session = Depends(get_db)):
         initials=initials
     )
     db.add(new_member)
-    db.commit()
-    db.refresh(new_member)
+    await db.commit()
+    await db.refresh(new_member)
     return new_member
 
+@router.get("/members/search", response_model=List[schemas.MemberSearchResult])
+async def search_members(
+    skills: str = Query(..., description="Comma-separated skills, each optionally Name:MinProficiency"),
+    min_proficiency: Optional[str] = Query(None, pattern="^(Beginner|Intermediate|Advanced|Expert)$"),
+    role: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+):
+    requirements = parse_requirements(skills, min_proficiency)
+    if not requirements:
+        raise HTTPException(status_code=400, detail="No skills given")
+    if not skill_index.is_fresh():
+        await db.run_sync(skill_index.ensure_fresh)
+    hits = skill_index.search(requirements, role=role)[:limit]
+    if not hits:
+        return []
+    members = {m.id: m for m in await db.scalars(select(models.Member).where(models.Member.id.in_([i for i, _ in hits])))}
+    return [
+        {**schemas.Member.model_validate(members[member_id]).model_dump(), "match_score": score}
+        for member_id, score in hits if member_id in members
+    ]
+
 @router.get("/members/{id}", response_model=schemas.Member)
-def get_member(id: int, db: Session = Depends(get_db)):
-    member = db.query(models.Member).filter(models.Member.id == id).first()
+async def get_member(
+    id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+    include: Optional[str] = Query(None, description="Comma-separated related rows to nest, e.g. tasks,learning_path"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    names = MEMBER_FIELDS.select(fields)
+    includes = MEMBER_FIELDS.select_includes(include)
+    member = await db.get(models.Member, id, options=MEMBER_FIELDS.options(names, includes))
+    if not member:
+        raise HTTPException(status_code=404, detail="Member not found")
+    if MEMBER_FIELDS.is_full(names, includes):
+        return member
+    return serialization.fast_response(MEMBER_FIELDS.dump(member, names, includes))
+
+@router.get("/members/{id}/activity", response_model=List[schemas.ActivityLog])
+async def get_member_activity(
+    id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Newest first, walking ix_activity_logs_member_id_created_at
+    stmt = select(models.ActivityLog).where(models.ActivityLog.member_id == id)
+    return await paginate(db, stmt, models.ActivityLog, response, limit=limit, cursor=cursor, sort="-created_at")
+
+@router.get("/members/{id}/overview", response_model=schemas.MemberOverview)
+async def get_member_overview(id: int, db: AsyncSession = Depends(get_async_db)):
+    # Member, their tasks and their path in three queries whatever the task count
+    member = await db.scalar(
+        select(models.Member).where(models.Member.id == id)
+        .options(selectinload(models.Member.tasks), joinedload(models.Member.learning_path))
+    )
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
     return member
 
 @router.put("/members/{id}", response_model=schemas.Member)
-def update_member(id: int, member_in: schemas.MemberUpdate, db: Session = Depends(get_db)):
-    member = db.query(models.Member).filter(models.Member.id == id).first()
+async def update_member(id: int, member_in: schemas.MemberUpdate, db: AsyncSession = Depends(get_async_db)):
+    member = await db.get(models.Member, id)
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
     
@@ -159,107 +308,232 @@ def update_member(id: int, member_in: schemas.MemberUpdate, db: Session = Depend
     for key, value in update_data.items():
         setattr(member, key, value)
     
-    db.commit()
-    db.refresh(member)
+    await db.commit()
+    principal_cache.evict_member(id)
+    await db.refresh(member)
     return member
 
 @router.post("/members/{id}/skills", response_model=schemas.Member)
-def add_skill(id: int, skill: schemas.Skill, db: Session = Depends(get_db)):
-    member = db.query(models.Member).filter(models.Member.id == id).first()
+async def add_skill(id: int, skill: schemas.Skill, db: AsyncSession = Depends(get_async_db)):
+    member = await db.get(models.Member, id)
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
         
-    # Check if skill exists
-    current_skills = member.skills or []
-    skill_exists = any(s.get("name") == skill.name for s in current_skills)
-    
-    if not skill_exists:
-        # SQLAlchemy JSON mutation tracking can be tricky, so we re-assign
-        new_skills = list(current_skills)
-        new_skills.append(skill.model_dump())
-        member.skills = new_skills
-        db.commit()
-        db.refresh(member)
+    # Inserts a single member_skills row
+    if member.add_skill(skill.name, skill.proficiency):
+        await db.commit()
+        await activity_log.record_async(id, "skill_add", f"Added skill {skill.name} ({skill.proficiency})",
+                                        {"skill": skill.name, "proficiency": skill.proficiency})
+        await db.refresh(member)
         
     return member
 
 @router.delete("/members/{id}")
-def delete_member(id: int, db: Session = Depends(get_db)):
-    member = db.query(models.Member).filter(models.Member.id == id).first()
+async def delete_member(id: int, db: AsyncSession = Depends(get_async_db)):
+    member = await db.get(models.Member, id)
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
-    db.delete(member)
-    db.commit()
+    await db.delete(member)
+    await db.commit()
+    principal_cache.evict_member(id)
     return {"status": "success", "message": "Member deleted"}
 
 # --- Tasks ---
 
 @router.get("/tasks", response_model=List[schemas.Task])
-def get_tasks(db: Session = Depends(get_db)):
-    return db.query(models.Task).all()
+async def get_tasks(
+    response: Response,
+    status: Optional[str] = None,
+    assigned_to: Optional[int] = None,
+    path_id: Optional[int] = None,
+    priority: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = Query("id", pattern="^(id|updated_at)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+    include: Optional[str] = Query(None, description="Comma-separated related rows to nest, e.g. assignee,path"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    names = TASK_FIELDS.select(fields, list_view=True)
+    includes = TASK_FIELDS.select_includes(include)
+    stmt = select(models.Task)
+    if status is not None:
+        stmt = stmt.where(models.Task.status == status)
+    if assigned_to is not None:
+        stmt = stmt.where(models.Task.assigned_to == assigned_to)
+    if path_id is not None:
+        stmt = stmt.where(models.Task.path_id == path_id)
+    if priority is not None:
+        stmt = stmt.where(models.Task.priority == priority)
+    if serialization.FAST_LISTS and not includes:
+        payload = await db.run_sync(serialization.task_page, stmt, response, limit, cursor, sort, names)
+        return serialization.fast_response(payload, response)
+    tasks = await paginate(db, stmt.options(*TASK_FIELDS.options(names, includes)), models.Task, response,
+                           limit=limit, cursor=cursor, sort=sort)
+    if "logs" in names:
+        await db.run_sync(task_logs.attach_recent, tasks)
+    if TASK_FIELDS.is_full(names, includes):
+        return tasks
+    return serialization.fast_response([TASK_FIELDS.dump(t, names, includes) for t in tasks], response)
 
 @router.get("/tasks/{id}", response_model=schemas.Task)
-def get_task(id: int, db: Session = Depends(get_db)):
-    task = db.query(models.Task).filter(models.Task.id == id).first()
+async def get_task(id: int, db: AsyncSession = Depends(get_async_db)):
+    task = await db.get(models.Task, id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    await db.run_sync(task_logs.attach_recent, [task])
     return task
 
 @router.post("/tasks", response_model=schemas.Task)
-def create_task(task: schemas.TaskCreate, db: Session = Depends(get_db)):
+async def create_task(task: schemas.TaskCreate, db: AsyncSession = Depends(get_async_db)):
     new_task = models.Task(**task.model_dump())
     db.add(new_task)
-    db.commit()
-    db.refresh(new_task)
+    await db.commit()
+    await db.refresh(new_task)
+    new_task._recent_logs = []
     return new_task
 
+@router.post("/tasks/bulk", response_model=schemas.TaskIds)
+async def create_tasks_bulk(
+    tasks: List[schemas.TaskCreate] = Body(..., min_length=1, max_length=bulk.MAX_BATCH_TASKS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # One transaction, one executemany INSERT ... RETURNING; no per-row refresh
+    try:
+        return {"ids": await db.run_sync(bulk.create_tasks, tasks)}
+    except bulk.BatchErrors as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+
+@router.patch("/tasks/bulk", response_model=schemas.TaskIds)
+async def update_tasks_bulk(
+    tasks: List[schemas.TaskBatchUpdate] = Body(..., min_length=1, max_length=bulk.MAX_BATCH_TASKS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        return {"ids": await db.run_sync(bulk.update_tasks, tasks)}
+    except bulk.BatchErrors as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+
 @router.put("/tasks/{id}", response_model=schemas.Task)
-def update_task(id: int, task_in: schemas.TaskUpdate, db: Session = Depends(get_db)):
-    task = db.query(models.Task).filter(models.Task.id == id).first()
+async def update_task(id: int, task_in: schemas.TaskUpdate, db: AsyncSession = Depends(get_async_db)):
+    task = await db.get(models.Task, id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
     update_data = task_in.model_dump(exclude_unset=True)
+    changes = {key: [getattr(task, key), value] for key, value in update_data.items() if getattr(task, key) != value}
     for key, value in update_data.items():
         setattr(task, key, value)
     
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    if changes:
+        await activity_log.record_async(task.assigned_to, "task_update", f"Updated task '{task.title}'",
+                                        {"task_id": id, "changes": jsonable_encoder(changes)})
+    await db.refresh(task)
+    await db.run_sync(task_logs.attach_recent, [task])
     return task
 
+@router.post("/tasks/{id}/logs", response_model=schemas.TaskLog)
+async def add_task_log(id: int, log: schemas.TaskLogCreate, db: AsyncSession = Depends(get_async_db)):
+    if not await db.scalar(select(models.Task.id).where(models.Task.id == id)):
+        raise HTTPException(status_code=404, detail="Task not found")
+    # One insert; the task row and its other entries are left alone
+    entry = models.TaskLogEntry(task_id=id, **log.model_dump())
+    db.add(entry)
+    await db.commit()
+    await db.refresh(entry)
+    await activity_log.record_async(log.member_id, "task_log", log.message, {"task_id": id, "log_id": entry.id})
+    return entry
+
+@router.get("/tasks/{id}/logs", response_model=List[schemas.TaskLog])
+async def get_task_logs(
+    id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    if not await db.scalar(select(models.Task.id).where(models.Task.id == id)):
+        raise HTTPException(status_code=404, detail="Task not found")
+    # Newest first, walking ix_task_log_entries_task_id_created_at
+    stmt = select(models.TaskLogEntry).where(models.TaskLogEntry.task_id == id)
+    return await paginate(db, stmt, models.TaskLogEntry, response, limit=limit, cursor=cursor, sort="-created_at")
+
 @router.delete("/tasks/{id}")
-def delete_task(id: int, db: Session = Depends(get_db)):
-    task = db.query(models.Task).filter(models.Task.id == id).first()
+async def delete_task(id: int, db: AsyncSession = Depends(get_async_db)):
+    task = await db.get(models.Task, id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
     return {"status": "success", "message": "Task deleted"}
 
 # --- Paths ---
 
+PATH_TABLES = ("learning_paths", "path_tags", "path_modules", "skills")
+MEMBER_TABLES = ("members", "member_skills", "member_interests", "skills")
+
 @router.get("/paths", response_model=List[schemas.LearningPath])
-def get_paths(db: Session = Depends(get_db)):
-    return db.query(models.LearningPath).all()
+@cached(*PATH_TABLES, include={"tasks": ("tasks",), "members": MEMBER_TABLES})
+async def get_paths(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = Query("id", pattern="^(id|updated_at)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+    include: Optional[str] = Query(None, description="Comma-separated related rows to nest, e.g. tasks,members"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    names = PATH_FIELDS.select(fields, list_view=True)
+    includes = PATH_FIELDS.select_includes(include)
+    paths = await paginate(db, select(models.LearningPath).options(*PATH_FIELDS.options(names, includes)),
+                           models.LearningPath, response, limit=limit, cursor=cursor, sort=sort)
+    if PATH_FIELDS.is_full(names, includes):
+        return paths
+    return serialization.fast_response([PATH_FIELDS.dump(p, names, includes) for p in paths], response)
 
 @router.get("/paths/{id}", response_model=schemas.LearningPath)
-def get_path(id: int, db: Session = Depends(get_db)):
-    path = db.query(models.LearningPath).filter(models.LearningPath.id == id).first()
+@cached(*PATH_TABLES)
+async def get_path(id: int, db: AsyncSession = Depends(get_async_db)):
+    path = await db.get(models.LearningPath, id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Path not found")
+    return path
+
+@router.get("/paths/{id}/roster", response_model=schemas.PathRoster)
+@cached(*PATH_TABLES, *MEMBER_TABLES, "tasks")
+async def get_path_roster(id: int, db: AsyncSession = Depends(get_async_db)):
+    # Enrolled members and the path's tasks, one query each however many there are
+    path = await db.scalar(
+        select(models.LearningPath).where(models.LearningPath.id == id)
+        .options(selectinload(models.LearningPath.members), selectinload(models.LearningPath.tasks))
+    )
     if not path:
         raise HTTPException(status_code=404, detail="Path not found")
     return path
 
+@router.post("/paths/{id}/tasks/clone", response_model=schemas.TaskIds)
+async def clone_path_tasks(id: int, clone: schemas.TaskClone, db: AsyncSession = Depends(get_async_db)):
+    # The path's unassigned tasks, copied to every listed member in one INSERT ... SELECT
+    if not await db.scalar(select(models.LearningPath.id).where(models.LearningPath.id == id)):
+        raise HTTPException(status_code=404, detail="Path not found")
+    try:
+        return {"ids": await db.run_sync(bulk.clone_path_tasks, id, clone.member_ids)}
+    except bulk.BatchErrors as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+
 @router.post("/paths", response_model=schemas.LearningPath)
-def create_path(path: schemas.LearningPathCreate, db: Session = Depends(get_db)):
+async def create_path(path: schemas.LearningPathCreate, db: AsyncSession = Depends(get_async_db)):
     new_path = models.LearningPath(**path.model_dump())
     db.add(new_path)
-    db.commit()
-    db.refresh(new_path)
+    await db.commit()
+    module_index_cache.invalidate()
+    await db.refresh(new_path)
     return new_path
 
 @router.put("/paths/{id}", response_model=schemas.LearningPath)
-def update_path(id: int, path_in: schemas.LearningPathCreate, db: Session = Depends(get_db)):
-    path = db.query(models.LearningPath).filter(models.LearningPath.id == id).first()
+async def update_path(id: int, path_in: schemas.LearningPathCreate, db: AsyncSession = Depends(get_async_db)):
+    path = await db.get(models.LearningPath, id)
     if not path:
         raise HTTPException(status_code=404, detail="Path not found")
     
@@ -267,105 +541,113 @@ def update_path(id: int, path_in: schemas.LearningPathCreate, db: Session = Depe
     for key, value in update_data.items():
         setattr(path, key, value)
     
-    db.commit()
-    db.refresh(path)
+    await db.commit()
+    module_index_cache.invalidate()
+    await db.refresh(path)
     return path
 
 @router.delete("/paths/{id}")
-def delete_path(id: int, db: Session = Depends(get_db)):
-    path = db.query(models.LearningPath).filter(models.LearningPath.id == id).first()
+async def delete_path(id: int, db: AsyncSession = Depends(get_async_db)):
+    path = await db.get(models.LearningPath, id)
     if not path:
         raise HTTPException(status_code=404, detail="Path not found")
-    db.delete(path)
-    db.commit()
+    await db.delete(path)
+    await db.commit()
+    module_index_cache.invalidate()
     return {"status": "success", "message": "Path deleted"}
 
+# --- Search ---
+
+@router.get("/search", response_model=List[schemas.SearchHit])
+async def search_content(
+    q: str = Query(..., min_length=1, description="Words to match; end a word with * for a prefix match"),
+    type: Optional[Literal["task", "path"]] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        return await db.run_sync(search.search, q, [type] if type else None, limit)
+    except OperationalError:
+        raise HTTPException(status_code=503, detail="Full-text search is not available")
+
 # --- Bot ---
 
 class BotCommand(BaseModel):
     command: str
     memberId: Optional[int] = None
+    arguments: Optional[str] = None # Cliq passes the text after the command separately
+    callbackUrl: Optional[str] = None # Where slow commands post their reply (default BOT_CALLBACK_URL)
 
 @router.post("/bot/command")
-def bot_command(cmd: BotCommand, db: Session = Depends(get_db)):
-    if cmd.command == "/recommendNext":
-        if not cmd.memberId:
-             return {"error": "memberId required"}
-        
-        # Reuse recommendation logic
-        return get_recommendations(cmd.memberId, db)
-        
-    return {"message": f"Command {cmd.command} received"}
+async def bot_command(cmd: BotCommand, session_factory = Depends(get_session_factory)):
+    # Parsed once and routed through the bot_handlers registry
+    request = bot_handlers.parse(cmd.command, cmd.arguments, cmd.memberId)
+    await activity_log.record_async(cmd.memberId, "bot_command", request.command,
+                                    {"command": request.command, "arguments": list(request.args)})
+    return await bot_handlers.dispatch(request, session_factory, cmd.callbackUrl)
 
 # --- Analytics / AI ---
 
+# Declared before /recommendations/{member_id} so "batch" isn't parsed as an id
+@router.post("/recommendations/batch")
+def batch_recommendations(req: schemas.RecommendationBatchRequest, db: Session = Depends(get_db)):
+    index = catalog.module_index(db)
+
+    query = db.query(models.Member.id)
+    if req.member_ids != "all":
+        query = query.filter(models.Member.id.in_(req.member_ids))
+    member_ids = [member_id for member_id, in query.order_by(models.Member.id)]
+    missing = [] if req.member_ids == "all" else sorted(set(req.member_ids) - set(member_ids))
+    skills_query = (
+        db.query(models.MemberSkill.member_id, models.Skill.name)
+        .join(models.Skill, models.Skill.id == models.MemberSkill.skill_id)
+        .order_by(models.MemberSkill.member_id, models.MemberSkill.position)
+    )
+    if req.member_ids != "all":
+        skills_query = skills_query.filter(models.MemberSkill.member_id.in_(member_ids))
+    skills_by_member = {}
+    for member_id, name in skills_query:
+        skills_by_member.setdefault(member_id, []).append(name)
+
+    def stream():
+        skill_lists = [skills_by_member.get(member_id, []) for member_id in member_ids]
+        with RECOMMENDER_DURATION.labels("batch").time():
+            for member_id, recs in zip(member_ids, index.recommend_batch(skill_lists, req.top_k)):
+                yield json.dumps({"member_id": member_id, "recommendations": recs}) + "\n"
+        for member_id in missing:
+            yield json.dumps({"member_id": member_id, "error": "Member not found"}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @router.post("/recommendations/{member_id}")
 def get_recommendations(member_id: int, db: Session = Depends(get_db)):
     member = db.query(models.Member).filter(models.Member.id == member_id).first()
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
-        
-    paths = db.query(models.LearningPath).all()
-    
-    all_modules = []
-    for p in paths:
-        for m in (p.modules or []):
-            m_copy = m.copy()
-            m_copy["tags"] = p.skill_tags or []
-            all_modules.append(m_copy)
-            
-    if not all_modules:
-         all_modules = [
-            {"title": "Advanced React", "tags": ["React"]},
-            {"title": "Intro to Python", "tags": ["Python"]}
-        ]
-
-    member_skills = [s.get("name") for s in (member.skills or [])]
-    
-    return recommend_for_member(member_skills, all_modules)
+    return catalog.recommend(db, member)
 
+# The snapshot-backed parts also age with the clock (and a stale snapshot is only
+# noticed on a miss), so the ETag rolls over at least once a minute
 @router.get("/analytics", response_model=schemas.AnalyticsData)
-def get_analytics(db: Session = Depends(get_db)):
-    total_members = db.query(models.Member).count()
-    active_tasks = db.query(models.Task).filter(models.Task.status != "Completed").count()
-    
-    return {
-        "total_members": total_members,
-        "active_tasks": active_tasks,
-        "avg_completion": "65%",
-        "engagement": "88%",
-        "member_growth": [
-            {"name": "Week 1", "value": max(0, total_members - 5)},
-            {"name": "Week 2", "value": max(0, total_members - 3)},
-            {"name": "Week 3", "value": max(0, total_members - 1)},
-            {"name": "Week 4", "value": total_members}
-        ],
-        "skills_distribution": [
-            {"name": "React", "value": 40},
-            {"name": "Python", "value": 30},
-            {"name": "Design", "value": 20},
-            {"name": "Management", "value": 10}
-        ],
-        "path_completion_stats": [
-            {"name": "Full Stack", "completed": 65, "in_progress": 35},
-            {"name": "Data Science", "completed": 45, "in_progress": 55},
-            {"name": "DevOps", "completed": 30, "in_progress": 70},
-            {"name": "Mobile Dev", "completed": 55, "in_progress": 45}
-        ],
-        "engagement_by_channel": [
-            {"channel": "general", "active_members": 45, "messages": 1240},
-            {"channel": "help", "active_members": 32, "messages": 856},
-            {"channel": "random", "active_members": 28, "messages": 645},
-            {"channel": "announcements", "active_members": 50, "messages": 120}
-        ],
-        "insights_feed": [
-            {"id": 1, "tag": "Growth", "title": "Member surge detected", "description": "15% increase in new members this week."},
-            {"id": 2, "tag": "Engagement", "title": "High chat activity", "description": "#general channel is trending with 500+ messages."},
-            {"id": 3, "tag": "Learning", "title": "React path popular", "description": "40% of members are currently enrolled in React Mastery."},
-            {"id": 4, "tag": "Risk", "title": "Stalled progress", "description": "5 members haven't logged in for 2 weeks."}
-        ]
-    }
+@cached("members", "tasks", "learning_paths", "member_skills", "analytics_counters", "analytics_snapshots",
+        ttl=60)
+async def get_analytics(
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    session_factory = Depends(get_session_factory),
+):
+    # Counters and the snapshot only; the base tables are never scanned here
+    payload, stale = await db.run_sync(analytics.live_analytics)
+    if stale:
+        background_tasks.add_task(analytics.regenerate, session_factory)
+    return payload
 
 @router.post("/analytics/regenerate")
-def regenerate_analytics(db: Session = Depends(get_db)):
+async def regenerate_analytics(background_tasks: BackgroundTasks, session_factory = Depends(get_session_factory)):
+    background_tasks.add_task(analytics.regenerate, session_factory)
     return {"status": "success", "message": "Analytics regeneration started"}
+
+@router.post("/admin/analytics/reconcile")
+async def reconcile_analytics(db: AsyncSession = Depends(get_async_db)):
+    drift = await db.run_sync(analytics.reconcile)
+    return {"status": "success", "drift": drift}
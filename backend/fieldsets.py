@@ -0,0 +1,93 @@
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import joinedload, lazyload, load_only, selectinload
+
+import models, schemas
+
+# Sparse fieldsets: ?fields=id,name,initials returns just those keys and loads
+# just those columns (load_only) and link tables (selectinload); everything
+# else stays unloaded. `id` is always included. List views leave out their
+# heavy fields unless asked for, e.g. GET /tasks omits `logs` and GET /paths
+# `modules`.
+#
+# Related rows: ?include=tasks,learning_path nests them in each item, loaded
+# for the whole page at once (joinedload for many-to-one, selectinload for
+# collections) rather than one query per row.
+
+
+class Fieldset:
+    def __init__(self, schema, model, links: Dict[str, str] = None, list_exclude: Sequence[str] = (),
+                 includes: Dict[str, tuple] = None, computed: Dict[str, Callable] = None):
+        self.model = model
+        self.fields: Tuple[str, ...] = tuple(schema.model_fields)
+        self.links = links or {} # field -> relationship it is read from
+        self.computed = computed or {} # field -> dump function; the route fills these in after loading
+        self.list_default = tuple(f for f in self.fields if f not in list_exclude)
+        self.includes = includes or {} # relationship -> (loader, schema of its rows)
+
+    def select(self, fields: Optional[str], list_view: bool = False) -> Tuple[str, ...]:
+        """Requested field names in schema order; the view's default when `fields` is empty."""
+        if not fields:
+            return self.list_default if list_view else self.fields
+        wanted = self._parse(fields, self.fields, "fields")
+        wanted.add("id")
+        return tuple(f for f in self.fields if f in wanted)
+
+    def select_includes(self, include: Optional[str]) -> Tuple[str, ...]:
+        if not include:
+            return ()
+        wanted = self._parse(include, self.includes, "include")
+        return tuple(name for name in self.includes if name in wanted)
+
+    @staticmethod
+    def _parse(value: str, allowed, what: str) -> set:
+        wanted = {name.strip() for name in value.split(",") if name.strip()}
+        unknown = wanted.difference(allowed)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown {what}: {', '.join(sorted(unknown))}")
+        return wanted
+
+    def is_full(self, names: Sequence[str], includes: Sequence[str] = ()) -> bool:
+        """True when the plain response schema describes the output."""
+        return len(names) == len(self.fields) and not includes
+
+    def options(self, names: Sequence[str], includes: Sequence[str] = ()):
+        columns = [getattr(self.model, n) for n in names if n not in self.links and n not in self.computed]
+        # updated_at for the keyset cursor
+        options = [load_only(*columns, self.model.updated_at)]
+        for field, relationship in self.links.items():
+            attr = getattr(self.model, relationship)
+            options.append(selectinload(attr) if field in names else lazyload(attr))
+        for name in includes:
+            loader, _ = self.includes[name]
+            options.append(loader(getattr(self.model, name)))
+        return options
+
+    def dump(self, obj, names: Sequence[str], includes: Sequence[str] = ()) -> dict:
+        item = {n: self.computed[n](obj) if n in self.computed else getattr(obj, n) for n in names}
+        for name in includes:
+            _, schema = self.includes[name]
+            related = getattr(obj, name)
+            if isinstance(related, list):
+                item[name] = [schema.model_validate(r).model_dump(mode="json") for r in related]
+            else:
+                item[name] = schema.model_validate(related).model_dump(mode="json") if related is not None else None
+        return item
+
+
+MEMBER_FIELDS = Fieldset(schemas.Member, models.Member,
+                         links={"skills": "member_skills", "interests": "member_interests"},
+                         includes={"tasks": (selectinload, schemas.Task),
+                                   "learning_path": (joinedload, schemas.LearningPath)})
+def _task_logs(task):
+    return None if task.logs is None else [schemas.TaskLog.model_validate(log).model_dump() for log in task.logs]
+
+
+TASK_FIELDS = Fieldset(schemas.Task, models.Task, list_exclude=("logs",), computed={"logs": _task_logs},
+                       includes={"assignee": (joinedload, schemas.Member),
+                                 "path": (joinedload, schemas.LearningPath)})
+PATH_FIELDS = Fieldset(schemas.LearningPath, models.LearningPath,
+                       links={"skill_tags": "path_tags", "modules": "path_modules"}, list_exclude=("modules",),
+                       includes={"tasks": (selectinload, schemas.Task),
+                                 "members": (selectinload, schemas.Member)})
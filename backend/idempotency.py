@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from decouple import config
+from fastapi import Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+
+from cache import TTLCache
+from metrics import REQUESTS_COALESCED
+from response_cache import CachedRoute, cache_key
+
+# Duplicate requests.
+#
+# Writes: a POST/PUT/PATCH sent with an Idempotency-Key header runs once. Its
+# response is kept for TTL seconds (at most MAX_KEYS of them, least recently
+# used dropped first) and a retry with the same key, method and path is
+# answered from it, marked Idempotent-Replayed, without reaching the route. A
+# retry that arrives while the first is still running waits for it. Reusing a
+# key for a different body is a 422. Client errors (4xx, including validation
+# failures) are kept like any response; server errors are not, so a retry
+# after one runs again.
+#
+# Reads: identical GETs in flight at the same time (same URL, credentials and
+# conditional headers) share one execution, e.g. a stampede on /analytics.
+
+TTL = config("IDEMPOTENCY_TTL", default=24 * 3600, cast=int) # seconds
+MAX_KEYS = config("IDEMPOTENCY_MAX_KEYS", default=10000, cast=int)
+MAX_KEY_LENGTH = 255
+
+WRITE_METHODS = ("POST", "PUT", "PATCH")
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: bytes
+    headers: List[Tuple[bytes, bytes]]
+    fingerprint: Optional[str] = None
+
+    @classmethod
+    def of(cls, response: Response, fingerprint: Optional[str] = None) -> Optional["StoredResponse"]:
+        """A copy of `response`, or None for streamed ones, which can't be replayed."""
+        if not hasattr(response, "body"):
+            return None
+        headers = [(k, v) for k, v in response.raw_headers if k != b"content-length"]
+        return cls(response.status_code, response.body, headers, fingerprint)
+
+    def response(self, **headers: str) -> Response:
+        out = Response(self.body, status_code=self.status_code)
+        out.raw_headers.extend(self.headers)
+        out.headers.update(headers)
+        return out
+
+
+class SingleFlight:
+    """Runs concurrent calls with the same key once; the others get the leader's shared result.
+
+    Followers get None when the leader failed or had nothing to share.
+    Coalescing is per event loop.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> Optional[asyncio.Future]:
+        call = self._calls.get(key)
+        return call if call is not None and call.get_loop() is asyncio.get_running_loop() else None
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable], share: Callable) -> Tuple[object, bool]:
+        """(result, True) for a follower, (fn's result, False) for the leader."""
+        call = self.in_flight(key)
+        if call is not None:
+            return await asyncio.shield(call), True
+        call = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        shared = None
+        try:
+            result = await fn()
+            shared = share(result)
+            return result, False
+        finally:
+            del self._calls[key]
+            call.set_result(shared)
+
+
+idempotency_store = TTLCache(maxsize=MAX_KEYS, ttl=TTL)
+_writes = SingleFlight()
+_reads = SingleFlight()
+
+
+def _fingerprint(request: Request, body: bytes) -> str:
+    return hashlib.sha256(request.url.query.encode() + b"\0" + body).hexdigest()
+
+
+async def _error_response(request: Request, exc: Exception) -> Response:
+    """`exc` rendered by the app's own handler for it, as the middleware would."""
+    for cls in type(exc).__mro__:
+        handler = request.app.exception_handlers.get(cls)
+        if handler is not None:
+            if asyncio.iscoroutinefunction(handler):
+                return await handler(request, exc)
+            return await run_in_threadpool(handler, request, exc)
+    raise exc
+
+
+class IdempotentRoute(CachedRoute):
+    """Route class adding Idempotency-Key handling to writes and single-flight to reads."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def write_handler(request: Request) -> Response:
+            key = request.headers.get("idempotency-key")
+            if not key:
+                return await handler(request)
+            if len(key) > MAX_KEY_LENGTH:
+                return JSONResponse({"detail": "Idempotency-Key is too long"}, status_code=400)
+            scope = (key, request.method, request.url.path, request.headers.get("authorization"))
+            fingerprint = _fingerprint(request, await request.body()) # The body is cached for the route
+
+            async def run():
+                # Client errors are raised, not returned; render them here so they're kept too
+                try:
+                    return await handler(request)
+                except (HTTPException, RequestValidationError) as exc:
+                    return await _error_response(request, exc)
+
+            def keep(response):
+                stored = StoredResponse.of(response, fingerprint) if response.status_code < 500 else None
+                if stored is not None:
+                    idempotency_store.set(scope, stored)
+                return stored
+
+            while True:
+                stored = idempotency_store.get(scope)
+                if stored is not None:
+                    if stored.fingerprint != fingerprint:
+                        return JSONResponse({"detail": "Idempotency-Key was used for a different request"},
+                                            status_code=422)
+                    REQUESTS_COALESCED.labels("idempotent_replay").inc()
+                    return stored.response(**{"Idempotent-Replayed": "true"})
+                response, follower = await _writes.run(scope, run, keep)
+                if not follower:
+                    return response
+                if response is None:
+                    # The first attempt failed: run this one
+                    return await run()
+                # Loop back to replay it (or report a different body)
+
+        async def read_handler(request: Request) -> Response:
+            scope = (cache_key(request), request.headers.get("authorization"),
+                     request.headers.get("if-none-match"), request.headers.get("accept"))
+            response, follower = await _reads.run(scope, lambda: handler(request), StoredResponse.of)
+            if not follower:
+                return response
+            if response is None:
+                return await handler(request)
+            REQUESTS_COALESCED.labels("single_flight").inc()
+            return response.response()
+
+        async def route_handler(request: Request) -> Response:
+            if request.method in WRITE_METHODS:
+                return await write_handler(request)
+            if request.method == "GET":
+                return await read_handler(request)
+            return await handler(request)
+
+        return route_handler
@@ -1,36 +1,88 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from endpoints import router as api_router
-from database import engine, Base
+from database import engine, Base, SessionLocal
+from auth import HashingOverloaded, shutdown_hash_pool
+import analytics
+import bot_handlers
+from activity import activity_log
+import metrics
+import asyncio
 
 # Create tables on startup (simple dev mode)
 Base.metadata.create_all(bind=engine)
 
+import logging
 import time
 from fastapi import Request
 
 # ... (imports)
 
 app = FastAPI(title="Zoho LMS API")
+logger = logging.getLogger("zoho.access")
 
-# Logging Middleware
+# Logging / Metrics Middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    print(f"{request.method} {request.url.path} - {response.status_code} - {process_time:.4f}s")
-    return response
+    method = request.method
+    in_progress = metrics.HTTP_REQUESTS_IN_PROGRESS.labels(method)
+    in_progress.inc()
+    start_time = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        process_time = time.perf_counter() - start_time
+        in_progress.dec()
+        # Label by route template, not raw path, to keep cardinality bounded
+        template = metrics.route_template(request.scope)
+        metrics.HTTP_REQUESTS_TOTAL.labels(method, template, str(status_code)).inc()
+        metrics.HTTP_REQUEST_DURATION.labels(method, template).observe(process_time)
+        logger.debug("%s %s - %s - %.4fs", method, request.url.path, status_code, process_time)
+
+@app.exception_handler(HashingOverloaded)
+async def hashing_overloaded_handler(request: Request, exc: HashingOverloaded):
+    return JSONResponse(status_code=503, content={"detail": "Server busy, please retry"},
+                        headers={"Retry-After": "1"})
+
+@app.on_event("shutdown")
+def stop_hash_pool():
+    shutdown_hash_pool()
+
+@app.on_event("startup")
+async def start_analytics_maintenance():
+    # Periodic counter reconciliation + snapshot refresh
+    app.state.analytics_maintenance = None
+    if analytics.RECONCILE_INTERVAL > 0:
+        app.state.analytics_maintenance = asyncio.create_task(analytics.maintenance_loop(SessionLocal))
+
+@app.on_event("startup")
+def start_activity_writer():
+    activity_log.start(SessionLocal)
+
+@app.on_event("shutdown")
+def stop_activity_writer():
+    # Drains the queue before the process exits
+    activity_log.stop()
+
+@app.on_event("shutdown")
+def stop_bot_workers():
+    # Lets deferred bot commands finish and deliver their replies
+    bot_handlers.deferred.shutdown()
+
+@app.on_event("shutdown")
+async def stop_analytics_maintenance():
+    if app.state.analytics_maintenance is not None:
+        app.state.analytics_maintenance.cancel()
 
 # ... (CORS)
 
 @app.get("/metrics")
 def get_metrics():
-    # Stub for Prometheus
-    return {
-        "http_requests_total": 100, # Mock
-        "http_request_duration_seconds": 0.5
-    }
+    return Response(metrics.generate_latest(), media_type=metrics.CONTENT_TYPE)
 
 # CORS Configuration
 origins = ["*"] # Allow all for demo/testing purposes
@@ -41,6 +93,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Idempotent-Replayed"],
 )
 
 # Include Router
@@ -0,0 +1,222 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+# Minimal Prometheus client: counters, gauges and fixed-bucket histograms with
+# labels, rendered in the text exposition format. Each labelled child has its
+# own uncontended lock, so recording costs a dict lookup and one lock round-trip.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self, values, child) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for values, child in list(self._children.items()):
+            lines.extend(self._samples(values, child))
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _samples(self, values, child):
+        return [f"{self.name}{_labels(self.labelnames, values)} {_number(child.value)}"]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "lock")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _samples(self, values, child):
+        with child.lock:
+            counts, total = list(child.counts), child.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _labels(self.labelnames + ("le",), tuple(values) + (_number(bound),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_number(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def route_template(scope) -> str:
+    """Matched route template (e.g. /api/members/{id}) for a request scope."""
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = route.path
+    path = scope["path"]
+    if not route.path_regex.match(path):
+        # Routes of an included router may be stored without the include prefix
+        keep = path.count("/") - template.count("/")
+        template = "/".join(path.split("/")[:keep + 1]) + template
+    return template
+
+
+def generate_latest() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+# --- Application metrics ---
+
+HTTP_REQUESTS_TOTAL = Counter(
+    "http_requests_total", "HTTP requests by method, route template and status.",
+    ("method", "route", "status"))
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template.",
+    ("method", "route"))
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served.", ("method",))
+DB_SESSION_CHECKOUT = Histogram(
+    "db_session_checkout_seconds", "Time a pooled DB connection stays checked out.")
+DB_CONNECTIONS_CHECKED_OUT = Gauge(
+    "db_connections_checked_out", "Pooled DB connections currently checked out.")
+RECOMMENDER_DURATION = Histogram(
+    "recommender_duration_seconds", "Recommender latency by operation.", ("operation",))
+ANALYTICS_COUNTER_DRIFT = Gauge(
+    "analytics_counter_drift", "Analytics counters that differed from a full recount at the last reconciliation.")
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total", "Cacheable GET requests by outcome (hit, miss, not_modified).", ("result",))
+ACTIVITY_QUEUE_DEPTH = Gauge(
+    "activity_queue_depth", "Activity log entries waiting to be written.")
+ACTIVITY_WRITTEN = Counter(
+    "activity_entries_written_total", "Activity log entries written to the database.")
+ACTIVITY_DROPPED = Counter(
+    "activity_entries_dropped_total", "Activity log entries dropped (queue full or write failed).")
+BOT_COMMAND_DURATION = Histogram(
+    "bot_command_duration_seconds", "Bot command handler latency by command.", ("command",))
+BOT_COMMANDS_OVER_BUDGET = Counter(
+    "bot_commands_over_budget_total", "Bot commands answered with a \"still working\" reply after their budget ran out.",
+    ("command",))
+BOT_DEFERRED_QUEUE_DEPTH = Gauge(
+    "bot_deferred_queue_depth", "Slow bot commands queued or running, awaiting callback delivery.")
+BOT_COMMANDS_DEDUPLICATED = Counter(
+    "bot_commands_deduplicated_total", "Slow bot commands not queued because an identical one was in flight.",
+    ("command",))
+BOT_CALLBACKS = Counter(
+    "bot_callbacks_total", "Deferred bot replies POSTed to their callback URL, by outcome.", ("result",))
+REQUESTS_COALESCED = Counter(
+    "requests_coalesced_total",
+    "Requests answered with another request's response (idempotent_replay, single_flight).", ("reason",))
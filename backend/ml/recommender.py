@@ -1,62 +1,124 @@
+import threading
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from typing import List, Dict
+from typing import Callable, Iterator, List, Dict, Optional
+from ml.retrieval import build_engine
+
+MIN_SCORE = 0.05 # Filter out very low relevance
+BATCH_CHUNK_SIZE = 1024 # Members scored per sparse matmul
 
-def recommend_for_member(member_skills: List[str], available_modules: List[Dict], top_k=3):
-    if not available_modules:
-        return []
 
-    # 1. Prepare data for TF-IDF
-    # Member profile is a string of their skills
-    member_profile = " ".join(member_skills)
-    
+def module_profile(module: Dict) -> str:
     # Module profiles are strings of their tags (and maybe title)
-    module_profiles = [" ".join(m['tags']) + " " + m['title'] for m in available_modules]
-    
-    # Combine all documents to fit the vectorizer
-    all_docs = [member_profile] + module_profiles
-    
-    # 2. Vectorize
-    vectorizer = TfidfVectorizer(stop_words='english')
-    try:
-        tfidf_matrix = vectorizer.fit_transform(all_docs)
-    except ValueError:
-        # Handle empty vocabulary or stop words issues
-        return []
-    
-    # 3. Calculate Similarity
-    # Member vector is at index 0
-    member_vec = tfidf_matrix[0:1]
-    # Module vectors are from index 1 onwards
-    module_vecs = tfidf_matrix[1:]
-    
-    cosine_similarities = cosine_similarity(member_vec, module_vecs).flatten()
-    
-    # 4. Rank and Format
-    recommendations = []
-    for i, score in enumerate(cosine_similarities):
-        if score > 0.05: # Filter out very low relevance
-            recommendations.append({
-                "module": available_modules[i]['title'],
-                "score": float(score),
-                "reason": f"Matches your skills ({int(score*100)}% match)"
-            })
-    
-    # Sort by score descending
-    recommendations.sort(key=lambda x: x['score'], reverse=True)
-    
-    # Fallback if no matches found (e.g. new user with no skills)
-    if not recommendations:
-        # Recommend popular or beginner modules (mock logic)
-        for module in available_modules[:top_k]:
-             recommendations.append({
-                "module": module['title'],
-                "score": 0.0,
-                "reason": "Popular for beginners"
-            })
-            
-    return recommendations[:top_k]
+    return " ".join(module.get('tags') or []) + " " + module['title']
+
+
+class ModuleIndex:
+    """Fitted TF-IDF vocabulary plus an L2-normalised sparse module matrix.
+
+    Built once per catalog version; retrieval is delegated to a pluggable engine
+    (see ml.retrieval) so large catalogs can use an approximate search.
+    """
+
+    def __init__(self, modules: List[Dict], engine: Optional[str] = None):
+        self.modules = list(modules)
+        self.vectorizer: Optional[TfidfVectorizer] = None
+        self.matrix = None
+        self.engine = None
+        if not self.modules:
+            return
+        vectorizer = TfidfVectorizer(stop_words='english')
+        try:
+            # norm='l2' (the default) makes the dot product a cosine similarity
+            self.matrix = vectorizer.fit_transform([module_profile(m) for m in self.modules]).tocsr()
+        except ValueError:
+            # Handle empty vocabulary or stop words issues
+            return
+        self.vectorizer = vectorizer
+        self.engine = build_engine(self.matrix, engine)
+
+    def __len__(self):
+        return len(self.modules)
+
+    def vectorize(self, profiles: List[str]):
+        return self.vectorizer.transform(profiles)
+
+    def recommend(self, member_skills: List[str], top_k=3) -> List[Dict]:
+        if not self.modules or self.vectorizer is None:
+            return []
+        indices, scores = self.engine.search(self.vectorize([" ".join(member_skills)]), top_k)
+        return self.format(indices[0], scores[0], top_k)
+
+    def recommend_batch(self, skill_lists: List[List[str]], top_k=3,
+                        chunk_size=BATCH_CHUNK_SIZE) -> Iterator[List[Dict]]:
+        """Yield recommendations per member, scoring a chunk of members per matmul."""
+        if not self.modules or self.vectorizer is None:
+            for _ in skill_lists:
+                yield []
+            return
+        for start in range(0, len(skill_lists), chunk_size):
+            chunk = skill_lists[start:start + chunk_size]
+            member_matrix = self.vectorize([" ".join(skills) for skills in chunk])
+            indices, scores = self.engine.search(member_matrix, top_k)
+            for row_indices, row_scores in zip(indices, scores):
+                yield self.format(row_indices, row_scores, top_k)
+
+    def format(self, indices: np.ndarray, scores: np.ndarray, top_k=3) -> List[Dict]:
+        recommendations = []
+        for i, score in zip(indices, scores):
+            score = float(score)
+            if i >= 0 and score > MIN_SCORE:
+                recommendations.append({
+                    "module": self.modules[i]['title'],
+                    "score": score,
+                    "reason": f"Matches your skills ({int(score*100)}% match)"
+                })
+
+        # Fallback if no matches found (e.g. new user with no skills)
+        if not recommendations:
+            # Recommend popular or beginner modules (mock logic)
+            for module in self.modules[:top_k]:
+                recommendations.append({
+                    "module": module['title'],
+                    "score": 0.0,
+                    "reason": "Popular for beginners"
+                })
+
+        return recommendations[:top_k]
+
+
+class ModuleIndexCache:
+    """Process-wide ModuleIndex, rebuilt lazily after path writes mark it stale."""
+
+    def __init__(self):
+        self._index: Optional[ModuleIndex] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, load_modules: Callable[[], List[Dict]]) -> ModuleIndex:
+        index = self._index
+        if index is not None:
+            return index
+        with self._lock:
+            if self._index is not None:
+                return self._index
+            generation = self._generation
+            index = ModuleIndex(load_modules())
+            # A write that landed mid-build leaves the cache empty for the next reader
+            if generation == self._generation:
+                self._index = index
+            return index
+
+    def invalidate(self):
+        self._generation += 1
+        self._index = None
+
+
+module_index_cache = ModuleIndexCache()
+
+
+def recommend_for_member(member_skills: List[str], available_modules: List[Dict], top_k=3):
+    return ModuleIndex(available_modules).recommend(member_skills, top_k)
 
 if __name__ == "__main__":
     # Demo
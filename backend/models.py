@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, JSON, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, JSON, Text, Index, event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, relationship
 from datetime import datetime
 from database import Base
 
@@ -9,22 +10,65 @@ class Member(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     email = Column(String, unique=True, index=True)
-    role = Column(String)
+    role = Column(String, index=True)
     avatar = Column(String, nullable=True)
     initials = Column(String)
     password_hash = Column(String, nullable=True)
     participation_score = Column(Integer, default=0)
-    learning_path_status = Column(String, default="Not Started")
+    learning_path_status = Column(String, default="Not Started", index=True)
     primary_skill = Column(String, nullable=True)
     learning_path_id = Column(Integer, ForeignKey("learning_paths.id"), nullable=True)
-    skills = Column(JSON, default=list) # List of dicts or strings
-    interests = Column(JSON, default=list)
     joined_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     tasks = relationship("Task", back_populates="assignee")
     learning_path = relationship("LearningPath", back_populates="members")
+    member_skills = relationship("MemberSkill", order_by="MemberSkill.position", lazy="selectin",
+                                 cascade="all, delete-orphan", passive_deletes=True)
+    member_interests = relationship("MemberInterest", order_by="MemberInterest.position", lazy="selectin",
+                                    cascade="all, delete-orphan", passive_deletes=True)
+
+    # Keyset pagination on (updated_at, id)
+    __table_args__ = (Index("ix_members_updated_at_id", "updated_at", "id"),)
+
+    # The API still exchanges skills/interests as lists; these map them onto the link tables
+
+    @property
+    def skills(self):
+        return [{"name": link.skill_name, "proficiency": link.proficiency} for link in self.member_skills]
+
+    @skills.setter
+    def skills(self, skills):
+        wanted = {}
+        for skill in skills or []:
+            if isinstance(skill, str):
+                skill = {"name": skill}
+            if skill.get("name"):
+                wanted.setdefault(skill["name"], skill.get("proficiency") or "Beginner")
+        self.member_skills = sync_links(self.member_skills, wanted, lambda name: MemberSkill(skill_name=name))
+        for link in self.member_skills:
+            link.proficiency = wanted[link.skill_name]
+        self.updated_at = datetime.utcnow()
+
+    def add_skill(self, name, proficiency="Beginner"):
+        """Append one skill (a single member_skills row); False if already present."""
+        if any(link.skill_name == name for link in self.member_skills):
+            return False
+        position = self.member_skills[-1].position + 1 if self.member_skills else 0
+        self.member_skills.append(MemberSkill(skill_name=name, proficiency=proficiency, position=position))
+        self.updated_at = datetime.utcnow()
+        return True
+
+    @property
+    def interests(self):
+        return [link.skill_name for link in self.member_interests]
+
+    @interests.setter
+    def interests(self, interests):
+        wanted = dict.fromkeys(name for name in interests or [] if name)
+        self.member_interests = sync_links(self.member_interests, wanted, lambda name: MemberInterest(skill_name=name))
+        self.updated_at = datetime.utcnow()
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -32,20 +76,43 @@ class Task(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(Text, nullable=True)
-    status = Column(String, default="Pending")
-    priority = Column(String, default="Medium")
+    status = Column(String, default="Pending", index=True)
+    priority = Column(String, default="Medium", index=True)
     due_date = Column(DateTime, nullable=True)
     skill_focus = Column(String, default="General")
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    assigned_to = Column(Integer, ForeignKey("members.id"), nullable=True)
+    assigned_to = Column(Integer, ForeignKey("members.id"), nullable=True, index=True)
     assignee = relationship("Member", back_populates="tasks")
     
-    path_id = Column(Integer, ForeignKey("learning_paths.id"), nullable=True)
+    path_id = Column(Integer, ForeignKey("learning_paths.id"), nullable=True, index=True)
     path = relationship("LearningPath", back_populates="tasks")
-    
-    logs = Column(JSON, default=list)
+
+    # Never loaded for reading (see task_logs); here so deleting a task deletes its log
+    log_entries = relationship("TaskLogEntry", cascade="all, delete-orphan")
+
+    __table_args__ = (Index("ix_tasks_updated_at_id", "updated_at", "id"),)
+
+    _recent_logs = None
+
+    @property
+    def logs(self):
+        """The latest log entries, oldest first, once task_logs.attach_recent has loaded them."""
+        return self._recent_logs
+
+class TaskLogEntry(Base):
+    __tablename__ = "task_log_entries"
+
+    # Append-only: progress logs are inserted one row each, never rewritten
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    member_id = Column(Integer, ForeignKey("members.id"), nullable=True)
+    message = Column(Text, nullable=False)
+    details = Column(JSON(none_as_null=True), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_task_log_entries_task_id_created_at", "task_id", "created_at"),)
 
 class LearningPath(Base):
     __tablename__ = "learning_paths"
@@ -54,16 +121,38 @@ class LearningPath(Base):
     name = Column(String, index=True)
     description = Column(Text)
     difficulty = Column(String)
-    skill_tags = Column(JSON, default=list)
     estimated_duration = Column(String)
     completion_rate = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    modules = Column(JSON, default=list)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     tasks = relationship("Task", back_populates="path")
     members = relationship("Member", back_populates="learning_path")
+    path_tags = relationship("PathTag", order_by="PathTag.position", lazy="selectin",
+                             cascade="all, delete-orphan", passive_deletes=True)
+    path_modules = relationship("PathModule", order_by="PathModule.position", lazy="selectin",
+                                cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (Index("ix_learning_paths_updated_at_id", "updated_at", "id"),)
+
+    @property
+    def skill_tags(self):
+        return [link.skill_name for link in self.path_tags]
+
+    @skill_tags.setter
+    def skill_tags(self, tags):
+        wanted = dict.fromkeys(name for name in tags or [] if name)
+        self.path_tags = sync_links(self.path_tags, wanted, lambda name: PathTag(skill_name=name))
+        self.updated_at = datetime.utcnow()
+
+    @property
+    def modules(self):
+        return [module.as_dict() for module in self.path_modules]
+
+    @modules.setter
+    def modules(self, modules):
+        self.path_modules = [PathModule.from_dict(module, position=i) for i, module in enumerate(modules or [])]
+        self.updated_at = datetime.utcnow()
 
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
@@ -73,7 +162,10 @@ class ActivityLog(Base):
     type = Column(String)
     description = Column(String)
     metadata_json = Column(JSON, default=dict) # 'metadata' is reserved in SQLAlchemy sometimes
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # A member's activity, newest first
+    __table_args__ = (Index("ix_activity_logs_member_id_created_at", "member_id", "created_at"),)
 
 class Settings(Base):
     __tablename__ = "settings"
@@ -84,3 +176,142 @@ class Settings(Base):
     bot_enabled = Column(Boolean, default=True)
     in_app_notifications = Column(Boolean, default=True)
     email_notifications = Column(Boolean, default=False)
+
+class AnalyticsSnapshot(Base):
+    __tablename__ = "analytics_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    payload = Column(JSON, nullable=False)
+    generated_at = Column(DateTime, default=datetime.utcnow)
+
+class AnalyticsCounter(Base):
+    __tablename__ = "analytics_counters"
+
+    # e.g. ("tasks_by_status", "Completed"), ("tasks_by_path", "3:Pending"), ("skills", "Python")
+    metric = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+# --- Skills and the tables linking them to members and paths ---
+
+class Skill(Base):
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False, index=True)
+
+class SkillLink:
+    """Link rows name their skill before it is resolved; resolve_skills fills skill in on flush."""
+    _pending_name = None
+
+    @property
+    def skill_name(self):
+        return self.skill.name if self.skill is not None else self._pending_name
+
+    @skill_name.setter
+    def skill_name(self, name):
+        self._pending_name = name
+        self.skill = None
+
+class MemberSkill(SkillLink, Base):
+    __tablename__ = "member_skills"
+
+    member_id = Column(Integer, ForeignKey("members.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+    proficiency = Column(String, default="Beginner")
+    position = Column(Integer, default=0)
+
+    skill = relationship(Skill, lazy="joined", innerjoin=True)
+
+    # "Who has skill X": the PK covers member -> skills, this covers skill -> members
+    __table_args__ = (Index("ix_member_skills_skill_id_member_id", "skill_id", "member_id"),)
+
+class MemberInterest(SkillLink, Base):
+    __tablename__ = "member_interests"
+
+    member_id = Column(Integer, ForeignKey("members.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+    position = Column(Integer, default=0)
+
+    skill = relationship(Skill, lazy="joined", innerjoin=True)
+
+    __table_args__ = (Index("ix_member_interests_skill_id_member_id", "skill_id", "member_id"),)
+
+class PathTag(SkillLink, Base):
+    __tablename__ = "path_tags"
+
+    path_id = Column(Integer, ForeignKey("learning_paths.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+    position = Column(Integer, default=0)
+
+    skill = relationship(Skill, lazy="joined", innerjoin=True)
+
+    # "Which paths cover tag Y"
+    __table_args__ = (Index("ix_path_tags_skill_id_path_id", "skill_id", "path_id"),)
+
+class PathModule(Base):
+    __tablename__ = "path_modules"
+
+    id = Column(Integer, primary_key=True)
+    path_id = Column(Integer, ForeignKey("learning_paths.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, default=0)
+    title = Column(String, nullable=False)
+    status = Column(String, nullable=True)
+    details = Column(JSON(none_as_null=True), nullable=True) # Any other keys the module was created with
+
+    __table_args__ = (Index("ix_path_modules_path_id_position", "path_id", "position"),)
+
+    @classmethod
+    def from_dict(cls, module, position=0):
+        module = dict(module)
+        title = module.pop("title", "")
+        status = module.pop("status", None)
+        return cls(position=position, title=title, status=status, details=module or None)
+
+    def as_dict(self):
+        module = {"title": self.title}
+        if self.status is not None:
+            module["status"] = self.status
+        module.update(self.details or {})
+        return module
+
+def sync_links(links, wanted, make_link):
+    """Reuse the links for names in `wanted` (keeping order), create the rest."""
+    existing = {link.skill_name: link for link in links}
+    result = []
+    for position, name in enumerate(wanted):
+        link = existing.get(name) or make_link(name)
+        link.position = position
+        result.append(link)
+    return result
+
+def resolve_skill_ids(connection, names):
+    """name -> skills.id, inserting names that don't exist yet."""
+    names = sorted(set(names))
+    if not names:
+        return {}
+    table = Skill.__table__
+    dialect = {"sqlite": sqlite, "postgresql": postgresql}.get(connection.dialect.name)
+    if dialect is not None:
+        # Concurrent writers may add the same new skill; let the unique index settle it
+        connection.execute(dialect.insert(table).on_conflict_do_nothing(index_elements=[table.c.name]),
+                           [{"name": n} for n in names])
+        return dict(connection.execute(select(table.c.name, table.c.id).where(table.c.name.in_(names))).all())
+    found = dict(connection.execute(select(table.c.name, table.c.id).where(table.c.name.in_(names))).all())
+    missing = [n for n in names if n not in found]
+    if missing:
+        connection.execute(table.insert(), [{"name": n} for n in missing])
+        found.update(connection.execute(select(table.c.name, table.c.id).where(table.c.name.in_(missing))).all())
+    return found
+
+@event.listens_for(Session, "before_flush")
+def resolve_skills(session, flush_context, instances):
+    pending = [obj for obj in session.new if isinstance(obj, SkillLink) and obj.skill is None]
+    if not pending:
+        return
+    ids = resolve_skill_ids(session.connection(), [link._pending_name for link in pending])
+    with session.no_autoflush:
+        skills = {s.id: s for s in session.scalars(select(Skill).where(Skill.id.in_(ids.values())))}
+    for link in pending:
+        link.skill = skills[ids[link._pending_name]]
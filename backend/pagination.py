@@ -0,0 +1,85 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+SORT_KEYS = ("id", "updated_at")
+TIMESTAMP_SORTS = ("updated_at", "created_at")
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(row, sort: str) -> str:
+    payload = {"s": sort, "id": row.id}
+    column = sort.lstrip("-")
+    if column in TIMESTAMP_SORTS:
+        payload["u"] = getattr(row, column).isoformat()
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort: str) -> dict:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, dict) or payload.get("s") != sort or not isinstance(payload.get("id"), int):
+            raise ValueError("cursor does not match sort order")
+        if sort.lstrip("-") in TIMESTAMP_SORTS:
+            payload["u"] = datetime.fromisoformat(payload["u"])
+        return payload
+    except (KeyError, ValueError, TypeError, AttributeError, json.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_statement(statement, model, limit: int, cursor: Optional[str] = None, sort: str = "id"):
+    """Order `statement` by the sort key, resume after `cursor`, and fetch limit + 1 rows.
+
+    `sort` is "id" or a timestamp column (ties broken by id); a leading "-"
+    means newest first. Timestamp columns are NOT NULL and compared bare, so
+    each page is an index range scan on (column, id) with no sort.
+    """
+    column, descending = sort.lstrip("-"), sort.startswith("-")
+    if column in TIMESTAMP_SORTS:
+        timestamp = getattr(model, column)
+        order = (timestamp, model.id)
+    else:
+        order = (model.id,)
+
+    if cursor:
+        after = decode_cursor(cursor, sort)
+        past = (lambda col, value: col < value) if descending else (lambda col, value: col > value)
+        if column in TIMESTAMP_SORTS:
+            statement = statement.where(or_(
+                past(timestamp, after["u"]),
+                and_(timestamp == after["u"], past(model.id, after["id"])),
+            ))
+        else:
+            statement = statement.where(past(model.id, after["id"]))
+
+    return statement.order_by(*(c.desc() if descending else c for c in order)).limit(limit + 1)
+
+
+def trim_page(rows, response: Response, limit: int, sort: str = "id"):
+    """Drop the look-ahead row, setting X-Next-Cursor if there was one.
+
+    Rows may be ORM objects or named tuples with `id` (and `updated_at`).
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1], sort)
+    return rows
+
+
+async def paginate(db, statement, model, response: Response, limit: int = DEFAULT_PAGE_SIZE,
+                   cursor: Optional[str] = None, sort: str = "id"):
+    """Keyset pagination over `id` or `(updated_at, id)`.
+
+    Fetches one extra row to know whether another page exists; the token for it
+    is returned in the X-Next-Cursor header so the body stays a plain list.
+    """
+    rows = (await db.scalars(keyset_statement(statement, model, limit, cursor, sort))).all()
+    return trim_page(rows, response, limit, sort)
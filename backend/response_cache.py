@@ -0,0 +1,284 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, Optional, Sequence
+
+from decouple import config
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from cache import SizedLRUCache
+from metrics import RESPONSE_CACHE_REQUESTS
+
+# Response cache for read-heavy GET routes. Every table has a version number,
+# bumped when a transaction that wrote to it commits (the session hooks at the
+# bottom see ORM flushes and insert/update/delete statements). A cached route's
+# ETag is a hash of its path, query string and the versions of the tables it
+# reads, so:
+#   - a matching If-None-Match gets a 304 before the route's dependencies run,
+#     i.e. without opening a session, querying or serializing;
+#   - otherwise the last body for that URL is reused while its ETag still holds.
+#
+# Versions live in this process by default. With several workers, point
+# RESPONSE_CACHE_BACKEND at a shared store (sqlite:///path/to/file.db, or any
+# VersionStore) so a write in one worker invalidates the others.
+
+ENABLED = config("RESPONSE_CACHE", default="on").lower() not in ("0", "off", "false")
+MAX_BYTES = config("RESPONSE_CACHE_MAX_BYTES", default=32 * 1024 * 1024, cast=int)
+BACKEND = config("RESPONSE_CACHE_BACKEND", default="local")
+
+# Headers replayed from a cached response; the body and ETag are set separately
+REPLAYED_HEADERS = ("content-type", "x-next-cursor")
+
+
+class VersionStore:
+    """Per-table version counters. `epoch` identifies the store, so ETags from
+    a restarted process or a different store never match."""
+
+    blocking = False # True if reads do I/O and belong in the threadpool
+    epoch: str
+
+    def versions(self, tables: Sequence[str]) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def bump(self, tables: Iterable[str]):
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+
+class LocalVersionStore(VersionStore):
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.epoch = uuid.uuid4().hex
+
+    def versions(self, tables):
+        return {t: self._versions.get(t, 0) for t in tables}
+
+    def bump(self, tables):
+        with self._lock:
+            for t in tables:
+                self._versions[t] = self._versions.get(t, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._versions.clear()
+            self.epoch = uuid.uuid4().hex
+
+
+class SQLiteVersionStore(VersionStore):
+    """Versions in a SQLite file shared by the workers on one host (a stand-in
+    for a networked store such as Redis)."""
+
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        db = self._connection()
+        with db:
+            db.execute("CREATE TABLE IF NOT EXISTS table_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+            db.execute("INSERT OR IGNORE INTO table_versions VALUES ('__epoch__', ?)", (int(time.time() * 1000),))
+        self.epoch = self._read_epoch()
+
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def _read_epoch(self):
+        row = self._connection().execute("SELECT version FROM table_versions WHERE name = '__epoch__'").fetchone()
+        return str(row[0]) if row else "0"
+
+    def versions(self, tables):
+        tables = list(tables)
+        rows = self._connection().execute(
+            f"SELECT name, version FROM table_versions WHERE name IN (?, {', '.join('?' * len(tables))})",
+            ["__epoch__", *tables],
+        ).fetchall()
+        found = dict(rows)
+        self.epoch = str(found.pop("__epoch__", self.epoch))
+        return {t: found.get(t, 0) for t in tables}
+
+    def bump(self, tables):
+        db = self._connection()
+        with db:
+            db.executemany(
+                "INSERT INTO table_versions VALUES (?, 1) "
+                "ON CONFLICT (name) DO UPDATE SET version = version + 1",
+                [(t,) for t in tables],
+            )
+
+    def reset(self):
+        db = self._connection()
+        with db:
+            db.execute("DELETE FROM table_versions")
+            db.execute("INSERT INTO table_versions VALUES ('__epoch__', ?)", (int(time.time() * 1000),))
+        self.epoch = self._read_epoch()
+
+
+def make_store(backend: str = BACKEND) -> VersionStore:
+    if backend.startswith("sqlite:///"):
+        return SQLiteVersionStore(backend[len("sqlite:///"):])
+    return LocalVersionStore()
+
+
+class CachedResponse:
+    __slots__ = ("etag", "body", "headers")
+
+    def __init__(self, etag, body, headers):
+        self.etag = etag
+        self.body = body
+        self.headers = headers
+
+
+class ResponseCache:
+    def __init__(self, store: VersionStore, max_bytes: int = MAX_BYTES):
+        self.store = store
+        self.entries = SizedLRUCache(max_bytes, size_of=lambda entry: len(entry.body))
+
+    def use_store(self, store: VersionStore):
+        self.store = store
+        self.entries.clear()
+
+    async def etag(self, key: str, tables: Sequence[str], ttl: Optional[int] = None) -> str:
+        if self.store.blocking:
+            versions = await run_in_threadpool(self.store.versions, tables)
+        else:
+            versions = self.store.versions(tables)
+        parts = [self.store.epoch, key] + [f"{t}={versions[t]}" for t in sorted(versions)]
+        if ttl:
+            # Routes whose output also depends on the clock change ETag every `ttl` seconds
+            parts.append(str(int(time.time() // ttl)))
+        return '"' + hashlib.sha1("\n".join(parts).encode()).hexdigest() + '"'
+
+    def bump(self, tables: Iterable[str]):
+        self.store.bump(tables)
+
+    def clear(self):
+        self.entries.clear()
+        self.store.reset()
+
+
+response_cache = ResponseCache(make_store())
+
+
+def cached(*tables: str, ttl: Optional[int] = None, include: Optional[Dict[str, Sequence[str]]] = None):
+    """Mark a GET route as cacheable; `tables` are the tables its response reads.
+
+    `include` maps values of the route's include= parameter to the extra
+    tables they pull in.
+    """
+    def decorate(endpoint):
+        endpoint.cache_tables = tables
+        endpoint.cache_ttl = ttl
+        endpoint.cache_include = include or {}
+        return endpoint
+    return decorate
+
+
+def request_tables(request: Request, tables: Sequence[str], include: Dict[str, Sequence[str]]) -> Sequence[str]:
+    if not include or not request.query_params.get("include"):
+        return tables
+    extra = [t for name in request.query_params["include"].split(",") for t in include.get(name.strip(), ())]
+    return tuple(dict.fromkeys((*tables, *extra)))
+
+
+def cache_key(request: Request) -> str:
+    # Same parameters in any order share an entry
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Weak comparison, as RFC 9110 prescribes for If-None-Match
+    candidates = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class CachedRoute(APIRoute):
+    """Route class that serves routes marked with @cached from the response cache."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        tables = getattr(self.endpoint, "cache_tables", None)
+        if not tables:
+            return handler
+        ttl, include = self.endpoint.cache_ttl, self.endpoint.cache_include
+
+        async def cached_handler(request: Request) -> Response:
+            if not ENABLED or request.method != "GET":
+                return await handler(request)
+            key = cache_key(request)
+            tables_read = request_tables(request, tables, include)
+            # Versions are read before the route runs, so a body is never older than its ETag
+            etag = await response_cache.etag(key, tables_read, ttl)
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                RESPONSE_CACHE_REQUESTS.labels("not_modified").inc()
+                return Response(status_code=304, headers=headers)
+            entry = response_cache.entries.get(key)
+            if entry is not None and entry.etag == etag:
+                RESPONSE_CACHE_REQUESTS.labels("hit").inc()
+                return Response(entry.body, headers={**entry.headers, **headers})
+            RESPONSE_CACHE_REQUESTS.labels("miss").inc()
+            response = await handler(request)
+            if response.status_code == 200 and hasattr(response, "body"):
+                if await response_cache.etag(key, tables_read, ttl) != etag:
+                    # Written to while running (e.g. GET /settings creating its row): no ETag to hand out
+                    return response
+                replayed = {h: response.headers[h] for h in REPLAYED_HEADERS if h in response.headers}
+                response_cache.entries.set(key, CachedResponse(etag, response.body, replayed))
+                response.headers.update(headers)
+            return response
+
+        return cached_handler
+
+
+# --- Versioning on commit ---
+
+def _written_tables(session):
+    return session.info.setdefault("response_cache_tables", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_flushed_tables(session, flush_context):
+    tables = _written_tables(session)
+    for obj in session.new | session.deleted:
+        tables.add(sa_inspect(obj).mapper.local_table.name)
+    for obj in session.dirty:
+        if session.is_modified(obj):
+            tables.add(sa_inspect(obj).mapper.local_table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _capture_statement_tables(orm_execute_state):
+    # insert()/update()/delete() run through the session (bulk paths) skip the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None and getattr(table, "name", None):
+            _written_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_versions(session):
+    tables = session.info.pop("response_cache_tables", None)
+    if tables:
+        response_cache.bump(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_tables(session):
+    session.info.pop("response_cache_tables", None)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Any, Dict
+from typing import Optional, List, Any, Dict, Literal, Union
 from datetime import datetime
 
 # --- Shared ---
@@ -25,6 +25,18 @@ class MemberCreate(BaseModel):
     password: str
     role: str = "Developer"
 
+class MemberImport(MemberCreate):
+    # Imported members without a password can't log in until one is set
+    password: Optional[str] = None
+    # The rest of an export's columns, so export -> import round-trips (id is assigned anew)
+    avatar: Optional[str] = None
+    initials: Optional[str] = None
+    participation_score: int = 0
+    learning_path_status: str = "Not Started"
+    skills: List[Dict[str, Any]] = [] # List of Skill dicts
+    interests: List[str] = []
+    joined_at: Optional[datetime] = None
+
 class MemberUpdate(BaseModel):
     name: Optional[str] = None
     role: Optional[str] = None
@@ -41,6 +53,9 @@ class Member(MemberBase):
     class Config:
         from_attributes = True
 
+class MemberSearchResult(Member):
+    match_score: int
+
 # --- Tasks ---
 class TaskBase(BaseModel):
     title: str
@@ -65,10 +80,32 @@ class TaskUpdate(BaseModel):
     assigned_to: Optional[int] = None
     path_id: Optional[int] = None
 
+class TaskBatchUpdate(TaskUpdate):
+    id: int
+
+class TaskClone(BaseModel):
+    member_ids: List[int] = Field(..., min_length=1)
+
+class TaskIds(BaseModel):
+    ids: List[int]
+
+class TaskLogCreate(BaseModel):
+    message: str = Field(..., min_length=1)
+    member_id: Optional[int] = None
+    details: Optional[Dict[str, Any]] = None
+
+class TaskLog(TaskLogCreate):
+    id: int
+    task_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
 class Task(TaskBase):
     id: int
     created_at: datetime
-    logs: List[Dict[str, Any]] = []
+    logs: Optional[List[TaskLog]] = None # Latest entries only; the full log is GET /tasks/{id}/logs
 
     class Config:
         from_attributes = True
@@ -93,6 +130,27 @@ class LearningPath(LearningPathBase):
     class Config:
         from_attributes = True
 
+# --- Activity ---
+class ActivityLog(BaseModel):
+    id: int
+    member_id: Optional[int] = None
+    type: str
+    description: Optional[str] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict, validation_alias="metadata_json")
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+# --- Composite views ---
+class MemberOverview(Member):
+    tasks: List[Task] = []
+    learning_path: Optional[LearningPath] = None
+
+class PathRoster(LearningPath):
+    members: List[Member] = []
+    tasks: List[Task] = []
+
 # --- Settings ---
 class SettingsBase(BaseModel):
     theme: str = "black-blue"
@@ -115,6 +173,15 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     email: Optional[str] = None
 
+class Principal(BaseModel):
+    id: int
+    email: str
+    name: str
+    role: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
 # --- Analytics ---
 class AnalyticsData(BaseModel):
     total_members: int
@@ -126,3 +193,16 @@ class AnalyticsData(BaseModel):
     path_completion_stats: List[Dict[str, Any]]
     engagement_by_channel: List[Dict[str, Any]]
     insights_feed: List[Dict[str, Any]]
+
+# --- Search ---
+class SearchHit(BaseModel):
+    type: Literal["task", "path"]
+    id: int
+    title: Optional[str] = None
+    snippet: Optional[str] = None
+    score: float
+
+# --- Recommendations ---
+class RecommendationBatchRequest(BaseModel):
+    member_ids: Union[List[int], Literal["all"]] = "all"
+    top_k: int = Field(3, ge=1, le=50)
@@ -0,0 +1,212 @@
+import logging
+import re
+from typing import List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from database import Base
+
+# Full-text search over tasks (title, description) and learning paths (name,
+# description, module titles). On SQLite the documents live in FTS5 tables
+# kept in sync by triggers and ranked with bm25(); on Postgres in tsvector
+# columns with GIN indexes, ranked with ts_rank_cd(). Everything is created
+# alongside the tables (see install) and by the Alembic migration.
+
+logger = logging.getLogger("zoho.search")
+
+SNIPPET_START, SNIPPET_END = "<mark>", "</mark>"
+SNIPPET_TOKENS = 12
+
+SQLITE_DDL = [
+    # External content: the index stores only tokens, text is read from tasks
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, content='tasks', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    # Paths hold module titles from another table, so this one stores its own text
+    """CREATE VIRTUAL TABLE IF NOT EXISTS paths_fts USING fts5(
+        name, description, modules,
+        tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS paths_fts_ai AFTER INSERT ON learning_paths BEGIN
+        INSERT INTO paths_fts(rowid, name, description, modules) VALUES (new.id, new.name, new.description, '');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS paths_fts_ad AFTER DELETE ON learning_paths BEGIN
+        DELETE FROM paths_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS paths_fts_au AFTER UPDATE OF name, description ON learning_paths BEGIN
+        UPDATE paths_fts SET name = new.name, description = new.description WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS path_modules_fts_ai AFTER INSERT ON path_modules BEGIN
+        UPDATE paths_fts SET modules = (SELECT group_concat(title, ' ') FROM path_modules WHERE path_id = new.path_id)
+        WHERE rowid = new.path_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS path_modules_fts_ad AFTER DELETE ON path_modules BEGIN
+        UPDATE paths_fts SET modules = (SELECT group_concat(title, ' ') FROM path_modules WHERE path_id = old.path_id)
+        WHERE rowid = old.path_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS path_modules_fts_au AFTER UPDATE OF title ON path_modules BEGIN
+        UPDATE paths_fts SET modules = (SELECT group_concat(title, ' ') FROM path_modules WHERE path_id = new.path_id)
+        WHERE rowid = new.path_id;
+    END""",
+]
+
+SQLITE_BACKFILL = [
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+    """INSERT INTO paths_fts(rowid, name, description, modules)
+       SELECT id, name, description, (SELECT group_concat(title, ' ') FROM path_modules WHERE path_id = learning_paths.id)
+       FROM learning_paths""",
+]
+
+POSTGRES_DDL = [
+    """ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING GIN (search_vector)",
+    "ALTER TABLE learning_paths ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_learning_paths_search_vector ON learning_paths USING GIN (search_vector)",
+    """CREATE OR REPLACE FUNCTION learning_path_search_vector(pid integer, pname text, pdescription text)
+    RETURNS tsvector LANGUAGE sql STABLE AS $$
+        SELECT setweight(to_tsvector('english', coalesce(pname, '')), 'A') ||
+               setweight(to_tsvector('english', coalesce(pdescription, '')), 'B') ||
+               setweight(to_tsvector('english', coalesce(
+                   (SELECT string_agg(title, ' ') FROM path_modules WHERE path_id = pid), '')), 'C')
+    $$""",
+    """CREATE OR REPLACE FUNCTION learning_paths_search_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector := learning_path_search_vector(NEW.id, NEW.name, NEW.description);
+        RETURN NEW;
+    END $$""",
+    """CREATE OR REPLACE TRIGGER learning_paths_search BEFORE INSERT OR UPDATE OF name, description
+        ON learning_paths FOR EACH ROW EXECUTE FUNCTION learning_paths_search_trigger()""",
+    """CREATE OR REPLACE FUNCTION path_modules_search_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE pid integer := CASE WHEN TG_OP = 'DELETE' THEN OLD.path_id ELSE NEW.path_id END;
+    BEGIN
+        UPDATE learning_paths SET search_vector = learning_path_search_vector(id, name, description) WHERE id = pid;
+        RETURN NULL;
+    END $$""",
+    """CREATE OR REPLACE TRIGGER path_modules_search AFTER INSERT OR DELETE OR UPDATE OF title
+        ON path_modules FOR EACH ROW EXECUTE FUNCTION path_modules_search_trigger()""",
+]
+
+POSTGRES_BACKFILL = [
+    "UPDATE learning_paths SET search_vector = learning_path_search_vector(id, name, description)",
+]
+
+
+def install(connection):
+    """Create the search tables/columns and triggers if missing, indexing existing rows."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'").first()
+        try:
+            for ddl in SQLITE_DDL:
+                connection.exec_driver_sql(ddl)
+        except OperationalError as e:
+            # SQLite built without FTS5; /search reports itself unavailable
+            logger.warning("Full-text search disabled: %s", e)
+            return
+        if not exists:
+            for statement in SQLITE_BACKFILL:
+                connection.exec_driver_sql(statement)
+    elif dialect == "postgresql":
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM information_schema.columns WHERE table_name = 'learning_paths' "
+            "AND column_name = 'search_vector'").first()
+        for ddl in POSTGRES_DDL:
+            connection.exec_driver_sql(ddl)
+        if not exists:
+            for statement in POSTGRES_BACKFILL:
+                connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_after_create(metadata, connection, **kw):
+    install(connection)
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_before_drop(metadata, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        # Triggers go with their tables; the FTS tables aren't in the metadata
+        connection.exec_driver_sql("DROP TABLE IF EXISTS tasks_fts")
+        connection.exec_driver_sql("DROP TABLE IF EXISTS paths_fts")
+
+
+# --- Queries ---
+
+_TERM = re.compile(r"\w+\*?", re.UNICODE)
+
+
+def query_terms(q: str) -> List[str]:
+    """Words of the user query; a trailing * marks a prefix term. Operators are not passed through."""
+    return _TERM.findall(q)
+
+
+def fts5_query(terms: List[str]) -> str:
+    return " ".join(f'"{t.rstrip("*")}"*' if t.endswith("*") else f'"{t}"' for t in terms)
+
+
+def tsquery(terms: List[str]) -> str:
+    return " & ".join(f"{t.rstrip('*')}:*" if t.endswith("*") else t for t in terms)
+
+
+SQLITE_QUERIES = {
+    "task": """
+        SELECT 'task' AS type, t.id, t.title,
+               snippet(tasks_fts, -1, :start, :end, '…', :tokens) AS snippet,
+               -bm25(tasks_fts, 10.0, 1.0) AS score
+        FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid
+        WHERE tasks_fts MATCH :q""",
+    "path": """
+        SELECT 'path' AS type, paths_fts.rowid AS id, paths_fts.name AS title,
+               snippet(paths_fts, -1, :start, :end, '…', :tokens) AS snippet,
+               -bm25(paths_fts, 10.0, 2.0, 4.0) AS score
+        FROM paths_fts
+        WHERE paths_fts MATCH :q""",
+}
+
+POSTGRES_QUERIES = {
+    "task": """
+        SELECT 'task' AS type, t.id, t.title,
+               ts_headline('english', coalesce(t.description, t.title), query, :headline) AS snippet,
+               ts_rank_cd(t.search_vector, query) AS score
+        FROM tasks t, to_tsquery('english', :q) AS query
+        WHERE t.search_vector @@ query""",
+    "path": """
+        SELECT 'path' AS type, p.id, p.name AS title,
+               ts_headline('english', coalesce(p.description, p.name), query, :headline) AS snippet,
+               ts_rank_cd(p.search_vector, query) AS score
+        FROM learning_paths p, to_tsquery('english', :q) AS query
+        WHERE p.search_vector @@ query""",
+}
+
+
+def search(db: Session, q: str, types: Optional[List[str]] = None, limit: int = 20):
+    """Ranked hits across tasks and paths: dicts of type, id, title, snippet, score."""
+    terms = query_terms(q)
+    if not terms:
+        return []
+    types = types or ["task", "path"]
+    if db.get_bind().dialect.name == "postgresql":
+        queries, params = POSTGRES_QUERIES, {
+            "q": tsquery(terms),
+            "headline": f"StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, MaxWords=20, MinWords=5",
+        }
+    else:
+        queries, params = SQLITE_QUERIES, {
+            "q": fts5_query(terms), "start": SNIPPET_START, "end": SNIPPET_END, "tokens": SNIPPET_TOKENS,
+        }
+    sql = " UNION ALL ".join(queries[t] for t in types) + " ORDER BY score DESC, type, id LIMIT :limit"
+    return [dict(row._mapping) for row in db.execute(text(sql), dict(params, limit=limit))]
@@ -0,0 +1,155 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, get_args
+
+from decouple import config
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import models, schemas
+import task_logs
+from pagination import keyset_statement, trim_page
+
+try:
+    import orjson
+except ImportError: # Optional: without it the fast path stays off
+    orjson = None
+
+# Fast path for the big list endpoints (GET /members, GET /tasks). The default
+# path loads ORM objects, validates each through the response schema
+# (from_attributes) and re-encodes the result with jsonable_encoder. Here the
+# schema is matched against the table once per field set, into a RowPlan; pages
+# are selected as plain column tuples, zipped into dicts and written straight
+# to bytes by orjson. Rows are not re-validated: their types come from the
+# columns the plan checked.
+#
+# Opt in with FAST_JSON_LISTS=on (requires orjson). See
+# scripts/serialization_benchmark.py for the difference it makes. Sparse
+# fieldsets (fieldsets.py) select just the requested columns here too.
+
+FAST_LISTS = config("FAST_JSON_LISTS", default="off").lower() in ("1", "on", "true") and orjson is not None
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content)
+
+
+def _allows_none(field) -> bool:
+    return field.annotation is Any or type(None) in get_args(field.annotation)
+
+
+class RowPlan:
+    """How to produce `schema` dicts (or just `fields` of them) from `model` columns, worked out once.
+
+    Every field must be a column of the model's table, except `extra` fields,
+    which the caller fills in. Columns the schema has a default for but
+    doesn't accept as null get that default instead of None.
+    """
+
+    def __init__(self, schema, model, extra: Sequence[str] = (), fields: Optional[Sequence[str]] = None):
+        table = model.__table__
+        wanted = {name: f for name, f in schema.model_fields.items() if fields is None or name in fields}
+        columns = {name: f for name, f in wanted.items() if name not in extra}
+        missing = [name for name in columns if name not in table.c]
+        if missing:
+            raise TypeError(f"{schema.__name__} fields with no {table.name} column: {', '.join(missing)}")
+        self.model = model
+        self.names = list(columns)
+        self.extras = [name for name in wanted if name in extra]
+        self.columns = [table.c[name] for name in self.names]
+        self.defaults = {
+            name: f.get_default(call_default_factory=True) for name, f in columns.items()
+            if not f.is_required() and not _allows_none(f)
+        }
+
+    def statement(self, statement):
+        # updated_at rides along (past the zipped names) for the keyset cursor
+        return statement.with_only_columns(*self.columns, self.model.updated_at)
+
+    def dicts(self, rows, extra_values=()) -> List[Dict[str, Any]]:
+        """Row tuples to dicts; `extra_values` holds one tuple of the extras per row."""
+        if self.extras:
+            names, width = self.names + self.extras, len(self.names)
+            out = [dict(zip(names, (*row[:width], *values))) for row, values in zip(rows, extra_values)]
+        else:
+            out = [dict(zip(self.names, row)) for row in rows]
+        for name, default in self.defaults.items():
+            for item in out:
+                if item[name] is None:
+                    item[name] = default
+        return out
+
+
+MEMBER_LINKS = ("skills", "interests")
+
+
+@lru_cache(maxsize=64)
+def member_plan(fields: Tuple[str, ...]) -> RowPlan:
+    return RowPlan(schemas.Member, models.Member, extra=MEMBER_LINKS, fields=fields)
+
+
+@lru_cache(maxsize=64)
+def task_plan(fields: Tuple[str, ...]) -> RowPlan:
+    return RowPlan(schemas.Task, models.Task, extra=("logs",), fields=fields)
+
+
+def member_links(db: Session, ids: List[int], links: Sequence[str] = MEMBER_LINKS):
+    """Skills and/or interests of the given members, one query each for the whole page."""
+    skills: Dict[int, list] = {i: [] for i in ids}
+    interests: Dict[int, list] = {i: [] for i in ids}
+    if ids and "skills" in links:
+        rows = db.execute(
+            select(models.MemberSkill.member_id, models.Skill.name, models.MemberSkill.proficiency)
+            .join(models.Skill, models.Skill.id == models.MemberSkill.skill_id)
+            .where(models.MemberSkill.member_id.in_(ids))
+            .order_by(models.MemberSkill.member_id, models.MemberSkill.position)
+        )
+        for member_id, name, proficiency in rows:
+            skills[member_id].append({"name": name, "proficiency": proficiency})
+    if ids and "interests" in links:
+        rows = db.execute(
+            select(models.MemberInterest.member_id, models.Skill.name)
+            .join(models.Skill, models.Skill.id == models.MemberInterest.skill_id)
+            .where(models.MemberInterest.member_id.in_(ids))
+            .order_by(models.MemberInterest.member_id, models.MemberInterest.position)
+        )
+        for member_id, name in rows:
+            interests[member_id].append(name)
+    return {"skills": skills, "interests": interests}
+
+
+def member_page(db: Session, statement, response: Response, limit: int, cursor: Optional[str], sort: str,
+                fields: Tuple[str, ...]):
+    plan = member_plan(fields)
+    rows = db.execute(keyset_statement(plan.statement(statement), models.Member, limit, cursor, sort)).all()
+    rows = trim_page(rows, response, limit, sort)
+    if not plan.extras:
+        return plan.dicts(rows)
+    links = member_links(db, [row.id for row in rows], plan.extras)
+    return plan.dicts(rows, [tuple(links[name][row.id] for name in plan.extras) for row in rows])
+
+
+def task_page(db: Session, statement, response: Response, limit: int, cursor: Optional[str], sort: str,
+              fields: Tuple[str, ...]):
+    plan = task_plan(fields)
+    rows = db.execute(keyset_statement(plan.statement(statement), models.Task, limit, cursor, sort)).all()
+    rows = trim_page(rows, response, limit, sort)
+    if not plan.extras:
+        return plan.dicts(rows)
+    latest = task_logs.recent(db, [row.id for row in rows])
+    return plan.dicts(rows, [([schemas.TaskLog.model_validate(log).model_dump() for log in latest[row.id]],)
+                             for row in rows])
+
+
+def fast_response(payload, response: Optional[Response] = None) -> FastJSONResponse:
+    """Render `payload`, carrying over headers set on the route's injected `response`."""
+    out = FastJSONResponse(payload)
+    for name, value in (response.headers.items() if response is not None else ()):
+        if name not in ("content-length", "content-type"):
+            out.headers[name] = value
+    return out
@@ -0,0 +1,206 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from decouple import config
+from fastapi import HTTPException
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+import models
+
+# In-memory inverted index for the member finder: skill -> sorted member ids,
+# plus each member's skill levels and role for filtering and ranking.
+#
+# Committed ORM writes patch the index in place (captured at flush, applied on
+# commit). Writes it can't see, such as bulk imports or other worker processes,
+# are picked up by a full rebuild after invalidate() or once MAX_AGE passes.
+
+MAX_AGE = config("SKILL_INDEX_MAX_AGE", default=300, cast=int) # seconds
+
+PROFICIENCY_LEVELS = {"Beginner": 1, "Intermediate": 2, "Advanced": 3, "Expert": 4}
+
+
+def level(proficiency: Optional[str]) -> int:
+    return PROFICIENCY_LEVELS.get(proficiency or "", 1)
+
+
+def intersect(postings: List[List[int]]) -> List[int]:
+    """Intersect sorted id lists, smallest first, binary-searching forward in the others."""
+    if not postings:
+        return []
+    postings = sorted(postings, key=len)
+    result = postings[0]
+    for other in postings[1:]:
+        matched = []
+        lo, end = 0, len(other)
+        for member_id in result:
+            lo = bisect_left(other, member_id, lo)
+            if lo == end:
+                break
+            if other[lo] == member_id:
+                matched.append(member_id)
+        result = matched
+        if not result:
+            break
+    return result
+
+
+class SkillIndex:
+    def __init__(self):
+        self._postings: Dict[str, List[int]] = {}
+        self._members: Dict[int, Tuple[Optional[str], Dict[str, int]]] = {} # id -> (role, {skill: level})
+        self._built_at: Optional[float] = None
+        self._generation = 0
+        self._building: List[dict] = [] # Changes committed during each in-progress rebuild
+        self._lock = threading.RLock()
+
+    # --- Building and maintenance ---
+
+    def is_fresh(self) -> bool:
+        return self._built_at is not None and time.monotonic() - self._built_at < MAX_AGE
+
+    def rebuild(self, db: Session):
+        changed: Dict[int, Optional[Tuple[Optional[str], Dict[str, int]]]] = {}
+        with self._lock:
+            generation = self._generation
+            self._building.append(changed)
+        try:
+            members = {member_id: (role, {}) for member_id, role in db.execute(select(models.Member.id, models.Member.role))}
+            rows = db.execute(
+                select(models.MemberSkill.member_id, models.Skill.name, models.MemberSkill.proficiency)
+                .join(models.Skill, models.Skill.id == models.MemberSkill.skill_id)
+                .order_by(models.MemberSkill.member_id)
+            )
+            postings: Dict[str, List[int]] = {}
+            for member_id, name, proficiency in rows:
+                if member_id in members:
+                    members[member_id][1][name] = level(proficiency)
+                    postings.setdefault(name, []).append(member_id) # Already in id order
+        finally:
+            with self._lock:
+                self._building.remove(changed)
+        with self._lock:
+            self._members, self._postings = members, postings
+            # Writes committed mid-build may or may not be in this read; each change
+            # is the member's full state, so replaying them onto it is safe either way
+            self._patch(changed)
+            # Only an invalidate() (a write the index can't replay) leaves it stale
+            self._built_at = time.monotonic() if generation == self._generation else None
+
+    def ensure_fresh(self, db: Session):
+        if not self.is_fresh():
+            self.rebuild(db)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._built_at = None
+
+    def apply(self, changes: Dict[int, Optional[Tuple[Optional[str], Dict[str, int]]]]):
+        """Patch committed member changes in: id -> (role, {skill: level}) or None if deleted."""
+        with self._lock:
+            for changed in self._building:
+                changed.update(changes) # Replayed when that build finishes
+            if self._built_at is not None:
+                self._patch(changes)
+
+    def _patch(self, changes):
+        for member_id, entry in changes.items():
+            old_skills = self._members.get(member_id, (None, {}))[1]
+            new_skills = entry[1] if entry is not None else {}
+            for name in old_skills.keys() - new_skills.keys():
+                posting = self._postings.get(name, [])
+                i = bisect_left(posting, member_id)
+                if i < len(posting) and posting[i] == member_id:
+                    posting.pop(i)
+                if not posting:
+                    self._postings.pop(name, None)
+            for name in new_skills.keys() - old_skills.keys():
+                insort(self._postings.setdefault(name, []), member_id)
+            if entry is None:
+                self._members.pop(member_id, None)
+            else:
+                self._members[member_id] = entry
+
+    # --- Queries ---
+
+    def search(self, requirements: Dict[str, int], role: Optional[str] = None) -> List[Tuple[int, int]]:
+        """(member id, score) for members holding every skill at or above its level.
+
+        Score is the sum of the member's levels on the requested skills, so
+        stronger matches rank first; ties go to the lower id.
+        """
+        with self._lock:
+            postings = [self._postings.get(name) for name in requirements]
+            if not requirements or any(p is None for p in postings):
+                return []
+            hits = []
+            for member_id in intersect(postings):
+                member_role, skills = self._members[member_id]
+                if role is not None and member_role != role:
+                    continue
+                levels = [skills[name] for name in requirements]
+                if all(have >= need for have, need in zip(levels, requirements.values())):
+                    hits.append((member_id, sum(levels)))
+        hits.sort(key=lambda hit: (-hit[1], hit[0]))
+        return hits
+
+
+skill_index = SkillIndex()
+
+
+def parse_requirements(skills: str, min_proficiency: Optional[str] = None) -> Dict[str, int]:
+    """Parse e.g. "Python:Intermediate,React" into {"Python": 2, "React": <min_proficiency level>}.
+
+    An unknown proficiency is a 400 rather than a silent Beginner.
+    """
+    default = level(min_proficiency)
+    requirements = {}
+    for part in skills.split(","):
+        name, _, proficiency = part.strip().partition(":")
+        name, proficiency = name.strip(), proficiency.strip()
+        if not name:
+            continue
+        if proficiency and proficiency not in PROFICIENCY_LEVELS:
+            raise HTTPException(status_code=400, detail=f"Unknown proficiency '{proficiency}' for {name}; "
+                                                        f"use one of {', '.join(PROFICIENCY_LEVELS)}")
+        requirements[name] = PROFICIENCY_LEVELS[proficiency] if proficiency else default
+    return requirements
+
+
+# --- Keeping the index in step with ORM writes ---
+
+def _snapshot(member):
+    return member.role, {link.skill_name: level(link.proficiency) for link in member.member_skills}
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_member_changes(session, flush_context):
+    pending = session.info.setdefault("skill_index_changes", {})
+    for obj in session.new | session.dirty:
+        if isinstance(obj, models.Member):
+            pending[obj.id] = _snapshot(obj)
+        elif isinstance(obj, models.MemberSkill):
+            # Proficiency edited through the link row; its member may not be loaded
+            pending.setdefault(obj.member_id, "stale")
+    for obj in session.deleted:
+        if isinstance(obj, models.Member):
+            pending[obj.id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_member_changes(session):
+    pending = session.info.pop("skill_index_changes", None)
+    if not pending:
+        return
+    if "stale" in pending.values():
+        skill_index.invalidate()
+    else:
+        skill_index.apply(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_member_changes(session):
+    session.info.pop("skill_index_changes", None)
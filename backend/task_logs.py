@@ -0,0 +1,39 @@
+from typing import Dict, List, Optional, Sequence
+
+from decouple import config
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
+
+import models
+
+# Task progress logs live in task_log_entries, one row per entry, so appending
+# is a single insert rather than a rewrite of a JSON array. Task responses
+# carry only the latest PREVIEW_SIZE entries (Task.logs); GET /tasks/{id}/logs
+# pages through the rest.
+
+PREVIEW_SIZE = config("TASK_LOG_PREVIEW_SIZE", default=5, cast=int)
+
+
+def recent(db: Session, task_ids: Sequence[int], n: Optional[int] = None) -> Dict[int, List[models.TaskLogEntry]]:
+    """The latest `n` (default PREVIEW_SIZE) entries of each task, oldest first, in one windowed query."""
+    n = PREVIEW_SIZE if n is None else n
+    latest: Dict[int, List[models.TaskLogEntry]] = {task_id: [] for task_id in task_ids}
+    if not task_ids or n <= 0:
+        return latest
+    Entry = models.TaskLogEntry
+    ranked = select(
+        Entry,
+        func.row_number().over(partition_by=Entry.task_id, order_by=(Entry.created_at.desc(), Entry.id.desc()))
+        .label("rank"),
+    ).where(Entry.task_id.in_(task_ids)).subquery()
+    entry = aliased(Entry, ranked)
+    for log in db.scalars(select(entry).where(ranked.c.rank <= n).order_by(entry.task_id, entry.created_at, entry.id)):
+        latest[log.task_id].append(log)
+    return latest
+
+
+def attach_recent(db: Session, tasks: Sequence[models.Task], n: Optional[int] = None):
+    """Fill in Task.logs for `tasks`."""
+    latest = recent(db, [task.id for task in tasks], n)
+    for task in tasks:
+        task._recent_logs = latest[task.id]
@@ -5,7 +5,7 @@ import Card from '../components/Card';
 import Input from '../components/Input';
 import Button from '../components/Button';
 import Avatar from '../components/Avatar';
-import axios from 'axios';
+import { usePagedList } from '../pagination';
 
 const API_BASE_URL = 'http://localhost:8000/api';
 
@@ -15,7 +15,7 @@ export default function Chat() {
         { id: 1, sender: 'bot', text: 'Hello! I am the Zoho LMS Bot. You can use commands like /help to see what I can do.', time: '10:00 AM' }
     ]);
     const [newMessage, setNewMessage] = useState('');
-    const [members, setMembers] = useState([]);
+    const { items: members, hasMore, loading, reload, loadMore } = usePagedList(`${API_BASE_URL}/members`);
     const [activeChat, setActiveChat] = useState(null); // { id: 'bot', name: 'Zoho Bot' } or member object
 
     useEffect(() => {
@@ -33,10 +33,9 @@ export default function Chat() {
         }
     }, [location.state, members]);
 
-    const fetchMembers = async () => {
+    const fetchMembers = async (next = reload) => {
         try {
-            const response = await axios.get(`${API_BASE_URL}/members`);
-            setMembers(response.data);
+            await next();
         } catch (error) {
             console.error("Failed to fetch members:", error);
         }
@@ -141,6 +140,13 @@ export default function Chat() {
                             </div>
                         </div>
                     ))}
+                    {hasMore && (
+                        <div className="p-4 flex justify-center">
+                            <Button variant="ghost" size="sm" onClick={() => fetchMembers(loadMore)} disabled={loading}>
+                                {loading ? 'Loading...' : 'Load more'}
+                            </Button>
+                        </div>
+                    )}
                 </div>
             </Card>
 
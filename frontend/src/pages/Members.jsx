@@ -9,10 +9,14 @@ import Avatar from '../components/Avatar';
 import Tag from '../components/Tag';
 import { useToast } from '../context/ToastContext';
 import axios from 'axios';
+import { usePagedList } from '../pagination';
 
 export default function Members() {
     const { addToast } = useToast();
-    const [members, setMembers] = useState([]);
+    const token = localStorage.getItem('token');
+    const { items: members, hasMore, loading, reload, loadMore } = usePagedList(
+        `${import.meta.env.VITE_API_URL}/members`, { headers: { Authorization: `Bearer ${token}` } }
+    );
     const [search, setSearch] = useState('');
     const [sortConfig, setSortConfig] = useState({ key: 'participationScore', direction: 'desc' });
     const [isModalOpen, setIsModalOpen] = useState(false);
@@ -30,13 +34,9 @@ export default function Members() {
         fetchMembers();
     }, []);
 
-    const fetchMembers = async () => {
+    const fetchMembers = async (next = reload) => {
         try {
-            const token = localStorage.getItem('token');
-            const response = await axios.get(`${import.meta.env.VITE_API_URL}/members`, {
-                headers: { Authorization: `Bearer ${token}` }
-            });
-            setMembers(response.data);
+            await next();
         } catch (error) {
             console.error("Failed to fetch members", error);
             addToast("Failed to fetch members", 'error');
@@ -216,6 +216,13 @@ export default function Members() {
                         </tbody>
                     </table>
                 </div>
+                {hasMore && (
+                    <div className="flex justify-center p-4 border-t border-borders">
+                        <Button variant="ghost" onClick={() => fetchMembers(loadMore)} disabled={loading}>
+                            {loading ? 'Loading...' : 'Load more'}
+                        </Button>
+                    </div>
+                )}
             </Card>
 
             {/* Add Member Modal */}
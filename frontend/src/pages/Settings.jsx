@@ -23,6 +23,10 @@ export default function Settings() {
     const [isSaving, setIsSaving] = useState(false);
     const [saveStatus, setSaveStatus] = useState(null); // 'success' | 'error'
     const [dbTestStatus, setDbTestStatus] = useState(null); // 'testing' | 'success' | 'error'
+    // Import/export work on one table at a time: /admin/{import,export}/{kind}
+    const [dataKind, setDataKind] = useState('members'); // 'members' | 'tasks' | 'paths'
+    const [dataFormat, setDataFormat] = useState('ndjson'); // 'ndjson' | 'csv'
+    const [importReport, setImportReport] = useState(null);
 
     // Fetch settings on mount
     useEffect(() => {
@@ -80,20 +84,20 @@ export default function Settings() {
 
         const formData = new FormData();
         formData.append('file', file);
-        formData.append('strategy', 'overwrite'); // Default strategy
 
         setIsSaving(true);
+        setImportReport(null);
         try {
-            await axios.post(`${API_BASE_URL}/admin/import`, formData, {
+            const response = await axios.post(`${API_BASE_URL}/admin/import/${dataKind}`, formData, {
+                params: { format: dataFormat },
                 headers: {
                     'Content-Type': 'multipart/form-data'
                 }
             });
-            setSaveStatus('success');
+            // Rows that failed are reported by line; the rest are already in
+            setImportReport(response.data);
+            setSaveStatus(response.data.failed ? 'error' : 'success');
             setTimeout(() => setSaveStatus(null), 3000);
-            // Refresh settings after import
-            const response = await axios.get(`${API_BASE_URL}/settings`);
-            setSettings(response.data);
         } catch (error) {
             console.error("Failed to import data:", error);
             setSaveStatus('error');
@@ -336,28 +340,60 @@ export default function Settings() {
                         <Card className="p-6 space-y-6">
                             <h2 className="text-lg font-semibold text-headers mb-4">Data Management</h2>
 
+                            <div className="grid grid-cols-2 gap-4">
+                                <div className="space-y-1">
+                                    <label className="text-sm font-medium text-secondary-text">Data</label>
+                                    <select
+                                        className="w-full px-3 py-2 bg-background border border-borders rounded-lg focus:outline-none focus:ring-2 focus:ring-primary/50 text-headers"
+                                        value={dataKind}
+                                        onChange={(e) => setDataKind(e.target.value)}
+                                    >
+                                        <option value="members">Members</option>
+                                        <option value="tasks">Tasks</option>
+                                        <option value="paths">Learning Paths</option>
+                                    </select>
+                                </div>
+                                <div className="space-y-1">
+                                    <label className="text-sm font-medium text-secondary-text">Format</label>
+                                    <select
+                                        className="w-full px-3 py-2 bg-background border border-borders rounded-lg focus:outline-none focus:ring-2 focus:ring-primary/50 text-headers"
+                                        value={dataFormat}
+                                        onChange={(e) => setDataFormat(e.target.value)}
+                                    >
+                                        <option value="ndjson">NDJSON</option>
+                                        <option value="csv">CSV</option>
+                                    </select>
+                                </div>
+                            </div>
+
                             <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
                                 <div className="p-4 border border-borders rounded-xl bg-surfaceHighlight/10">
                                     <h3 className="font-medium text-headers mb-2">Export Data</h3>
-                                    <p className="text-sm text-secondary-text mb-4">Download a JSON backup of all members, tasks, and paths.</p>
-                                    <Button variant="outline" className="w-full gap-2" onClick={() => window.open(`${API_BASE_URL}/admin/export`, '_blank')}>
-                                        <Download size={16} /> Export JSON
+                                    <p className="text-sm text-secondary-text mb-4">Download every row of the selected data as a backup file.</p>
+                                    <Button variant="outline" className="w-full gap-2" onClick={() => window.open(`${API_BASE_URL}/admin/export/${dataKind}?format=${dataFormat}`, '_blank')}>
+                                        <Download size={16} /> Export {dataFormat.toUpperCase()}
                                     </Button>
                                 </div>
 
                                 <div className="p-4 border border-borders rounded-xl bg-surfaceHighlight/10">
                                     <h3 className="font-medium text-headers mb-2">Import Data</h3>
-                                    <p className="text-sm text-secondary-text mb-4">Restore data from a previous backup file.</p>
-                                    <Button variant="outline" className="w-full gap-2" onClick={handleImport}>
-                                        <Upload size={16} /> Import JSON
+                                    <p className="text-sm text-secondary-text mb-4">Add the rows of an exported file to the selected data.</p>
+                                    <Button variant="outline" className="w-full gap-2" onClick={handleImport} disabled={isSaving}>
+                                        <Upload size={16} /> Import {dataFormat.toUpperCase()}
                                     </Button>
                                     <input
                                         type="file"
                                         id="import-file"
                                         className="hidden"
-                                        accept=".json"
+                                        accept={dataFormat === 'csv' ? '.csv' : '.ndjson,.jsonl'}
                                         onChange={handleFileChange}
                                     />
+                                    {importReport && (
+                                        <p className="text-sm text-secondary-text mt-3">
+                                            Imported {importReport.imported}, failed {importReport.failed}
+                                            {importReport.errors.length > 0 && ` (first error, line ${importReport.errors[0].line}: ${importReport.errors[0].errors[0]})`}
+                                        </p>
+                                    )}
                                 </div>
                             </div>
 
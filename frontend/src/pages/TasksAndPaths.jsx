@@ -8,12 +8,15 @@ import Modal from '../components/Modal';
 import Tag from '../components/Tag';
 import Avatar from '../components/Avatar';
 import axios from 'axios';
+import { usePagedList } from '../pagination';
 
 export default function TasksAndPaths() {
     const [activeTab, setActiveTab] = useState('tasks');
-    const [tasks, setTasks] = useState([]);
-    const [paths, setPaths] = useState([]);
-    const [members, setMembers] = useState([]);
+    const config = { headers: { Authorization: `Bearer ${localStorage.getItem('token')}` } };
+    // Each task comes with its assignee, so the member list is only needed for the assign picker
+    const tasks = usePagedList(`${import.meta.env.VITE_API_URL}/tasks?include=assignee`, config);
+    const paths = usePagedList(`${import.meta.env.VITE_API_URL}/paths`, config);
+    const members = usePagedList(`${import.meta.env.VITE_API_URL}/members?fields=name`, config);
 
     // Modals
     const [isTaskModalOpen, setIsTaskModalOpen] = useState(false);
@@ -28,22 +31,22 @@ export default function TasksAndPaths() {
         fetchData();
     }, []);
 
-    const fetchData = async () => {
+    const fetchData = async (...loads) => {
         try {
-            const token = localStorage.getItem('token');
-            const [tasksRes, pathsRes, membersRes] = await Promise.all([
-                axios.get(`${import.meta.env.VITE_API_URL}/tasks`, { headers: { Authorization: `Bearer ${token}` } }),
-                axios.get(`${import.meta.env.VITE_API_URL}/paths`, { headers: { Authorization: `Bearer ${token}` } }),
-                axios.get(`${import.meta.env.VITE_API_URL}/members`, { headers: { Authorization: `Bearer ${token}` } })
-            ]);
-            setTasks(tasksRes.data);
-            setPaths(pathsRes.data);
-            setMembers(membersRes.data);
+            await Promise.all((loads.length ? loads : [tasks.reload, paths.reload, members.reload]).map(load => load()));
         } catch (error) {
             console.error("Failed to fetch data", error);
         }
     };
 
+    const loadMoreButton = (list) => list.hasMore && (
+        <div className="flex justify-center pt-4">
+            <Button variant="ghost" onClick={() => fetchData(list.loadMore)} disabled={list.loading}>
+                {list.loading ? 'Loading...' : 'Load more'}
+            </Button>
+        </div>
+    );
+
     const handleCreateTask = async (e) => {
         e.preventDefault();
         setIsLoading(true);
@@ -60,7 +63,7 @@ export default function TasksAndPaths() {
                 headers: { Authorization: `Bearer ${token}` }
             });
             setIsTaskModalOpen(false);
-            fetchData();
+            fetchData(tasks.reload);
             setNewTask({ title: '', assignedTo: '', dueDate: '', priority: 'Medium' });
         } catch (error) {
             console.error("Failed to create task:", error);
@@ -85,7 +88,7 @@ export default function TasksAndPaths() {
                 headers: { Authorization: `Bearer ${token}` }
             });
             setIsPathModalOpen(false);
-            fetchData();
+            fetchData(paths.reload);
             setNewPath({ name: '', description: '', difficulty: 'Beginner', estimatedDuration: '' });
         } catch (error) {
             console.error("Failed to create path:", error);
@@ -150,15 +153,15 @@ export default function TasksAndPaths() {
                                 </tr>
                             </thead>
                             <tbody className="divide-y divide-borders">
-                                {tasks.length === 0 ? (
+                                {tasks.items.length === 0 ? (
                                     <tr>
                                         <td colSpan="5" className="px-6 py-8 text-center text-secondary-text">
                                             No tasks found. Create one to get started.
                                         </td>
                                     </tr>
                                 ) : (
-                                    tasks.map((task) => {
-                                        const assignee = members.find(m => m.id === task.assigned_to);
+                                    tasks.items.map((task) => {
+                                        const assignee = task.assignee;
                                         return (
                                             <tr key={task.id} className="hover:bg-white/5 transition-colors">
                                                 <td className="px-6 py-4">
@@ -198,6 +201,7 @@ export default function TasksAndPaths() {
                             </tbody>
                         </table>
                     </Card>
+                    {loadMoreButton(tasks)}
                 </div>
             ) : (
                 <div className="space-y-6">
@@ -207,12 +211,12 @@ export default function TasksAndPaths() {
                         </Button>
                     </div>
                     <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                        {paths.length === 0 ? (
+                        {paths.items.length === 0 ? (
                             <div className="col-span-full text-center py-12 text-secondary-text bg-surface border border-borders rounded-xl">
                                 No learning paths found. Create one to get started.
                             </div>
                         ) : (
-                            paths.map((path) => (
+                            paths.items.map((path) => (
                                 <Link key={path.id} to={`/paths/${path.id}`} className="block group">
                                     <Card className="h-full hover:shadow-glow transition-all border-l-4 border-l-transparent hover:border-l-primary hover:bg-surfaceHighlight/50">
                                         <div className="p-6 space-y-4">
@@ -258,6 +262,7 @@ export default function TasksAndPaths() {
                             ))
                         )}
                     </div>
+                    {loadMoreButton(paths)}
                 </div>
             )}
 
@@ -284,10 +289,16 @@ export default function TasksAndPaths() {
                             onChange={(e) => setNewTask({ ...newTask, assignedTo: e.target.value })}
                         >
                             <option value="">Unassigned</option>
-                            {members.map(m => (
+                            {members.items.map(m => (
                                 <option key={m.id} value={m.id}>{m.name}</option>
                             ))}
                         </select>
+                        {members.hasMore && (
+                            <button type="button" className="text-xs text-primary mt-1" disabled={members.loading}
+                                onClick={() => fetchData(members.loadMore)}>
+                                Load more members
+                            </button>
+                        )}
                     </div>
                     <div className="grid grid-cols-2 gap-4">
                         <div>
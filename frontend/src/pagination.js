@@ -0,0 +1,42 @@
+import { useCallback, useRef, useState } from 'react';
+import axios from 'axios';
+
+// List endpoints return at most `limit` rows per request; when there are more,
+// the X-Next-Cursor header carries the token for the next page. Lists load one
+// page at a time and fetch the next only when asked to (a "Load more" button).
+export const PAGE_SIZE = 50;
+
+export async function getPage(url, cursor = null, config = {}) {
+    const params = { ...config.params, limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) };
+    const response = await axios.get(url, { ...config, params });
+    return { rows: response.data, next: response.headers['x-next-cursor'] || null };
+}
+
+// `reload()` fetches the first page again; `loadMore()` appends the next one.
+// Both reject on request errors, for the page to report.
+export function usePagedList(url, config = {}) {
+    const [items, setItems] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loading, setLoading] = useState(false);
+    const configRef = useRef(config);
+    configRef.current = config;
+
+    const load = useCallback(async (cursor) => {
+        setLoading(true);
+        try {
+            const { rows, next } = await getPage(url, cursor, configRef.current);
+            setItems(current => (cursor ? [...current, ...rows] : rows));
+            setNextCursor(next);
+        } finally {
+            setLoading(false);
+        }
+    }, [url]);
+
+    const reload = useCallback(() => load(null), [load]);
+    const loadMore = useCallback(
+        () => (nextCursor && !loading ? load(nextCursor) : Promise.resolve()),
+        [load, nextCursor, loading]
+    );
+
+    return { items, hasMore: Boolean(nextCursor), loading, reload, loadMore };
+}
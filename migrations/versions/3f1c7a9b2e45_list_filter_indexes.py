@@ -0,0 +1,52 @@
+"""list_filter_indexes
+
+Revision ID: 3f1c7a9b2e45
+Revises: d96a2ab9e017
+Create Date: 2026-10-18 09:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c7a9b2e45'
+down_revision: Union[str, None] = 'd96a2ab9e017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('members', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_members_role'), ['role'], unique=False)
+        batch_op.create_index(batch_op.f('ix_members_learning_path_status'), ['learning_path_status'], unique=False)
+        batch_op.create_index('ix_members_updated_at_id', ['updated_at', 'id'], unique=False)
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tasks_status'), ['status'], unique=False)
+        batch_op.create_index(batch_op.f('ix_tasks_priority'), ['priority'], unique=False)
+        batch_op.create_index(batch_op.f('ix_tasks_assigned_to'), ['assigned_to'], unique=False)
+        batch_op.create_index(batch_op.f('ix_tasks_path_id'), ['path_id'], unique=False)
+        batch_op.create_index('ix_tasks_updated_at_id', ['updated_at', 'id'], unique=False)
+
+    with op.batch_alter_table('learning_paths', schema=None) as batch_op:
+        batch_op.create_index('ix_learning_paths_updated_at_id', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('learning_paths', schema=None) as batch_op:
+        batch_op.drop_index('ix_learning_paths_updated_at_id')
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_updated_at_id')
+        batch_op.drop_index(batch_op.f('ix_tasks_path_id'))
+        batch_op.drop_index(batch_op.f('ix_tasks_assigned_to'))
+        batch_op.drop_index(batch_op.f('ix_tasks_priority'))
+        batch_op.drop_index(batch_op.f('ix_tasks_status'))
+
+    with op.batch_alter_table('members', schema=None) as batch_op:
+        batch_op.drop_index('ix_members_updated_at_id')
+        batch_op.drop_index(batch_op.f('ix_members_learning_path_status'))
+        batch_op.drop_index(batch_op.f('ix_members_role'))
@@ -0,0 +1,132 @@
+"""full-text search
+
+Revision ID: 5a0f2c8e6b14
+Revises: e7b3c5a9d1f2
+Create Date: 2026-10-18 16:48:31.902774
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a0f2c8e6b14'
+down_revision: Union[str, None] = 'e7b3c5a9d1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same objects the app installs on create_all (backend/search.py), frozen here
+SQLITE_DDL = [
+    # External content: the index stores only tokens, text is read from tasks
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, content='tasks', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    # Paths hold module titles from another table, so this one stores its own text
+    """CREATE VIRTUAL TABLE IF NOT EXISTS paths_fts USING fts5(
+        name, description, modules,
+        tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS paths_fts_ai AFTER INSERT ON learning_paths BEGIN
+        INSERT INTO paths_fts(rowid, name, description, modules) VALUES (new.id, new.name, new.description, '');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS paths_fts_ad AFTER DELETE ON learning_paths BEGIN
+        DELETE FROM paths_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS paths_fts_au AFTER UPDATE OF name, description ON learning_paths BEGIN
+        UPDATE paths_fts SET name = new.name, description = new.description WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS path_modules_fts_ai AFTER INSERT ON path_modules BEGIN
+        UPDATE paths_fts SET modules = (SELECT group_concat(title, ' ') FROM path_modules WHERE path_id = new.path_id)
+        WHERE rowid = new.path_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS path_modules_fts_ad AFTER DELETE ON path_modules BEGIN
+        UPDATE paths_fts SET modules = (SELECT group_concat(title, ' ') FROM path_modules WHERE path_id = old.path_id)
+        WHERE rowid = old.path_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS path_modules_fts_au AFTER UPDATE OF title ON path_modules BEGIN
+        UPDATE paths_fts SET modules = (SELECT group_concat(title, ' ') FROM path_modules WHERE path_id = new.path_id)
+        WHERE rowid = new.path_id;
+    END""",
+]
+
+SQLITE_BACKFILL = [
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+    """INSERT INTO paths_fts(rowid, name, description, modules)
+       SELECT id, name, description, (SELECT group_concat(title, ' ') FROM path_modules WHERE path_id = learning_paths.id)
+       FROM learning_paths""",
+]
+
+POSTGRES_DDL = [
+    """ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING GIN (search_vector)",
+    "ALTER TABLE learning_paths ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_learning_paths_search_vector ON learning_paths USING GIN (search_vector)",
+    """CREATE OR REPLACE FUNCTION learning_path_search_vector(pid integer, pname text, pdescription text)
+    RETURNS tsvector LANGUAGE sql STABLE AS $$
+        SELECT setweight(to_tsvector('english', coalesce(pname, '')), 'A') ||
+               setweight(to_tsvector('english', coalesce(pdescription, '')), 'B') ||
+               setweight(to_tsvector('english', coalesce(
+                   (SELECT string_agg(title, ' ') FROM path_modules WHERE path_id = pid), '')), 'C')
+    $$""",
+    """CREATE OR REPLACE FUNCTION learning_paths_search_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector := learning_path_search_vector(NEW.id, NEW.name, NEW.description);
+        RETURN NEW;
+    END $$""",
+    """CREATE OR REPLACE TRIGGER learning_paths_search BEFORE INSERT OR UPDATE OF name, description
+        ON learning_paths FOR EACH ROW EXECUTE FUNCTION learning_paths_search_trigger()""",
+    """CREATE OR REPLACE FUNCTION path_modules_search_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE pid integer := CASE WHEN TG_OP = 'DELETE' THEN OLD.path_id ELSE NEW.path_id END;
+    BEGIN
+        UPDATE learning_paths SET search_vector = learning_path_search_vector(id, name, description) WHERE id = pid;
+        RETURN NULL;
+    END $$""",
+    """CREATE OR REPLACE TRIGGER path_modules_search AFTER INSERT OR DELETE OR UPDATE OF title
+        ON path_modules FOR EACH ROW EXECUTE FUNCTION path_modules_search_trigger()""",
+]
+
+POSTGRES_BACKFILL = [
+    "UPDATE learning_paths SET search_vector = learning_path_search_vector(id, name, description)",
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        statements = POSTGRES_DDL + POSTGRES_BACKFILL
+    else:
+        statements = SQLITE_DDL + SQLITE_BACKFILL
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS path_modules_search ON path_modules")
+        op.execute("DROP TRIGGER IF EXISTS learning_paths_search ON learning_paths")
+        op.execute("DROP FUNCTION IF EXISTS path_modules_search_trigger()")
+        op.execute("DROP FUNCTION IF EXISTS learning_paths_search_trigger()")
+        op.execute("DROP FUNCTION IF EXISTS learning_path_search_vector(integer, text, text)")
+        op.execute("DROP INDEX IF EXISTS ix_learning_paths_search_vector")
+        op.execute("DROP INDEX IF EXISTS ix_tasks_search_vector")
+        op.execute("ALTER TABLE learning_paths DROP COLUMN IF EXISTS search_vector")
+        op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector")
+    else:
+        for trigger in ('tasks_fts_ai', 'tasks_fts_ad', 'tasks_fts_au', 'paths_fts_ai', 'paths_fts_ad', 'paths_fts_au',
+                        'path_modules_fts_ai', 'path_modules_fts_ad', 'path_modules_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS paths_fts")
+        op.execute("DROP TABLE IF EXISTS tasks_fts")
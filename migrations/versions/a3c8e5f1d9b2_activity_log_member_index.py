@@ -0,0 +1,26 @@
+"""activity_log member index
+
+Revision ID: a3c8e5f1d9b2
+Revises: 5a0f2c8e6b14
+Create Date: 2026-10-18 18:02:11.530462
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c8e5f1d9b2'
+down_revision: Union[str, None] = '5a0f2c8e6b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_activity_logs_member_id_created_at', 'activity_logs', ['member_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_activity_logs_member_id_created_at', table_name='activity_logs')
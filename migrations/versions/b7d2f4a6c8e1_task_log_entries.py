@@ -0,0 +1,123 @@
+"""move task logs into task_log_entries
+
+Revision ID: b7d2f4a6c8e1
+Revises: a3c8e5f1d9b2
+Create Date: 2026-10-18 19:41:37.208815
+
+"""
+import json
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f4a6c8e1'
+down_revision: Union[str, None] = 'a3c8e5f1d9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+tasks = sa.table('tasks', sa.column('id', sa.Integer), sa.column('logs', sa.JSON), sa.column('updated_at', sa.DateTime))
+entries = sa.table('task_log_entries', sa.column('task_id', sa.Integer), sa.column('member_id', sa.Integer),
+                   sa.column('message', sa.Text), sa.column('details', sa.JSON(none_as_null=True)),
+                   sa.column('created_at', sa.DateTime))
+
+
+# SQLite drops a table's triggers when batch mode rebuilds it; these are 5a0f2c8e6b14's, reinstalled after
+TASKS_FTS_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+
+def _alter_tasks(alter):
+    with op.batch_alter_table('tasks') as batch_op:
+        alter(batch_op)
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in TASKS_FTS_TRIGGERS:
+            op.execute(statement)
+
+
+def _load(value):
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value or []
+
+
+def _timestamp(value, fallback):
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+        except ValueError:
+            return fallback
+    return value if isinstance(value, datetime) else fallback
+
+
+def upgrade() -> None:
+    op.create_table('task_log_entries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('member_id', sa.Integer(), nullable=True),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('details', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['member_id'], ['members.id'], ),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_log_entries_task_id_created_at', 'task_log_entries', ['task_id', 'created_at'], unique=False)
+
+    # Backfill from the JSON column, streaming the source rows
+    bind = op.get_bind()
+    rows = []
+    for task_id, logs_json, updated_at in bind.execute(
+        sa.select(tasks.c.id, tasks.c.logs, tasks.c.updated_at).execution_options(yield_per=1000)
+    ):
+        for log in _load(logs_json):
+            # Log dicts, or bare strings in older rows
+            log = dict(log) if isinstance(log, dict) else {'message': str(log)}
+            message = next((log.pop(key) for key in ('message', 'text', 'note') if key in log), None)
+            stamp = next((log.pop(key) for key in ('created_at', 'timestamp', 'date') if key in log), None)
+            member_id = log.pop('member_id', None)
+            rows.append({'task_id': task_id, 'member_id': member_id if isinstance(member_id, int) else None,
+                         'message': str(message) if message is not None else json.dumps(log),
+                         'details': log or None, 'created_at': _timestamp(stamp, updated_at or datetime.utcnow())})
+        if len(rows) >= 1000:
+            bind.execute(entries.insert(), rows)
+            rows.clear()
+    if rows:
+        bind.execute(entries.insert(), rows)
+
+    _alter_tasks(lambda batch_op: batch_op.drop_column('logs'))
+
+
+def downgrade() -> None:
+    _alter_tasks(lambda batch_op: batch_op.add_column(sa.Column('logs', sa.JSON(), nullable=True)))
+
+    bind = op.get_bind()
+    logs = {}
+    for task_id, member_id, message, details, created_at in bind.execute(
+        sa.select(entries.c.task_id, entries.c.member_id, entries.c.message, entries.c.details, entries.c.created_at)
+        .order_by(entries.c.task_id, entries.c.created_at)
+    ):
+        log = {'message': message, 'created_at': created_at.isoformat() if created_at else None}
+        if member_id is not None:
+            log['member_id'] = member_id
+        log.update(_load(details) or {})
+        logs.setdefault(task_id, []).append(log)
+    for task_id, task_logs in logs.items():
+        bind.execute(tasks.update().where(tasks.c.id == task_id).values(logs=task_logs))
+
+    op.drop_index('ix_task_log_entries_task_id_created_at', table_name='task_log_entries')
+    op.drop_table('task_log_entries')
@@ -0,0 +1,54 @@
+"""analytics_counters
+
+Revision ID: c4e9a1d7b2f8
+Revises: 8b2d4e6f1a37
+Create Date: 2026-10-18 13:05:47.204116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e9a1d7b2f8'
+down_revision: Union[str, None] = '8b2d4e6f1a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('analytics_counters',
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('metric', 'key')
+    )
+
+    # Seed from the existing rows; the reconciliation job (python -m analytics) recounts the same way.
+    # A skill listed twice for a member counts once, as e7b3c5a9d1f2 keeps one member_skills row for it
+    if op.get_bind().dialect.name == 'postgresql':
+        week = "to_char(date_trunc('week', joined_at), 'YYYY-MM-DD')"
+        skills = ("SELECT COALESCE(s->>'name', s #>> '{}') AS name, count(DISTINCT members.id) AS n FROM members, "
+                  "json_array_elements(COALESCE(members.skills, '[]')::json) AS s GROUP BY 1")
+    else:
+        week = "date(joined_at, 'weekday 0', '-6 days')"
+        skills = ("SELECT CASE WHEN s.type = 'object' THEN json_extract(s.value, '$.name') ELSE s.value END AS name, "
+                  "count(DISTINCT members.id) AS n FROM members, json_each(COALESCE(members.skills, '[]')) AS s GROUP BY 1")
+    insert = "INSERT INTO analytics_counters (metric, key, value) "
+    op.execute(insert + "SELECT 'tasks_by_status', COALESCE(status, ''), count(*) FROM tasks GROUP BY 2")
+    op.execute(insert + "SELECT 'tasks_by_path', path_id || ':' || COALESCE(status, ''), count(*) FROM tasks "
+                        "WHERE path_id IS NOT NULL GROUP BY 2")
+    op.execute(insert + "SELECT 'members', '', count(*) FROM members HAVING count(*) > 0")
+    op.execute(insert + "SELECT 'members_engaged', '', count(*) FROM members WHERE participation_score > 0 "
+                        "HAVING count(*) > 0")
+    op.execute(insert + "SELECT 'members_by_role', COALESCE(role, ''), count(*) FROM members GROUP BY 2")
+    op.execute(insert + "SELECT 'members_by_path_status', COALESCE(learning_path_status, ''), count(*) "
+                        "FROM members GROUP BY 2")
+    op.execute(insert + f"SELECT 'members_by_week', COALESCE({week}, ''), count(*) FROM members GROUP BY 2")
+    op.execute(insert + f"SELECT 'skills', name, n FROM ({skills}) AS counts WHERE name IS NOT NULL AND name != ''")
+
+
+def downgrade() -> None:
+    op.drop_table('analytics_counters')
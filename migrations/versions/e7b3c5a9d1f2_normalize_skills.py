@@ -0,0 +1,207 @@
+"""normalize skills, interests, path tags and modules
+
+Revision ID: e7b3c5a9d1f2
+Revises: c4e9a1d7b2f8
+Create Date: 2026-10-18 15:22:09.731054
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c5a9d1f2'
+down_revision: Union[str, None] = 'c4e9a1d7b2f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+members = sa.table('members', sa.column('id', sa.Integer), sa.column('skills', sa.JSON), sa.column('interests', sa.JSON))
+paths = sa.table('learning_paths', sa.column('id', sa.Integer), sa.column('skill_tags', sa.JSON), sa.column('modules', sa.JSON))
+skills = sa.table('skills', sa.column('id', sa.Integer), sa.column('name', sa.String))
+member_skills = sa.table('member_skills', sa.column('member_id', sa.Integer), sa.column('skill_id', sa.Integer),
+                         sa.column('proficiency', sa.String), sa.column('position', sa.Integer))
+member_interests = sa.table('member_interests', sa.column('member_id', sa.Integer), sa.column('skill_id', sa.Integer),
+                            sa.column('position', sa.Integer))
+path_tags = sa.table('path_tags', sa.column('path_id', sa.Integer), sa.column('skill_id', sa.Integer),
+                     sa.column('position', sa.Integer))
+path_modules = sa.table('path_modules', sa.column('path_id', sa.Integer), sa.column('position', sa.Integer),
+                        sa.column('title', sa.String), sa.column('status', sa.String), sa.column('details', sa.JSON(none_as_null=True)))
+
+
+def _load(value):
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value or []
+
+
+def upgrade() -> None:
+    op.create_table('skills',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_skills_name'), 'skills', ['name'], unique=True)
+    op.create_table('member_skills',
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.Column('skill_id', sa.Integer(), nullable=False),
+    sa.Column('proficiency', sa.String(), nullable=True),
+    sa.Column('position', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['member_id'], ['members.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ),
+    sa.PrimaryKeyConstraint('member_id', 'skill_id')
+    )
+    op.create_index('ix_member_skills_skill_id_member_id', 'member_skills', ['skill_id', 'member_id'], unique=False)
+    op.create_table('member_interests',
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.Column('skill_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['member_id'], ['members.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ),
+    sa.PrimaryKeyConstraint('member_id', 'skill_id')
+    )
+    op.create_index('ix_member_interests_skill_id_member_id', 'member_interests', ['skill_id', 'member_id'], unique=False)
+    op.create_table('path_tags',
+    sa.Column('path_id', sa.Integer(), nullable=False),
+    sa.Column('skill_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['path_id'], ['learning_paths.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ),
+    sa.PrimaryKeyConstraint('path_id', 'skill_id')
+    )
+    op.create_index('ix_path_tags_skill_id_path_id', 'path_tags', ['skill_id', 'path_id'], unique=False)
+    op.create_table('path_modules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('path_id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('details', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['path_id'], ['learning_paths.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_path_modules_path_id_position', 'path_modules', ['path_id', 'position'], unique=False)
+
+    # Backfill from the JSON columns, streaming the source rows
+    bind = op.get_bind()
+    skill_ids = {}
+
+    def skill_id(name):
+        if name not in skill_ids:
+            skill_ids[name] = bind.execute(skills.insert().values(name=name).returning(skills.c.id)).scalar_one()
+        return skill_ids[name]
+
+    def flush(table, rows):
+        if rows:
+            bind.execute(table.insert(), rows)
+            rows.clear()
+
+    skill_rows, interest_rows = [], []
+    for member_id, member_skills_json, interests_json in bind.execute(
+        sa.select(members.c.id, members.c.skills, members.c.interests).execution_options(yield_per=1000)
+    ):
+        seen = set()
+        for skill in _load(member_skills_json):
+            # Skill dicts, or bare strings in older rows
+            name = skill.get('name') if isinstance(skill, dict) else skill
+            if not name or name in seen:
+                continue
+            seen.add(name)
+            proficiency = (skill.get('proficiency') if isinstance(skill, dict) else None) or 'Beginner'
+            skill_rows.append({'member_id': member_id, 'skill_id': skill_id(name),
+                               'proficiency': proficiency, 'position': len(seen) - 1})
+        for position, name in enumerate(dict.fromkeys(n for n in _load(interests_json) if n)):
+            interest_rows.append({'member_id': member_id, 'skill_id': skill_id(name), 'position': position})
+        if len(skill_rows) + len(interest_rows) >= 1000:
+            flush(member_skills, skill_rows)
+            flush(member_interests, interest_rows)
+    flush(member_skills, skill_rows)
+    flush(member_interests, interest_rows)
+
+    tag_rows, module_rows = [], []
+    for path_id, tags_json, modules_json in bind.execute(
+        sa.select(paths.c.id, paths.c.skill_tags, paths.c.modules).execution_options(yield_per=1000)
+    ):
+        for position, name in enumerate(dict.fromkeys(n for n in _load(tags_json) if n)):
+            tag_rows.append({'path_id': path_id, 'skill_id': skill_id(name), 'position': position})
+        for position, module in enumerate(_load(modules_json)):
+            module = dict(module)
+            title = module.pop('title', '')
+            status = module.pop('status', None)
+            module_rows.append({'path_id': path_id, 'position': position, 'title': title,
+                                'status': status, 'details': module or None})
+        if len(tag_rows) + len(module_rows) >= 1000:
+            flush(path_tags, tag_rows)
+            flush(path_modules, module_rows)
+    flush(path_tags, tag_rows)
+    flush(path_modules, module_rows)
+
+    with op.batch_alter_table('members') as batch_op:
+        batch_op.drop_column('skills')
+        batch_op.drop_column('interests')
+    with op.batch_alter_table('learning_paths') as batch_op:
+        batch_op.drop_column('skill_tags')
+        batch_op.drop_column('modules')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('members') as batch_op:
+        batch_op.add_column(sa.Column('skills', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('interests', sa.JSON(), nullable=True))
+    with op.batch_alter_table('learning_paths') as batch_op:
+        batch_op.add_column(sa.Column('skill_tags', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('modules', sa.JSON(), nullable=True))
+
+    bind = op.get_bind()
+
+    def collect(query):
+        grouped = {}
+        for owner_id, value in bind.execute(query):
+            grouped.setdefault(owner_id, []).append(value)
+        return grouped
+
+    member_skill_lists = {}
+    for member_id, name, proficiency in bind.execute(
+        sa.select(member_skills.c.member_id, skills.c.name, member_skills.c.proficiency)
+        .join(skills, skills.c.id == member_skills.c.skill_id).order_by(member_skills.c.member_id, member_skills.c.position)
+    ):
+        member_skill_lists.setdefault(member_id, []).append({'name': name, 'proficiency': proficiency})
+    interests = collect(
+        sa.select(member_interests.c.member_id, skills.c.name)
+        .join(skills, skills.c.id == member_interests.c.skill_id).order_by(member_interests.c.member_id, member_interests.c.position)
+    )
+    tags = collect(
+        sa.select(path_tags.c.path_id, skills.c.name)
+        .join(skills, skills.c.id == path_tags.c.skill_id).order_by(path_tags.c.path_id, path_tags.c.position)
+    )
+    modules = {}
+    for path_id, title, status, details in bind.execute(
+        sa.select(path_modules.c.path_id, path_modules.c.title, path_modules.c.status, path_modules.c.details)
+        .order_by(path_modules.c.path_id, path_modules.c.position)
+    ):
+        module = {'title': title}
+        if status is not None:
+            module['status'] = status
+        module.update(_load(details) or {})
+        modules.setdefault(path_id, []).append(module)
+
+    for member_id in set(member_skill_lists) | set(interests):
+        bind.execute(members.update().where(members.c.id == member_id)
+                     .values(skills=member_skill_lists.get(member_id, []), interests=interests.get(member_id, [])))
+    for path_id in set(tags) | set(modules):
+        bind.execute(paths.update().where(paths.c.id == path_id)
+                     .values(skill_tags=tags.get(path_id, []), modules=modules.get(path_id, [])))
+
+    op.drop_index('ix_path_modules_path_id_position', table_name='path_modules')
+    op.drop_table('path_modules')
+    op.drop_index('ix_path_tags_skill_id_path_id', table_name='path_tags')
+    op.drop_table('path_tags')
+    op.drop_index('ix_member_interests_skill_id_member_id', table_name='member_interests')
+    op.drop_table('member_interests')
+    op.drop_index('ix_member_skills_skill_id_member_id', table_name='member_skills')
+    op.drop_table('member_skills')
+    op.drop_index(op.f('ix_skills_name'), table_name='skills')
+    op.drop_table('skills')
@@ -0,0 +1,49 @@
+"""make the keyset sort timestamps NOT NULL
+
+Revision ID: f2a6d8c4b1e3
+Revises: b7d2f4a6c8e1
+Create Date: 2026-10-19 10:12:48.613290
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6d8c4b1e3'
+down_revision: Union[str, None] = 'b7d2f4a6c8e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# table -> (keyset sort column, column to backfill it from)
+SORT_COLUMNS = {
+    'members': ('updated_at', 'joined_at'),
+    'tasks': ('updated_at', 'created_at'),
+    'learning_paths': ('updated_at', 'created_at'),
+    'task_log_entries': ('created_at', None),
+    'activity_logs': ('created_at', None),
+}
+
+
+def upgrade() -> None:
+    # Keyset pages order and compare on the bare column (so the indexes serve them); a NULL would never be reached
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    for name, (column, fallback) in SORT_COLUMNS.items():
+        columns = [sa.column(column, sa.DateTime)] + ([sa.column(fallback, sa.DateTime)] if fallback else [])
+        table = sa.table(name, *columns)
+        value = sa.func.coalesce(table.c[fallback], now) if fallback else now
+        bind.execute(table.update().where(table.c[column].is_(None)).values({column: value}))
+        if bind.dialect.name != 'sqlite':
+            # SQLite would rebuild the table (dropping its FTS triggers); the backfill and model defaults suffice there
+            op.alter_column(name, column, existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        for name, (column, _) in SORT_COLUMNS.items():
+            op.alter_column(name, column, existing_type=sa.DateTime(), nullable=True)
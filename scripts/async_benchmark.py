@@ -0,0 +1,85 @@
+"""Requests/sec for the async routes with and without the async engine.
+
+Each mode runs in a fresh interpreter (ASYNC_DB is read at import) against the
+same seeded scratch SQLite file, driving the ASGI app in-process at a fixed
+concurrency.
+
+    python scripts/async_benchmark.py --concurrency 200 --requests 4000
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+
+
+def seed(url):
+    from sqlalchemy.orm import sessionmaker
+    from database import Base, make_engine
+    from models import Member, Task
+
+    engine = make_engine(url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([Member(name=f"User {i}", email=f"user{i}@example.com", role="Developer", initials="U")
+                for i in range(1000)])
+    db.add_all([Task(title=f"Task {i}", assigned_to=i % 1000 + 1, priority="High" if i % 3 else "Low")
+                for i in range(20000)])
+    db.commit()
+    db.close()
+
+
+async def drive(concurrency, total):
+    import httpx
+    from main import app
+
+    paths = ["/api/members?limit=50", "/api/tasks?limit=50&priority=High", "/api/members/7", "/api/analytics"]
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(paths[i % len(paths)])
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                response = await client.get(queue.get_nowait())
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    sys.path.insert(0, BACKEND)
+
+    if args.child:
+        print(json.dumps({"rps": asyncio.run(drive(args.concurrency, args.requests))}))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        seed(url)
+        for mode in ("off", "on"):
+            env = dict(os.environ, DATABASE_URL=url, ASYNC_DB=mode)
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", "--concurrency", str(args.concurrency),
+                 "--requests", str(args.requests)],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            rps = json.loads(out.strip().splitlines()[-1])["rps"]
+            label = "async engine" if mode == "on" else "threadpool"
+            print(f"{label:13} concurrency={args.concurrency} {rps:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
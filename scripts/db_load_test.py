@@ -0,0 +1,99 @@
+"""Concurrent read/write throughput against a scratch SQLite database.
+
+Runs the same mixed workload with driver defaults (DB_TUNING=off) and with the
+tuned engine profile from backend/database.py, then prints both.
+
+    python scripts/db_load_test.py --threads 32 --seconds 10 --write-ratio 0.3
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, make_engine
+from models import Member, Task
+
+
+def seed(Session, members=500, tasks=5000):
+    db = Session()
+    db.add_all([Member(name=f"User {i}", email=f"user{i}@example.com", role="Developer", initials="U")
+                for i in range(members)])
+    db.flush()
+    db.add_all([Task(title=f"Task {i}", assigned_to=random.randint(1, members)) for i in range(tasks)])
+    db.commit()
+    db.close()
+
+
+def worker(Session, stop, write_ratio, stats, lock):
+    reads = writes = errors = 0
+    rng = random.Random()
+    while not stop.is_set():
+        db = Session()
+        try:
+            if rng.random() < write_ratio:
+                task = db.get(Task, rng.randint(1, 5000))
+                task.status = rng.choice(["Pending", "In Progress", "Completed"])
+                db.add(Task(title="load", assigned_to=task.assigned_to))
+                db.commit()
+                writes += 1
+            else:
+                member_id = rng.randint(1, 500)
+                db.query(Task).filter(Task.assigned_to == member_id).limit(20).all()
+                reads += 1
+        except OperationalError:
+            db.rollback()
+            errors += 1
+        finally:
+            db.close()
+    with lock:
+        stats["reads"] += reads
+        stats["writes"] += writes
+        stats["errors"] += errors
+
+
+def run(tuned, threads, seconds, write_ratio):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{tmp}/load.db", tuned=tuned,
+                             # Baseline keeps the pysqlite default 5s lock wait
+                             **({} if tuned else {"pool_size": threads, "max_overflow": 0}))
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        seed(Session)
+
+        stats = {"reads": 0, "writes": 0, "errors": 0}
+        stop, lock = threading.Event(), threading.Lock()
+        pool = [threading.Thread(target=worker, args=(Session, stop, write_ratio, stats, lock))
+                for _ in range(threads)]
+        for t in pool:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in pool:
+            t.join()
+        engine.dispose()
+    return {k: v / seconds if k != "errors" else v for k, v in stats.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    args = parser.parse_args()
+
+    for label, tuned in (("default", False), ("tuned", True)):
+        r = run(tuned, args.threads, args.seconds, args.write_ratio)
+        print(f"{label:8} reads/s={r['reads']:8.1f} writes/s={r['writes']:7.1f} "
+              f"locked errors={r['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Milliseconds per 10k rows for GET /members and GET /tasks, default vs fast serialization.
+
+Seeds a scratch SQLite file, then pages through each endpoint (limit=1000,
+following X-Next-Cursor) via the ASGI app in-process, with FAST_JSON_LISTS off
+and on. Reports the median of --repeat full passes.
+
+    python scripts/serialization_benchmark.py --rows 10000 --repeat 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+SKILLS = ["Python", "React", "SQL", "Go", "Docker", "Figma"]
+
+
+def seed(rows):
+    from datetime import datetime
+    from sqlalchemy import insert
+    from database import Base, SessionLocal, engine
+    import models
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    now = datetime.utcnow()
+    db.execute(insert(models.Member), [
+        {"name": f"User {i}", "email": f"user{i}@example.com", "role": "Developer", "initials": "U",
+         "participation_score": i % 100, "learning_path_status": "In Progress", "joined_at": now, "updated_at": now}
+        for i in range(rows)
+    ])
+    skill_ids = models.resolve_skill_ids(db.connection(), SKILLS)
+    db.execute(insert(models.MemberSkill), [
+        {"member_id": i + 1, "skill_id": skill_ids[SKILLS[(i + k) % len(SKILLS)]], "proficiency": "Intermediate",
+         "position": k}
+        for i in range(rows) for k in range(2)
+    ])
+    db.execute(insert(models.Task), [
+        {"title": f"Task {i}", "description": "Benchmark task " * 4, "assigned_to": i % rows + 1,
+         "priority": "High" if i % 3 else "Low", "logs": [], "created_at": now, "updated_at": now}
+        for i in range(rows)
+    ])
+    db.commit()
+    db.close()
+
+
+async def read_all(client, path):
+    url, rows = f"{path}?limit=1000", 0
+    while url:
+        response = await client.get(url)
+        response.raise_for_status()
+        rows += len(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        url = f"{path}?limit=1000&cursor={cursor}" if cursor else None
+    return rows
+
+
+async def run(repeat):
+    import httpx
+    import serialization
+    from main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for path in ("/api/members", "/api/tasks"):
+            results = {}
+            for fast in (False, True):
+                serialization.FAST_LISTS = fast
+                await read_all(client, path) # Warm-up
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    rows = await read_all(client, path)
+                    timings.append((time.perf_counter() - start) * 1000 / rows * 10000)
+                results[fast] = statistics.median(timings)
+            speedup = results[False] / results[True]
+            print(f"{path:13} default {results[False]:8.1f} ms/10k rows   fast {results[True]:8.1f} ms/10k rows"
+                  f"   ({speedup:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Read at import by database.py
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/bench.db"
+        os.environ.setdefault("ANALYTICS_RECONCILE_INTERVAL", "0")
+        sys.path.insert(0, BACKEND)
+        seed(args.rows)
+        asyncio.run(run(args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,14 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from backend.database import Base, get_db
+from backend.database import Base, ThreadedSession, get_async_db, get_db, get_session_factory
 from backend.main import app
+from backend.ml.recommender import module_index_cache
+from backend.auth import principal_cache
+from backend.skill_index import skill_index
+from backend.response_cache import response_cache
+from backend.activity import activity_log
+from backend.idempotency import idempotency_store
 
 # Use in-memory SQLite for tests
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -26,6 +32,12 @@ def db():
     finally:
         db.close()
         Base.metadata.drop_all(bind=engine)
+        module_index_cache.invalidate()
+        principal_cache.clear()
+        skill_index.invalidate()
+        response_cache.clear()
+        activity_log.discard()
+        idempotency_store.clear()
 
 @pytest.fixture(scope="function")
 def client(db):
@@ -35,6 +47,13 @@ def client(db):
         finally:
             pass
     
+    def override_get_async_db():
+        yield ThreadedSession(db)
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
     yield TestClient(app)
     del app.dependency_overrides[get_db]
+    del app.dependency_overrides[get_async_db]
+    del app.dependency_overrides[get_session_factory]
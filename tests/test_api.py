@@ -1,4 +1,6 @@
-from backend.models import Member, Task, LearningPath
+import json
+from sqlalchemy import text
+from backend.models import ActivityLog, Member, Task, LearningPath
 from backend.auth import create_access_token
 
 def test_health_check(client):
@@ -135,6 +137,911 @@ def test_bot_command(client):
     assert isinstance(data, list) # Should return recommendations list
 
 def test_metrics(client):
+    client.get("/api/members/12345")
     response = client.get("/metrics")
     assert response.status_code == 200
-    assert "http_requests_total" in response.json()
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE http_requests_total counter" in body
+    assert 'http_requests_total{method="GET",route="/api/members/{id}",status="404"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/members/{id}",le="+Inf"}' in body
+    assert "/api/members/12345" not in body
+
+def test_tasks_keyset_pagination(client):
+    for i in range(5):
+        client.post("/api/tasks", json={"title": f"Task {i}", "priority": "High" if i % 2 else "Low"})
+
+    first = client.get("/api/tasks?limit=2")
+    assert first.status_code == 200
+    assert [t["title"] for t in first.json()] == ["Task 0", "Task 1"]
+    cursor = first.headers["X-Next-Cursor"]
+
+    seen = [t["id"] for t in first.json()]
+    while cursor:
+        page = client.get(f"/api/tasks?limit=2&cursor={cursor}")
+        seen += [t["id"] for t in page.json()]
+        cursor = page.headers.get("X-Next-Cursor")
+    assert len(seen) == 5 and seen == sorted(seen)
+
+    high = client.get("/api/tasks?priority=High").json()
+    assert [t["title"] for t in high] == ["Task 1", "Task 3"]
+
+def test_members_filter_and_bad_cursor(client):
+    client.post("/api/auth/register", json={"name": "Dev", "email": "dev@example.com", "password": "password", "role": "Developer"})
+    client.post("/api/auth/register", json={"name": "Des", "email": "des@example.com", "password": "password", "role": "Designer"})
+
+    response = client.get("/api/members?role=Designer&sort=updated_at")
+    assert response.status_code == 200
+    assert [m["email"] for m in response.json()] == ["des@example.com"]
+    assert "X-Next-Cursor" not in response.headers
+
+    assert client.get("/api/members?cursor=not-a-cursor").status_code == 400
+    assert client.get("/api/members?cursor=WzFd").status_code == 400 # base64 of [1]
+
+def test_updated_at_pagination_uses_index(client, db):
+    from datetime import datetime
+    from sqlalchemy import select, update
+    from backend.pagination import keyset_statement
+    for i in range(5):
+        client.post("/api/tasks", json={"title": f"Task {i}"})
+    # Ties on updated_at fall back to id
+    db.execute(update(Task).where(Task.id.in_([2, 4])).values(updated_at=datetime(2020, 1, 1)))
+    db.commit()
+
+    seen, cursor = [], ""
+    while True:
+        page = client.get("/api/tasks?limit=2&sort=updated_at" + (f"&cursor={cursor}" if cursor else ""))
+        seen += [t["id"] for t in page.json()]
+        cursor = page.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == [2, 4, 1, 3, 5]
+
+    # Each page is a range search on (updated_at, id), not a scan plus sort
+    first = client.get("/api/tasks?limit=2&sort=updated_at").headers["X-Next-Cursor"]
+    stmt = keyset_statement(select(Task), Task, 2, first, sort="updated_at")
+    compiled = stmt.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = " ".join(str(row[-1]) for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    assert "ix_tasks_updated_at_id" in plan and "SEARCH" in plan and "TEMP B-TREE" not in plan
+
+def test_recommendations_follow_path_writes(client):
+    member_id = client.post(
+        "/api/auth/register",
+        json={"name": "Py Dev", "email": "py@example.com", "password": "password", "role": "Developer"}
+    ).json()["id"]
+    client.post(f"/api/members/{member_id}/skills", json={"name": "Python"})
+
+    path = client.post("/api/paths", json={
+        "name": "Backend", "description": "APIs", "difficulty": "Beginner", "estimated_duration": "5h",
+        "skill_tags": ["Go"], "modules": [{"title": "Go Basics"}]
+    }).json()
+    recs = client.post(f"/api/recommendations/{member_id}").json()
+    assert recs[0]["reason"] == "Popular for beginners"
+
+    client.put(f"/api/paths/{path['id']}", json={
+        "name": "Backend", "description": "APIs", "difficulty": "Beginner", "estimated_duration": "5h",
+        "skill_tags": ["Python"], "modules": [{"title": "Python Services"}]
+    })
+    recs = client.post(f"/api/recommendations/{member_id}").json()
+    assert recs[0]["module"] == "Python Services"
+    assert recs[0]["score"] > 0.05
+
+def test_batch_recommendations_stream_ndjson(client):
+    import json
+    ids = []
+    for name, skill in [("A", "Python"), ("B", "React")]:
+        member_id = client.post(
+            "/api/auth/register",
+            json={"name": name, "email": f"{name}@example.com", "password": "password", "role": "Developer"}
+        ).json()["id"]
+        client.post(f"/api/members/{member_id}/skills", json={"name": skill})
+        ids.append(member_id)
+
+    response = client.post("/api/recommendations/batch", json={"member_ids": ids + [999], "top_k": 1})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(l) for l in response.text.splitlines()]
+    assert [l["member_id"] for l in lines] == ids + [999]
+    assert lines[0]["recommendations"][0]["module"] == "Intro to Python"
+    assert lines[1]["recommendations"][0]["module"] == "Advanced React"
+    assert lines[2]["error"] == "Member not found"
+
+    everyone = client.post("/api/recommendations/batch", json={"member_ids": "all"})
+    assert len(everyone.text.splitlines()) == 2
+
+def test_register_returns_503_when_hash_queue_full(client, monkeypatch):
+    from backend import auth
+    monkeypatch.setattr(auth, "HASH_QUEUE_LIMIT", 0)
+    response = client.post(
+        "/api/auth/register",
+        json={"name": "Busy", "email": "busy@example.com", "password": "password", "role": "Developer"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+def test_login_rehashes_when_cost_changes(client, db, monkeypatch):
+    from backend import auth
+    monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 4)
+    client.post(
+        "/api/auth/register",
+        json={"name": "Cost", "email": "cost@example.com", "password": "password", "role": "Developer"}
+    )
+    member = db.query(Member).filter(Member.email == "cost@example.com").first()
+    assert auth.hash_rounds(member.password_hash) == 4
+
+    monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 5)
+    response = client.post("/api/auth/login", data={"username": "cost@example.com", "password": "password"})
+    assert response.status_code == 200
+    db.refresh(member)
+    assert auth.hash_rounds(member.password_hash) == 5
+    assert client.post("/api/auth/login", data={"username": "cost@example.com", "password": "password"}).status_code == 200
+
+def test_current_user_cache_evicted_on_member_write(client):
+    from backend.auth import principal_cache
+    member_id = client.post(
+        "/api/auth/register",
+        json={"name": "Token User", "email": "token@example.com", "password": "password", "role": "Developer"}
+    ).json()["id"]
+    token = client.post("/api/auth/login", data={"username": "token@example.com", "password": "password"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    me = client.get("/api/auth/me", headers=headers)
+    assert me.status_code == 200
+    assert me.json() == {"id": member_id, "email": "token@example.com", "name": "Token User", "role": "Developer"}
+    assert principal_cache.get(token).id == member_id
+
+    client.put(f"/api/members/{member_id}", json={"name": "Renamed"})
+    assert principal_cache.get(token) is None
+    assert client.get("/api/auth/me", headers=headers).json()["name"] == "Renamed"
+
+    client.delete(f"/api/members/{member_id}")
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+def test_principal_cache_versions():
+    from backend.auth import PrincipalCache
+    from backend.schemas import Principal
+    cache = PrincipalCache(maxsize=10, max_versions=4)
+    ada = Principal(id=1, email="ada@example.com", name="Ada", role="Developer")
+
+    # A write between the version read and put() keeps the stale principal out
+    version = cache.version(1)
+    cache.evict_member(1)
+    cache.put("t1", ada, version)
+    assert cache.get("t1") is None
+    cache.put("t1", ada, cache.version(1))
+    assert cache.get("t1") == ada
+
+    # Versions are capped; forgetting one invalidates instead of reviving
+    for member_id in range(2, 8):
+        cache.evict_member(member_id)
+    assert len(cache._versions) <= 4
+    assert cache.get("t1") is None
+
+def test_legacy_email_only_token_still_accepted(client):
+    client.post(
+        "/api/auth/register",
+        json={"name": "Legacy", "email": "legacy@example.com", "password": "password", "role": "Developer"}
+    )
+    token = create_access_token({"sub": "legacy@example.com"})
+    response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["email"] == "legacy@example.com"
+
+def test_analytics_computed_from_data(client, db):
+    for i, skills in enumerate([["Python", "React"], ["Python"], []]):
+        member_id = client.post(
+            "/api/auth/register",
+            json={"name": f"M{i}", "email": f"m{i}@example.com", "password": "password", "role": "Developer"}
+        ).json()["id"]
+        for skill in skills:
+            client.post(f"/api/members/{member_id}/skills", json={"name": skill})
+    path_id = client.post("/api/paths", json={
+        "name": "Web", "description": "d", "difficulty": "Beginner", "estimated_duration": "1h"
+    }).json()["id"]
+    for status in ["Completed", "Pending", "Completed", "In Progress"]:
+        client.post("/api/tasks", json={"title": "t", "status": status, "path_id": path_id})
+
+    data = client.get("/api/analytics").json()
+    assert data["total_members"] == 3
+    assert data["active_tasks"] == 2
+    assert data["avg_completion"] == "50%"
+    assert data["member_growth"][-1] == {"name": "Week 4", "value": 3}
+    assert data["skills_distribution"] == [{"name": "Python", "value": 67}, {"name": "React", "value": 33}]
+    assert data["path_completion_stats"] == [{"name": "Web", "completed": 50, "in_progress": 50}]
+
+    # Counters move with each write; no regeneration needed
+    client.post("/api/tasks", json={"title": "t", "status": "Pending", "path_id": path_id})
+    assert client.get("/api/analytics").json()["active_tasks"] == 3
+    cached = client.get("/api/analytics")
+    assert client.post("/api/analytics/regenerate").status_code == 200
+    # The new snapshot invalidates the cached response straight away
+    assert client.get("/api/analytics", headers={"If-None-Match": cached.headers["etag"]}).status_code == 200
+    # Regenerating again replaces the one snapshot row
+    assert client.post("/api/analytics/regenerate").status_code == 200
+    assert db.execute(text("SELECT count(*) FROM analytics_snapshots")).scalar() == 1
+
+def test_analytics_counters_reconcile(client, db):
+    member_id = client.post(
+        "/api/auth/register",
+        json={"name": "M", "email": "m@example.com", "password": "password", "role": "Developer"}
+    ).json()["id"]
+    client.post(f"/api/members/{member_id}/skills", json={"name": "Go"})
+    client.put(f"/api/members/{member_id}", json={"role": "Lead", "participation_score": 5})
+    path_id = client.post("/api/paths", json={
+        "name": "P", "description": "d", "difficulty": "Beginner", "estimated_duration": "1h"
+    }).json()["id"]
+    a = client.post("/api/tasks", json={"title": "a", "path_id": path_id}).json()["id"]
+    b = client.post("/api/tasks", json={"title": "b"}).json()["id"]
+    client.put(f"/api/tasks/{a}", json={"status": "Completed"})
+    client.delete(f"/api/tasks/{b}")
+
+    data = client.get("/api/analytics").json()
+    assert data["engagement"] == "100%"
+    assert data["avg_completion"] == "100%"
+    assert data["path_completion_stats"] == [{"name": "P", "completed": 100, "in_progress": 0}]
+    assert client.post("/api/admin/analytics/reconcile").json()["drift"] == []
+
+    # Drift from a write that bypassed the ORM is reported and repaired
+    db.execute(text("UPDATE analytics_counters SET value = value + 2 WHERE metric = 'members' AND key = ''"))
+    db.commit()
+    drift = client.post("/api/admin/analytics/reconcile").json()["drift"]
+    assert drift == [{"metric": "members", "key": "", "expected": 1, "actual": 3}]
+    assert client.get("/api/analytics").json()["total_members"] == 1
+
+def test_bulk_import_members_csv(client):
+    client.post(
+        "/api/auth/register",
+        json={"name": "Existing", "email": "taken@example.com", "password": "password", "role": "Developer"}
+    )
+    csv_body = (
+        "name,email,password,role\n"
+        "Ada Lovelace,ada@example.com,secret,Lead\n"
+        "No Password,nopass@example.com,,\n"
+        ",missing-name@example.com,x,Developer\n"
+        "Dup,taken@example.com,x,Developer\n"
+        "Again,ada@example.com,x,Developer\n"
+    )
+    resp = client.post("/api/admin/import/members", files={"file": ("members.csv", csv_body, "text/csv")})
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["imported"] == 2
+    assert [e["line"] for e in report["errors"]] == [4, 5, 6]
+    assert report["errors"][0]["errors"] == ["name: Field required"]
+    assert report["errors"][1]["errors"] == report["errors"][2]["errors"] == ["email: Email already registered"]
+
+    login = client.post("/api/auth/login", data={"username": "ada@example.com", "password": "secret"})
+    assert login.status_code == 200
+    assert client.post("/api/auth/login", data={"username": "nopass@example.com", "password": "x"}).status_code == 401
+    assert client.get("/api/analytics").json()["total_members"] == 3
+    assert client.post("/api/admin/analytics/reconcile").json()["drift"] == []
+
+def test_member_export_import_round_trip(client, monkeypatch):
+    from backend import bulk
+    from backend.auth import HashingOverloaded
+    member_id = client.post(
+        "/api/auth/register",
+        json={"name": "Ada Lovelace", "email": "ada@example.com", "password": "password", "role": "Lead"}
+    ).json()["id"]
+    client.put(f"/api/members/{member_id}", json={
+        "avatar": "https://example.com/ada.png", "participation_score": 42, "learning_path_status": "In Progress",
+        "skills": [{"name": "Python", "proficiency": "Expert"}, {"name": "Go"}], "interests": ["Rust"],
+    })
+    before = client.get(f"/api/members/{member_id}").json()
+    exported = client.get("/api/admin/export/members?format=csv").text
+    client.delete(f"/api/members/{member_id}")
+
+    report = client.post("/api/admin/import/members", files={"file": ("members.csv", exported, "text/csv")}).json()
+    assert report["imported"] == 1
+    [after] = client.get("/api/members").json()
+    assert {k: v for k, v in after.items() if k != "id"} == {k: v for k, v in before.items() if k != "id"}
+    assert client.post("/api/admin/analytics/reconcile").json()["drift"] == []
+
+    # A hashing pool that stays busy fails the rows with passwords instead of stalling the import
+    async def overloaded(passwords):
+        raise HashingOverloaded()
+    monkeypatch.setattr(bulk, "hash_passwords_async", overloaded)
+    monkeypatch.setattr(bulk, "IMPORT_HASH_WAIT", 0.2)
+    csv_body = "name,email,password\nA,a@example.com,x\nB,b@example.com,\nC,c@example.com,y\n"
+    report = client.post("/api/admin/import/members", files={"file": ("members.csv", csv_body, "text/csv")}).json()
+    assert report["imported"] == 1
+    assert [e["line"] for e in report["errors"]] == [2, 4]
+    assert report["errors"][0]["errors"][0].startswith("password: Server busy")
+
+def test_bulk_import_tasks_ndjson_and_export(client):
+    path_id = client.post("/api/paths", json={
+        "name": "P", "description": "d", "difficulty": "Beginner", "estimated_duration": "1h"
+    }).json()["id"]
+    lines = [
+        json.dumps({"title": "One", "path_id": path_id, "status": "Completed"}),
+        "{not json",
+        json.dumps({"title": "Two", "assigned_to": 999}),
+        "",
+        json.dumps({"title": "Three", "priority": "High"}),
+    ]
+    resp = client.post("/api/admin/import/tasks?format=ndjson",
+                       files={"file": ("tasks.txt", "\n".join(lines), "application/octet-stream")})
+    report = resp.json()
+    assert report["imported"] == 2
+    assert [(e["line"], e["errors"][0].split(":")[0]) for e in report["errors"]] == [(2, "Invalid JSON"), (3, "assigned_to")]
+    assert client.get("/api/analytics").json()["active_tasks"] == 1
+
+    exported = client.get("/api/admin/export/tasks")
+    assert exported.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in exported.text.splitlines()]
+    assert [r["title"] for r in rows] == ["One", "Three"]
+
+    # A CSV export imports back unchanged, JSON columns included
+    client.post("/api/paths", json={
+        "name": "Q", "description": "d", "difficulty": "Advanced", "estimated_duration": "2h",
+        "skill_tags": ["Go"], "modules": [{"title": "Intro"}]
+    })
+    csv_export = client.get("/api/admin/export/paths?format=csv").text
+    assert csv_export.splitlines()[0].startswith("name,description,difficulty,skill_tags")
+    report = client.post("/api/admin/import/paths", files={"file": ("paths.csv", csv_export, "text/csv")}).json()
+    assert report["imported"] == 2
+    paths = client.get("/api/paths?fields=skill_tags,modules").json()
+    assert paths[-1]["skill_tags"] == ["Go"] and paths[-1]["modules"] == [{"title": "Intro"}]
+
+def test_bulk_import_unknown_format(client):
+    resp = client.post("/api/admin/import/members", files={"file": ("members.xlsx", b"x", "application/octet-stream")})
+    assert resp.status_code == 400
+    assert client.post("/api/admin/import/widgets", files={"file": ("w.csv", "a\n", "text/csv")}).status_code == 422
+
+def test_skills_stored_in_link_tables(client, db):
+    member_id = client.post(
+        "/api/auth/register",
+        json={"name": "Link", "email": "link@example.com", "password": "password", "role": "Developer"}
+    ).json()["id"]
+    client.post(f"/api/members/{member_id}/skills", json={"name": "Go", "proficiency": "Advanced"})
+    client.post(f"/api/members/{member_id}/skills", json={"name": "Go"})
+    resp = client.put(f"/api/members/{member_id}", json={
+        "skills": [{"name": "Go", "proficiency": "Expert"}, {"name": "Rust"}], "interests": ["AI", "Go"]
+    })
+    assert resp.json()["skills"] == [{"name": "Go", "proficiency": "Expert"}, {"name": "Rust", "proficiency": "Beginner"}]
+    assert resp.json()["interests"] == ["AI", "Go"]
+
+    path = client.post("/api/paths", json={
+        "name": "Systems", "description": "d", "difficulty": "Advanced", "estimated_duration": "1h",
+        "skill_tags": ["Rust", "Go"], "modules": [{"title": "Ownership", "status": "locked", "id": "mod1"}]
+    }).json()
+    assert path["skill_tags"] == ["Rust", "Go"]
+    assert path["modules"] == [{"title": "Ownership", "status": "locked", "id": "mod1"}]
+
+    # One vocabulary shared by skills, interests and tags
+    assert db.execute(text("SELECT name FROM skills ORDER BY name")).scalars().all() == ["AI", "Go", "Rust"]
+    has_rust = db.execute(text(
+        "SELECT ms.member_id FROM member_skills ms JOIN skills s ON s.id = ms.skill_id WHERE s.name = 'Rust'"
+    )).scalars().all()
+    assert has_rust == [member_id]
+    assert client.post("/api/admin/analytics/reconcile").json()["drift"] == []
+
+    client.delete(f"/api/members/{member_id}")
+    assert db.execute(text("SELECT count(*) FROM member_skills")).scalar() == 0
+    assert client.post("/api/admin/analytics/reconcile").json()["drift"] == []
+
+def test_member_search(client, db):
+    def member(name, role, skills):
+        member_id = client.post(
+            "/api/auth/register",
+            json={"name": name, "email": f"{name}@example.com", "password": "password", "role": role}
+        ).json()["id"]
+        client.put(f"/api/members/{member_id}", json={"skills": skills})
+        return member_id
+
+    ada = member("ada", "Developer", [{"name": "Python", "proficiency": "Advanced"}, {"name": "React"}])
+    bob = member("bob", "Developer", [{"name": "Python", "proficiency": "Beginner"}, {"name": "React"}])
+    cy = member("cy", "Designer", [{"name": "Python", "proficiency": "Expert"}, {"name": "React", "proficiency": "Advanced"}])
+    member("dee", "Developer", [{"name": "Python", "proficiency": "Expert"}])
+
+    hits = client.get("/api/members/search?skills=Python:Intermediate,React").json()
+    assert [(h["id"], h["match_score"]) for h in hits] == [(cy, 7), (ada, 4)]
+    assert hits[0]["skills"][0] == {"name": "Python", "proficiency": "Expert"}
+    assert [h["id"] for h in client.get("/api/members/search?skills=Python,React&role=Developer").json()] == [ada, bob]
+    assert client.get("/api/members/search?skills=Python&min_proficiency=Expert&limit=1").json()[0]["id"] == cy
+    assert client.get("/api/members/search?skills=Cobol").json() == []
+
+    # Writes are reflected without a rebuild
+    client.post(f"/api/members/{bob}/skills", json={"name": "Go", "proficiency": "Expert"})
+    client.put(f"/api/members/{ada}", json={"role": "Lead"})
+    assert [h["id"] for h in client.get("/api/members/search?skills=Go").json()] == [bob]
+    assert [h["id"] for h in client.get("/api/members/search?skills=Python,React&role=Developer").json()] == [bob]
+    client.delete(f"/api/members/{cy}")
+    assert [h["id"] for h in client.get("/api/members/search?skills=Python:Intermediate,React").json()] == [ada]
+    assert client.get("/api/members/search?skills=Python:Guru").status_code == 400
+
+    # A write committed during a rebuild is replayed onto it, leaving the index fresh
+    from backend.skill_index import SkillIndex
+    index = SkillIndex()
+
+    class Racing:
+        def __init__(self, db):
+            self.db, self.raced = db, False
+
+        def execute(self, statement):
+            if not self.raced:
+                self.raced = True
+                index.apply({bob: ("Developer", {"Rust": 4})})
+            return self.db.execute(statement)
+
+    index.rebuild(Racing(db))
+    assert index.is_fresh()
+    assert index.search({"Rust": 1}) == [(bob, 4)]
+
+def test_full_text_search(client):
+    path_id = client.post("/api/paths", json={
+        "name": "Backend Engineering", "description": "Servers, databases and APIs", "difficulty": "Advanced",
+        "estimated_duration": "8w", "modules": [{"title": "PostgreSQL internals"}, {"title": "Caching"}]
+    }).json()["id"]
+    deploy = client.post("/api/tasks", json={"title": "Deploy the API server", "description": "Use the staging database"}).json()["id"]
+    client.post("/api/tasks", json={"title": "Write frontend docs"})
+
+    hits = client.get("/api/search?q=database").json()
+    assert {(h["type"], h["id"]) for h in hits} == {("task", deploy), ("path", path_id)}
+    assert "<mark>database</mark>" in next(h for h in hits if h["type"] == "task")["snippet"]
+
+    # Title matches outrank description matches
+    hits = client.get("/api/search?q=api").json()
+    assert [(h["type"], h["id"]) for h in hits][0] == ("task", deploy)
+
+    assert [h["id"] for h in client.get("/api/search?q=postgre*").json()] == [path_id]
+    assert client.get("/api/search?q=postgre").json() == []
+    assert [h["type"] for h in client.get("/api/search?q=caching&type=path").json()] == ["path"]
+    assert client.get("/api/search?q=caching&type=task").json() == []
+
+    # Triggers keep the index in step with updates and deletes
+    client.put(f"/api/tasks/{deploy}", json={"title": "Rollback plan", "description": "No storage here"})
+    assert [h["type"] for h in client.get("/api/search?q=database").json()] == ["path"]
+    assert [h["id"] for h in client.get("/api/search?q=rollback").json()] == [deploy]
+    client.put(f"/api/paths/{path_id}", json={
+        "name": "Backend Engineering", "description": "Servers", "difficulty": "Advanced",
+        "estimated_duration": "8w", "modules": [{"title": "Queues"}]
+    })
+    assert client.get("/api/search?q=caching").json() == []
+    assert [h["id"] for h in client.get("/api/search?q=queues").json()] == [path_id]
+    client.delete(f"/api/paths/{path_id}")
+    assert client.get("/api/search?q=queues").json() == []
+    assert client.get('/api/search?q="  OR *').json() == []
+
+def test_response_cache_etags(client, monkeypatch):
+    from backend import endpoints
+    path = {"description": "Intro", "difficulty": "Beginner", "estimated_duration": "5h"}
+    client.post("/api/paths", json=dict(path, name="Python Basics", skill_tags=["Python"]))
+    client.post("/api/paths", json=dict(path, name="React", skill_tags=["React"]))
+
+    first = client.get("/api/paths?limit=1")
+    etag = first.headers["etag"]
+    assert first.headers["x-next-cursor"]
+
+    # Revalidation doesn't reach the route or its DB dependency
+    def no_db():
+        raise AssertionError("route ran")
+    monkeypatch.setitem(client.app.dependency_overrides, endpoints.get_async_db, no_db)
+    assert client.get("/api/paths?limit=1", headers={"If-None-Match": etag}).status_code == 304
+    cached = client.get("/api/paths?limit=1")
+    assert cached.json() == first.json()
+    assert cached.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+    monkeypatch.undo()
+
+    # Any write to the path tables changes the ETag
+    path_id = first.json()[0]["id"]
+    client.put(f"/api/paths/{path_id}", json=dict(path, name="Python Fundamentals"))
+    changed = client.get("/api/paths?limit=1", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()[0]["name"] == "Python Fundamentals"
+    assert changed.headers["etag"] != etag
+
+    assert "etag" not in client.get("/api/settings").headers # This first read created the row
+    settings = client.get("/api/settings")
+    assert client.get("/api/settings", headers={"If-None-Match": settings.headers["etag"]}).status_code == 304
+    client.put("/api/settings", json={"theme": "light", "accent_color": "#000000", "bot_enabled": True,
+                                      "in_app_notifications": True, "email_notifications": False})
+    assert client.get("/api/settings", headers={"If-None-Match": settings.headers["etag"]}).json()["theme"] == "light"
+
+def test_response_cache_shared_versions(tmp_path):
+    import asyncio
+    from backend.response_cache import ResponseCache, SQLiteVersionStore
+
+    path = str(tmp_path / "versions.db")
+    worker_a, worker_b = ResponseCache(SQLiteVersionStore(path)), ResponseCache(SQLiteVersionStore(path))
+    etag = lambda cache: asyncio.run(cache.etag("/api/paths?", ("learning_paths",)))
+
+    assert etag(worker_a) == etag(worker_b)
+    before = etag(worker_b)
+    worker_a.bump(["learning_paths"])
+    assert etag(worker_b) != before
+    assert etag(worker_a) == etag(worker_b)
+    worker_a.bump(["members"])
+    assert asyncio.run(worker_b.etag("/api/paths?", ("learning_paths",))) == etag(worker_a)
+
+def test_fast_list_serialization_matches_default(client, monkeypatch):
+    from backend import serialization
+    for i in range(3):
+        member_id = client.post(
+            "/api/auth/register",
+            json={"name": f"User {i}", "email": f"user{i}@example.com", "password": "password", "role": "Developer"}
+        ).json()["id"]
+        client.put(f"/api/members/{member_id}", json={"skills": [{"name": "Python", "proficiency": "Expert"}],
+                                                        "interests": ["Go", "Rust"][:i]})
+        client.post("/api/tasks", json={"title": f"Task {i}", "assigned_to": member_id, "due_date": "2030-01-02T03:04:05"})
+
+    urls = ["/api/members?limit=2", "/api/members?limit=2&sort=updated_at", "/api/tasks?limit=2", "/api/tasks?assigned_to=2"]
+    default = [client.get(url) for url in urls]
+    monkeypatch.setattr(serialization, "FAST_LISTS", True)
+    fast = [client.get(url) for url in urls]
+    for slow_page, fast_page in zip(default, fast):
+        assert fast_page.json() == slow_page.json()
+        assert fast_page.headers.get("x-next-cursor") == slow_page.headers.get("x-next-cursor")
+    cursor = fast[0].headers["x-next-cursor"]
+    assert [m["name"] for m in client.get(f"/api/members?limit=2&cursor={cursor}").json()] == ["User 2"]
+
+def test_sparse_fieldsets(client, db, monkeypatch):
+    from sqlalchemy import event
+    from backend import serialization
+    member_id = client.post(
+        "/api/auth/register",
+        json={"name": "Ada Lovelace", "email": "ada@example.com", "password": "password", "role": "Developer"}
+    ).json()["id"]
+    client.put(f"/api/members/{member_id}", json={"skills": [{"name": "Python"}], "interests": ["Go"]})
+    client.post("/api/tasks", json={"title": "Task", "assigned_to": member_id})
+    client.post("/api/paths", json={"name": "P", "description": "d", "difficulty": "Beginner",
+                                    "estimated_duration": "1h", "modules": [{"title": "Intro"}]})
+
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    db.expunge_all()
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    roster = client.get("/api/members?fields=name,initials")
+    event.remove(db.get_bind(), "before_cursor_execute", record)
+    assert roster.json() == [{"id": member_id, "name": "Ada Lovelace", "initials": "AL"}]
+    # Only the asked-for columns are read, and the link tables not at all
+    assert len(statements) == 1 and "members.email" not in statements[0]
+
+    assert client.get(f"/api/members/{member_id}?fields=skills").json() == {
+        "id": member_id, "skills": [{"name": "Python", "proficiency": "Beginner"}]}
+    assert "avatar" in client.get(f"/api/members/{member_id}").json()
+    assert client.get("/api/members?fields=password_hash").status_code == 400
+
+    # Heavy fields are left out of list views unless asked for
+    assert "logs" not in client.get("/api/tasks").json()[0]
+    assert client.get("/api/tasks?fields=logs").json() == [{"id": 1, "logs": []}]
+    assert "modules" not in client.get("/api/paths").json()[0]
+    assert client.get("/api/paths?fields=modules").json()[0]["modules"] == [{"title": "Intro"}]
+
+    monkeypatch.setattr(serialization, "FAST_LISTS", True)
+    assert client.get("/api/members?fields=name,interests").json() == [{"id": member_id, "name": "Ada Lovelace", "interests": ["Go"]}]
+    assert "logs" not in client.get("/api/tasks").json()[0]
+
+def test_composite_views_constant_query_count(client, db):
+    from sqlalchemy import event
+    path_id = client.post("/api/paths", json={"name": "P", "description": "d", "difficulty": "Beginner",
+                                              "estimated_duration": "1h", "skill_tags": ["Python"]}).json()["id"]
+
+    def add_members(start, count):
+        for i in range(start, start + count):
+            member_id = client.post(
+                "/api/auth/register",
+                json={"name": f"User {i}", "email": f"user{i}@example.com", "password": "password"}
+            ).json()["id"]
+            client.put(f"/api/members/{member_id}", json={"skills": [{"name": "Python"}]})
+            db.get(Member, member_id).learning_path_id = path_id
+            db.commit()
+            for j in range(2):
+                client.post("/api/tasks", json={"title": f"Task {i}.{j}", "assigned_to": member_id, "path_id": path_id})
+
+    def count_queries(url):
+        statements = []
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        db.expunge_all()
+        event.listen(db.get_bind(), "before_cursor_execute", record)
+        try:
+            response = client.get(url)
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", record)
+        assert response.status_code == 200
+        return len(statements), response.json()
+
+    urls = [f"/api/paths/{path_id}/roster", "/api/members/1/overview", "/api/members?include=tasks,learning_path",
+            "/api/tasks?include=assignee,path", f"/api/paths?include=tasks,members"]
+    add_members(0, 2)
+    small = {url: count_queries(url) for url in urls}
+    add_members(2, 6)
+    large = {url: count_queries(url) for url in urls}
+    for url in urls:
+        assert large[url][0] == small[url][0], url
+
+    roster = large[urls[0]][1]
+    assert len(roster["members"]) == 8 and len(roster["tasks"]) == 16
+    assert roster["members"][0]["skills"] == [{"name": "Python", "proficiency": "Beginner"}]
+    overview = large[urls[1]][1]
+    assert [t["title"] for t in overview["tasks"]] == ["Task 0.0", "Task 0.1"]
+    assert overview["learning_path"]["name"] == "P"
+    members = large[urls[2]][1]
+    assert members[-1]["learning_path"]["id"] == path_id and len(members[-1]["tasks"]) == 2
+    tasks = large[urls[3]][1]
+    assert tasks[0]["assignee"]["name"] == "User 0" and tasks[0]["path"]["name"] == "P"
+    assert client.get("/api/tasks?include=owner").status_code == 400
+
+def test_activity_log_batched_writes(client, db):
+    from sqlalchemy.orm import sessionmaker
+    from backend.activity import ActivityWriter, activity_log
+    session_factory = sessionmaker(bind=db.get_bind())
+    member_id = client.post(
+        "/api/auth/register",
+        json={"name": "Ada", "email": "ada@example.com", "password": "password"}
+    ).json()["id"]
+    task_id = client.post("/api/tasks", json={"title": "Ship it", "assigned_to": member_id}).json()["id"]
+
+    client.post(f"/api/members/{member_id}/skills", json={"name": "Go", "proficiency": "Expert"})
+    client.put(f"/api/tasks/{task_id}", json={"status": "Completed"})
+    client.post("/api/bot/command", json={"command": "/viewProfile", "memberId": member_id})
+    # Queued, not yet written
+    assert client.get(f"/api/members/{member_id}/activity").json() == []
+
+    activity_log.flush(session_factory)
+    first = client.get(f"/api/members/{member_id}/activity?limit=2")
+    assert [a["type"] for a in first.json()] == ["bot_command", "task_update"]
+    assert first.json()[1]["metadata"] == {"task_id": task_id, "changes": {"status": ["Pending", "Completed"]}}
+    rest = client.get(f"/api/members/{member_id}/activity?limit=2&cursor={first.headers['x-next-cursor']}")
+    assert [a["type"] for a in rest.json()] == ["skill_add"] and "x-next-cursor" not in rest.headers
+
+    # The writer thread batches whatever arrives and drains on stop
+    writer = ActivityWriter()
+    writer.start(session_factory)
+    for i in range(450):
+        writer.record(member_id, "bot_command", f"/cmd{i}")
+    writer.stop()
+    assert db.query(ActivityLog).count() == 453
+
+    # Back-pressure: a full queue makes producers wait, then drops
+    small = ActivityWriter(maxsize=2)
+    assert small.record(member_id, "bot_command", "a") and small.record(member_id, "bot_command", "b")
+    assert small.record(member_id, "bot_command", "c", timeout=0.01) is False
+
+def test_task_log_entries(client, monkeypatch):
+    from backend import serialization, task_logs
+    monkeypatch.setattr(task_logs, "PREVIEW_SIZE", 2)
+    member_id = client.post(
+        "/api/auth/register",
+        json={"name": "Ada", "email": "ada@example.com", "password": "password"}
+    ).json()["id"]
+    task_id = client.post("/api/tasks", json={"title": "Ship it", "assigned_to": member_id}).json()["id"]
+    assert client.get(f"/api/tasks/{task_id}").json()["logs"] == []
+
+    for i in range(4):
+        response = client.post(f"/api/tasks/{task_id}/logs",
+                               json={"message": f"Step {i}", "member_id": member_id, "details": {"hours": i}})
+        assert response.status_code == 200
+        assert response.json()["task_id"] == task_id and response.json()["message"] == f"Step {i}"
+    assert client.post("/api/tasks/999/logs", json={"message": "Nope"}).status_code == 404
+    assert client.post(f"/api/tasks/{task_id}/logs", json={"message": ""}).status_code == 422
+
+    # Task responses carry the latest entries only
+    assert [log["message"] for log in client.get(f"/api/tasks/{task_id}").json()["logs"]] == ["Step 2", "Step 3"]
+    page = client.get("/api/tasks?fields=logs")
+    assert [log["message"] for log in page.json()[0]["logs"]] == ["Step 2", "Step 3"]
+    monkeypatch.setattr(serialization, "FAST_LISTS", True)
+    assert client.get("/api/tasks?fields=logs").json() == page.json()
+
+    # The full history, newest first
+    first = client.get(f"/api/tasks/{task_id}/logs?limit=3")
+    assert [log["message"] for log in first.json()] == ["Step 3", "Step 2", "Step 1"]
+    assert first.json()[0]["details"] == {"hours": 3}
+    rest = client.get(f"/api/tasks/{task_id}/logs?limit=3&cursor={first.headers['x-next-cursor']}")
+    assert [log["message"] for log in rest.json()] == ["Step 0"] and "x-next-cursor" not in rest.headers
+    assert client.get("/api/tasks/999/logs").status_code == 404
+
+def test_bot_commands_run_against_db(client, db, monkeypatch):
+    import time
+    from backend import bot_handlers
+    member_id = client.post(
+        "/api/auth/register",
+        json={"name": "Ada Lovelace", "email": "ada@example.com", "password": "password"}
+    ).json()["id"]
+    other_id = client.post(
+        "/api/auth/register",
+        json={"name": "Alan Turing", "email": "alan@example.com", "password": "password"}
+    ).json()["id"]
+    task_id = client.post("/api/tasks", json={"title": "Ship it", "assigned_to": member_id}).json()["id"]
+
+    def bot(command, member=member_id, **extra):
+        return client.post("/api/bot/command", json={"command": command, "memberId": member, **extra}).json()
+
+    assert "added" in bot('/addSkill "Machine Learning" expert')["text"]
+    assert client.get(f"/api/members/{member_id}").json()["skills"] == [{"name": "Machine Learning", "proficiency": "Expert"}]
+    assert bot("/addskill", arguments="Go")["text"] == "Skill 'Go' (Beginner) added successfully! 🎉"
+    assert bot("/addSkill")["text"].startswith("Usage: /addSkill")
+
+    assert "Keep up" in bot(f"/logTask {task_id} Wrote the release notes")["text"]
+    assert [log["message"] for log in client.get(f"/api/tasks/{task_id}/logs").json()] == ["Wrote the release notes"]
+    assert bot("/logTask 999 hello")["text"] == "Task 999 not found."
+    assert bot("/logTask abc")["text"] == "Usage: /logTask <task id> <message>"
+
+    assert bot(f"/assignTask {task_id} {other_id}")["text"] == "Task 'Ship it' assigned to Alan Turing."
+    assert client.get(f"/api/tasks/{task_id}").json()["assigned_to"] == other_id
+
+    profile = bot(f"/viewProfile {other_id}")["slides"][-1]["data"]
+    assert profile.startswith("Alan Turing - Developer") and "Tasks: 0 completed, 1 open" in profile
+    assert bot("/viewProfile", member=None)["text"] == "/viewProfile needs a memberId."
+    # An explicit target needs no memberId
+    assert bot(f"/viewProfile {other_id}", member=None)["slides"][-1]["data"] == profile
+    assert bot(f"/assignTask {task_id} {member_id}", member=None)["text"] == "Task 'Ship it' assigned to Ada Lovelace."
+    assert isinstance(bot(f"/recommendNext {member_id}", member=None), list)
+    assert "- Members: 2\n- Active Tasks: 1" in bot("/adminStats", member=None)["text"]
+    assert bot("/dance")["text"].startswith("Unknown command. Try /addSkill")
+
+    # Past its budget a command gets a holding reply and finishes in the background
+    done = []
+    slow = bot_handlers.Command("/slow", lambda db, request: (time.sleep(0.2), done.append(1)), "/slow", 0.01)
+    monkeypatch.setitem(bot_handlers.COMMANDS, "/slow", slow)
+    # With no callback to deliver the result to, the reply doesn't promise one
+    assert bot("/slow")["text"].startswith("/slow is taking longer than usual")
+    time.sleep(0.4)
+    assert done == [1]
+
+def test_slow_bot_commands_deferred_to_callback(client, monkeypatch):
+    import json as jsonlib
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from backend import bot_handlers
+
+    # Local stand-in for the Cliq callback
+    delivered = []
+    release = threading.Event()
+
+    class Callback(BaseHTTPRequestHandler):
+        def do_POST(self):
+            delivered.append(jsonlib.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Callback)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    callback_url = f"http://127.0.0.1:{server.server_port}/cliq"
+    monkeypatch.setattr(bot_handlers, "CALLBACK_HOSTS", {"127.0.0.1"})
+    monkeypatch.setattr(bot_handlers, "CALLBACK_URL", "")
+
+    member_id = client.post(
+        "/api/auth/register",
+        json={"name": "Ada", "email": "ada@example.com", "password": "password"}
+    ).json()["id"]
+    slow = bot_handlers.Command("/report", lambda db, request: (release.wait(5), {"text": "Report ready"})[1],
+                                "/report", 1.0, slow=True)
+    monkeypatch.setitem(bot_handlers.COMMANDS, "/report", slow)
+
+    def bot(command, url=callback_url):
+        return client.post("/api/bot/command",
+                           json={"command": command, "memberId": member_id, "callbackUrl": url}).json()
+
+    try:
+        assert bot("/report")["text"] == "Working on /report; the result will be posted here."
+        assert bot("/report")["text"].startswith("Already working on /report")
+        assert "bot_deferred_queue_depth 1" in client.get("/metrics").text
+        release.set()
+        bot_handlers.deferred.wait(5)
+        assert delivered == [{"command": "/report", "memberId": member_id, "arguments": [], "reply": {"text": "Report ready"}}]
+        assert "bot_deferred_queue_depth 0" in client.get("/metrics").text
+
+        # /recommendNext is slow too; its recommendations arrive at the callback
+        assert bot("/recommendNext")["text"].startswith("Working on /recommendNext")
+        bot_handlers.deferred.wait(5)
+        assert isinstance(delivered[-1]["reply"], list)
+
+        # Callbacks on hosts that aren't allowed are ignored: the command runs inline
+        assert isinstance(bot("/recommendNext", url="http://example.com/cliq"), list)
+        assert len(delivered) == 2
+    finally:
+        server.shutdown()
+
+def test_idempotency_keys_and_single_flight(client, db, monkeypatch):
+    import asyncio
+    import time
+    import httpx
+    from backend import analytics
+    from backend.main import app
+
+    headers = {"Idempotency-Key": "task-1"}
+    first = client.post("/api/tasks", json={"title": "Ship it"}, headers=headers)
+    retry = client.post("/api/tasks", json={"title": "Ship it"}, headers=headers)
+    assert retry.json() == first.json() and retry.headers["idempotent-replayed"] == "true"
+    assert db.query(Task).count() == 1
+    assert client.post("/api/tasks", json={"title": "Other"}, headers=headers).status_code == 422
+    # Keys are per route; no key, no deduplication
+    assert client.put(f"/api/tasks/{first.json()['id']}", json={"status": "Done"}, headers=headers).status_code == 200
+    client.post("/api/tasks", json={"title": "Ship it"})
+    assert db.query(Task).count() == 2
+
+    # Errors below 500, raised or from validation, are kept and replayed too
+    for key, body, status in (("k2", {"name": "Go"}, 404), ("k3", {}, 422)):
+        first = client.post("/api/members/999/skills", json=body, headers={"Idempotency-Key": key})
+        replay = client.post("/api/members/999/skills", json=body, headers={"Idempotency-Key": key})
+        assert first.status_code == status and "idempotent-replayed" not in first.headers
+        assert (replay.status_code, replay.json()) == (first.status_code, first.json())
+        assert replay.headers["idempotent-replayed"] == "true"
+
+    # Concurrent identical GETs run the route once
+    calls = []
+    live = analytics.live_analytics
+
+    def slow_live(db_):
+        calls.append(1)
+        time.sleep(0.2)
+        return live(db_)
+
+    monkeypatch.setattr(analytics, "live_analytics", slow_live)
+
+    async def stampede():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(*(ac.get("/api/analytics") for _ in range(5)))
+
+    responses = asyncio.run(stampede())
+    assert len(calls) == 1
+    assert all(r.status_code == 200 and r.json() == responses[0].json() for r in responses)
+
+def test_bulk_task_writes(client, db):
+    from sqlalchemy import event
+    members = [client.post(
+        "/api/auth/register",
+        json={"name": f"Joiner {i}", "email": f"joiner{i}@example.com", "password": "password"}
+    ).json()["id"] for i in range(3)]
+    path_id = client.post("/api/paths", json={
+        "name": "Onboarding", "description": "Basics", "difficulty": "Beginner", "estimated_duration": "1 week"
+    }).json()["id"]
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        created = client.post("/api/tasks/bulk", json=[
+            {"title": f"Module {i}", "path_id": path_id, "status": "Completed" if i == 0 else "Pending"}
+            for i in range(4)
+        ])
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    assert created.status_code == 200
+    ids = created.json()["ids"]
+    assert len(ids) == 4 and [t["title"] for t in client.get("/api/tasks").json()] == [f"Module {i}" for i in range(4)]
+    assert sum(s.lstrip().upper().startswith("INSERT INTO TASKS") for s in statements) == 1
+
+    # All or nothing
+    bad = client.post("/api/tasks/bulk", json=[{"title": "Fine"}, {"title": "Bad", "assigned_to": 999}])
+    assert bad.status_code == 422 and bad.json()["detail"] == [{"index": 1, "errors": ["assigned_to: Member not found"]}]
+    assert client.post("/api/tasks/bulk", json=[]).status_code == 422
+
+    # Clone the path's (unassigned) tasks to every joiner
+    typo = client.post(f"/api/paths/{path_id}/tasks/clone", json={"member_ids": members + [999]})
+    assert typo.status_code == 422 and typo.json()["detail"] == [{"index": 3, "errors": ["member_ids: Member not found"]}]
+    cloned = client.post(f"/api/paths/{path_id}/tasks/clone", json={"member_ids": members})
+    assert len(cloned.json()["ids"]) == 12
+    mine = client.get(f"/api/tasks?assigned_to={members[0]}").json()
+    assert [(t["title"], t["status"], t["path_id"]) for t in mine] == [(f"Module {i}", "Pending", path_id) for i in range(4)]
+    assert client.post("/api/paths/999/tasks/clone", json={"member_ids": members}).status_code == 404
+
+    # Assign and complete in one request
+    updated = client.patch("/api/tasks/bulk", json=[
+        {"id": ids[1], "assigned_to": members[2], "status": "Completed"},
+        {"id": ids[2], "priority": "High"},
+    ])
+    assert updated.json() == {"ids": ids[1:3]}
+    task = client.get(f"/api/tasks/{ids[1]}").json()
+    assert (task["assigned_to"], task["status"], task["priority"]) == (members[2], "Completed", "Medium")
+    assert client.get(f"/api/tasks/{ids[2]}").json()["priority"] == "High"
+    # Recorded like single updates, against the new assignee
+    from sqlalchemy.orm import sessionmaker
+    from backend.activity import activity_log
+    activity_log.flush(sessionmaker(bind=db.get_bind()))
+    [entry] = client.get(f"/api/members/{members[2]}/activity").json()
+    assert (entry["type"], entry["metadata"]["task_id"]) == ("task_update", ids[1])
+    assert entry["metadata"]["changes"] == {"assigned_to": [None, members[2]], "status": ["Pending", "Completed"]}
+    missing = client.patch("/api/tasks/bulk", json=[{"id": 999, "status": "Completed"}, {"id": ids[0]}, {"id": ids[0]}])
+    assert missing.status_code == 422
+    assert [e["index"] for e in missing.json()["detail"]] == [0, 2]
+
+    # Counters kept in step with the bulk statements
+    assert client.post("/api/admin/analytics/reconcile").json()["drift"] == []
+    assert client.get("/api/analytics").json()["active_tasks"] == 16 - 2
@@ -0,0 +1,47 @@
+from sqlalchemy import text
+
+from backend.database import make_engine
+
+def test_tuned_sqlite_engine_sets_pragmas(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path}/tuned.db", tuned=True)
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1 # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    assert engine.pool.size() == 10
+    engine.dispose()
+
+def test_untuned_engine_keeps_driver_defaults(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path}/plain.db", tuned=False)
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    engine.dispose()
+
+def test_async_routes_on_async_engine(tmp_path):
+    import pytest
+    pytest.importorskip("aiosqlite")
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from sqlalchemy.pool import NullPool
+    from backend.database import Base, get_async_db, make_async_engine
+    from backend.main import app
+
+    url = f"sqlite:///{tmp_path}/async.db"
+    Base.metadata.create_all(bind=make_engine(url))
+    AsyncSessionLocal = async_sessionmaker(make_async_engine(url, poolclass=NullPool), expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        with TestClient(app) as client:
+            task = client.post("/api/tasks", json={"title": "Async", "priority": "High"}).json()
+            assert client.put(f"/api/tasks/{task['id']}", json={"status": "Completed"}).json()["status"] == "Completed"
+            assert [t["title"] for t in client.get("/api/tasks?priority=High").json()] == ["Async"]
+            assert client.get("/api/analytics").json()["active_tasks"] == 0
+            assert client.delete(f"/api/tasks/{task['id']}").status_code == 200
+            assert client.get(f"/api/tasks/{task['id']}").status_code == 404
+    finally:
+        del app.dependency_overrides[get_async_db]
@@ -0,0 +1,64 @@
+import numpy as np
+
+from backend.ml.recommender import ModuleIndex, recommend_for_member
+from backend.ml.retrieval import ExactEngine, IVFEngine, recall_at_k, top_k_indices
+
+MODULES = [
+    {"title": "Advanced React Patterns", "tags": ["React", "Frontend"]},
+    {"title": "Intro to Python", "tags": ["Python", "Backend"]},
+    {"title": "Node.js Microservices", "tags": ["Node.js", "Backend", "JavaScript"]},
+    {"title": "Data Science 101", "tags": ["Python", "Data"]},
+]
+
+def test_index_matrix_is_l2_normalised():
+    index = ModuleIndex(MODULES)
+    norms = np.sqrt(index.matrix.multiply(index.matrix).sum(axis=1)).A1
+    assert np.allclose(norms, 1.0)
+
+def test_recommend_ranks_by_similarity():
+    recs = ModuleIndex(MODULES).recommend(["Python"])
+    assert {r["module"] for r in recs[:2]} == {"Intro to Python", "Data Science 101"}
+    assert recs == sorted(recs, key=lambda r: r["score"], reverse=True)
+
+def test_recommend_falls_back_for_unknown_skills():
+    recs = recommend_for_member(["Cobol"], MODULES)
+    assert [r["reason"] for r in recs] == ["Popular for beginners"] * 3
+
+def test_top_k_indices_matches_full_sort():
+    scores = np.random.default_rng(0).random(50)
+    assert list(top_k_indices(scores, 5)) == list(np.argsort(-scores)[:5])
+
+def test_batch_matches_single_member_scoring():
+    index = ModuleIndex(MODULES)
+    members = [["Python"], ["React", "JavaScript"], [], ["Backend"]]
+    batch = list(index.recommend_batch(members, top_k=2, chunk_size=3))
+    assert batch == [index.recommend(skills, top_k=2) for skills in members]
+
+def test_ivf_engine_recall_improves_with_probes():
+    from sklearn.preprocessing import normalize
+    import scipy.sparse as sp
+    rng = np.random.default_rng(1)
+    matrix = normalize(sp.random(400, 60, density=0.08, format="csr", random_state=1))
+    queries = matrix[rng.choice(400, 40, replace=False)]
+    exact = ExactEngine(matrix)
+    ivf = IVFEngine(matrix, n_lists=20, n_probe=1)
+    low = recall_at_k(ivf, exact, queries, 5)
+    ivf.n_probe = 20
+    assert recall_at_k(ivf, exact, queries, 5) == 1.0
+    assert low < 1.0
+
+def test_ivf_index_serves_recommendations():
+    index = ModuleIndex(MODULES, engine="ivf")
+    assert index.recommend(["Python"], top_k=1)[0]["module"] in {"Intro to Python", "Data Science 101"}
+
+def test_exact_engine_bounds_dense_scores(monkeypatch):
+    from sklearn.preprocessing import normalize
+    import scipy.sparse as sp
+    from backend.ml import retrieval
+    matrix = normalize(sp.random(300, 40, density=0.1, format="csr", random_state=2))
+    queries = matrix[:50]
+    whole_indices, whole_scores = ExactEngine(matrix).search(queries, 5)
+    # Two query rows per block
+    monkeypatch.setattr(retrieval, "MAX_SCORE_CELLS", 600)
+    indices, scores = ExactEngine(matrix).search(queries, 5)
+    assert (indices == whole_indices).all() and np.allclose(scores, whole_scores)